@@ -15,6 +15,9 @@ from app.config import settings
 from app.database import Base
 
 # Import all models to ensure they are registered with SQLAlchemy
+from app.models.asset import MediaAsset
+from app.models.processing import ProcessingEvent
+from app.models.upload import UploadChunk, UploadSession
 from app.models.user import User
 from app.models.video import Video
 
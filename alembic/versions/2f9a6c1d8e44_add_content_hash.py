@@ -0,0 +1,30 @@
+"""Record upload size and content hash
+
+Revision ID: 2f9a6c1d8e44
+Revises: 8c41d7e2b6f0
+Create Date: 2026-10-17 15:05:48.190362
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2f9a6c1d8e44'
+down_revision: Union[str, None] = '8c41d7e2b6f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('videos', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_videos_content_hash'), 'videos', ['content_hash'], unique=False)
+    op.add_column('upload_chunks', sa.Column('block_digests', sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('upload_chunks', 'block_digests')
+    op.drop_index(op.f('ix_videos_content_hash'), table_name='videos')
+    op.drop_column('videos', 'content_hash')
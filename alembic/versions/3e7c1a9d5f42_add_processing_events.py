@@ -0,0 +1,40 @@
+"""Append-only processing events instead of a growing log column
+
+Revision ID: 3e7c1a9d5f42
+Revises: 9b5d7f1e3a28
+Create Date: 2026-10-17 18:26:47.903114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e7c1a9d5f42'
+down_revision: Union[str, None] = '9b5d7f1e3a28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'processing_events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('video_id', sa.Integer(), nullable=True),
+        sa.Column('stage', sa.String(length=50), nullable=False),
+        sa.Column('message', sa.Text(), nullable=True),
+        sa.Column('duration_ms', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['video_id'], ['videos.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_processing_events_id'), 'processing_events', ['id'], unique=False)
+    op.create_index(op.f('ix_processing_events_video_id'), 'processing_events', ['video_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_processing_events_video_id'), table_name='processing_events')
+    op.drop_index(op.f('ix_processing_events_id'), table_name='processing_events')
+    op.drop_table('processing_events')
@@ -0,0 +1,28 @@
+"""Trick-play sprite sheets
+
+Revision ID: 4a6e2c8f0b13
+Revises: 7d3b9e5a1c60
+Create Date: 2026-10-17 17:02:14.663920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a6e2c8f0b13'
+down_revision: Union[str, None] = '7d3b9e5a1c60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('videos', sa.Column('sprites_path', sa.String(length=500), nullable=True))
+    op.add_column('media_assets', sa.Column('sprites_path', sa.String(length=500), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('media_assets', 'sprites_path')
+    op.drop_column('videos', 'sprites_path')
@@ -0,0 +1,28 @@
+"""Add HLS packaging columns to videos
+
+Revision ID: 5b8e1f3a9c27
+Revises: d2c416d919ce
+Create Date: 2026-10-17 09:12:31.402118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8e1f3a9c27'
+down_revision: Union[str, None] = 'd2c416d919ce'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('videos', sa.Column('hls_path', sa.String(length=500), nullable=True))
+    op.add_column('videos', sa.Column('renditions', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('videos', 'renditions')
+    op.drop_column('videos', 'hls_path')
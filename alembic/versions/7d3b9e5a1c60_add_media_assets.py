@@ -0,0 +1,50 @@
+"""Share processed files between videos with identical content
+
+Revision ID: 7d3b9e5a1c60
+Revises: 2f9a6c1d8e44
+Create Date: 2026-10-17 16:12:31.508174
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d3b9e5a1c60'
+down_revision: Union[str, None] = '2f9a6c1d8e44'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'media_assets',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('file_path', sa.String(length=500), nullable=False),
+        sa.Column('file_size', sa.BigInteger(), nullable=True),
+        sa.Column('thumbnail_path', sa.String(length=500), nullable=True),
+        sa.Column('hls_path', sa.String(length=500), nullable=True),
+        sa.Column('renditions', sa.Text(), nullable=True),
+        sa.Column('duration', sa.Integer(), nullable=True),
+        sa.Column('resolution', sa.String(length=20), nullable=True),
+        sa.Column('format', sa.String(length=10), nullable=True),
+        sa.Column('ref_count', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_media_assets_content_hash'), 'media_assets', ['content_hash'], unique=True)
+    op.create_index(op.f('ix_media_assets_id'), 'media_assets', ['id'], unique=False)
+    op.add_column('videos', sa.Column('asset_id', sa.Integer(), nullable=True))
+    op.create_foreign_key('fk_videos_asset_id', 'videos', 'media_assets', ['asset_id'], ['id'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('fk_videos_asset_id', 'videos', type_='foreignkey')
+    op.drop_column('videos', 'asset_id')
+    op.drop_index(op.f('ix_media_assets_id'), table_name='media_assets')
+    op.drop_index(op.f('ix_media_assets_content_hash'), table_name='media_assets')
+    op.drop_table('media_assets')
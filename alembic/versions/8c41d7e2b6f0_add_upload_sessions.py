@@ -0,0 +1,69 @@
+"""Add resumable upload sessions and chunks
+
+Revision ID: 8c41d7e2b6f0
+Revises: 5b8e1f3a9c27
+Create Date: 2026-10-17 13:40:12.774310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c41d7e2b6f0'
+down_revision: Union[str, None] = '5b8e1f3a9c27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'upload_sessions',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('title', sa.String(length=255), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('original_filename', sa.String(length=255), nullable=False),
+        sa.Column('temp_path', sa.String(length=500), nullable=False),
+        sa.Column('total_size', sa.BigInteger(), nullable=False),
+        sa.Column('chunk_size', sa.Integer(), nullable=False),
+        sa.Column('total_chunks', sa.Integer(), nullable=False),
+        sa.Column(
+            'status',
+            sa.Enum('ACTIVE', 'COMPLETING', 'COMPLETED', 'ABORTED', name='uploadsessionstatus'),
+            nullable=True,
+        ),
+        sa.Column('uploaded_by_id', sa.Integer(), nullable=False),
+        sa.Column('video_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['uploaded_by_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['video_id'], ['videos.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_upload_sessions_status'), 'upload_sessions', ['status'], unique=False)
+
+    op.create_table(
+        'upload_chunks',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('session_id', sa.String(length=36), nullable=True),
+        sa.Column('chunk_index', sa.Integer(), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['session_id'], ['upload_sessions.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('session_id', 'chunk_index', name='uq_upload_chunk'),
+    )
+    op.create_index(op.f('ix_upload_chunks_id'), 'upload_chunks', ['id'], unique=False)
+    op.create_index(op.f('ix_upload_chunks_session_id'), 'upload_chunks', ['session_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_upload_chunks_session_id'), table_name='upload_chunks')
+    op.drop_index(op.f('ix_upload_chunks_id'), table_name='upload_chunks')
+    op.drop_table('upload_chunks')
+    op.drop_index(op.f('ix_upload_sessions_status'), table_name='upload_sessions')
+    op.drop_table('upload_sessions')
+    sa.Enum(name='uploadsessionstatus').drop(op.get_bind(), checkfirst=True)
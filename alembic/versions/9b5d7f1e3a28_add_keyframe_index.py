@@ -0,0 +1,28 @@
+"""Packed keyframe index for time-based seeks
+
+Revision ID: 9b5d7f1e3a28
+Revises: 4a6e2c8f0b13
+Create Date: 2026-10-17 17:41:05.128377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b5d7f1e3a28'
+down_revision: Union[str, None] = '4a6e2c8f0b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('videos', sa.Column('keyframe_index', sa.LargeBinary(), nullable=True))
+    op.add_column('media_assets', sa.Column('keyframe_index', sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('media_assets', 'keyframe_index')
+    op.drop_column('videos', 'keyframe_index')
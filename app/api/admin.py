@@ -4,14 +4,16 @@ from datetime import timedelta
 from fastapi import APIRouter, Depends, Form, HTTPException, Request, status
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.config import settings
-from app.database import get_db
+from app.database import get_async_db, get_db
 from app.models.user import User
 from app.models.video import VideoStatus
-from app.services.auth_service import AuthService, get_current_admin_user
-from app.services.video_service import VideoService
+from app.services.auth_service import AsyncAuthService, get_current_admin_user
+from app.services.principal_cache import principal_cache
+from app.services.video_service import AsyncVideoService, VideoService
 from app.utils.security import create_access_token
 
 logger = logging.getLogger(__name__)
@@ -33,12 +35,24 @@ async def admin_login_submit(
     request: Request,
     username: str = Form(...),
     password: str = Form(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Handle admin login form submission"""
 
-    auth_service = AuthService(db)
-    user = auth_service.authenticate_user(username, password)
+    auth_service = AsyncAuthService(db)
+    try:
+        user = await auth_service.authenticate_user(username, password)
+    except HTTPException as e:
+        return templates.TemplateResponse(
+            "admin/login.html",
+            {
+                "request": request,
+                "title": "Admin Login",
+                "error": "Too many login attempts right now, please try again",
+            },
+            status_code=e.status_code,
+            headers=e.headers,
+        )
 
     if not user or not user.is_admin:
         return templates.TemplateResponse(
@@ -84,27 +98,24 @@ async def admin_logout():
 
 
 @router.get("/dashboard", response_class=HTMLResponse)
-async def admin_dashboard(request: Request, db: Session = Depends(get_db)):
+async def admin_dashboard(request: Request, db: AsyncSession = Depends(get_async_db)):
     """Admin dashboard page"""
 
     # Get user info from request state (set by middleware)
     if not hasattr(request.state, "user_id") or not request.state.is_admin:
         return RedirectResponse(url="/admin/login", status_code=status.HTTP_302_FOUND)
 
-    # Get user from database
-    from app.services.auth_service import AuthService
+    # Get user from the principal cache (the middleware verified the token)
+    current_admin = await principal_cache.get(request.state.user_id)
 
-    auth_service = AuthService(db)
-    current_admin = auth_service.get_user_by_id(request.state.user_id)
-
-    if not current_admin or not current_admin.is_admin:
+    if not current_admin or not current_admin.is_active or not current_admin.is_admin:
         return RedirectResponse(url="/admin/login", status_code=status.HTTP_302_FOUND)
 
-    video_service = VideoService(db)
-    stats = video_service.get_video_stats(current_admin)
+    video_service = AsyncVideoService(db)
+    stats = await video_service.get_video_stats(current_admin)
 
     # Get recent videos
-    recent_videos = video_service.get_user_videos(
+    recent_videos = await video_service.get_user_videos(
         user=current_admin, page=1, per_page=5
     )
 
@@ -143,11 +154,11 @@ async def admin_videos_page(
     page: int = 1,
     status_filter: str = None,
     current_admin: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Admin videos management page"""
 
-    video_service = VideoService(db)
+    video_service = AsyncVideoService(db)
 
     # Convert status filter
     status_enum = None
@@ -157,7 +168,7 @@ async def admin_videos_page(
         except ValueError:
             status_enum = None
 
-    videos = video_service.get_user_videos(
+    videos = await video_service.get_user_videos(
         user=current_admin, page=page, per_page=20, status_filter=status_enum
     )
 
@@ -180,12 +191,12 @@ async def admin_video_detail(
     request: Request,
     video_id: int,
     current_admin: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Admin video detail page"""
 
-    video_service = VideoService(db)
-    video = video_service.get_video_by_id(video_id, current_admin)
+    video_service = AsyncVideoService(db)
+    video = await video_service.get_video_by_id(video_id, current_admin)
 
     if not video:
         raise HTTPException(
@@ -195,10 +206,12 @@ async def admin_video_detail(
     # Generate streaming token if video is completed
     streaming_token = None
     if video.status == VideoStatus.COMPLETED:
-        streaming_token = video_service.generate_streaming_token(
+        streaming_token = await video_service.generate_streaming_token(
             video_id, current_admin
         )
 
+    history = await video_service.get_processing_events(video.id, per_page=50)
+
     return templates.TemplateResponse(
         "admin/video_detail.html",
         {
@@ -206,6 +219,7 @@ async def admin_video_detail(
             "title": f"Video: {video.title}",
             "user": current_admin,
             "video": video,
+            "processing_events": history["items"],
             "streaming_token": streaming_token,
             "api_base": settings.api_prefix,
         },
@@ -213,7 +227,7 @@ async def admin_video_detail(
 
 
 @router.post("/video/{video_id}/delete")
-async def admin_delete_video(
+def admin_delete_video(
     video_id: int,
     current_admin: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db),
@@ -3,17 +3,17 @@ from datetime import timedelta
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
-from app.database import get_db
+from app.database import get_async_db
 from app.schemas.auth import Token, User, UserLogin
 from app.services.auth_service import (
-    AuthService,
+    AsyncAuthService,
     get_current_admin_user,
     get_current_user,
 )
-from app.utils.security import create_access_token
+from app.utils.security import create_access_token, password_hasher
 
 logger = logging.getLogger(__name__)
 
@@ -22,12 +22,13 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 @router.post("/login", response_model=Token)
 async def login(
-    form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Admin login endpoint"""
 
-    auth_service = AuthService(db)
-    user = auth_service.authenticate_user(form_data.username, form_data.password)
+    auth_service = AsyncAuthService(db)
+    user = await auth_service.authenticate_user(form_data.username, form_data.password)
 
     if not user:
         raise HTTPException(
@@ -59,11 +60,13 @@ async def login(
 
 
 @router.post("/login-json", response_model=Token)
-async def login_json(login_data: UserLogin, db: Session = Depends(get_db)):
+async def login_json(login_data: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """Admin login with JSON payload"""
 
-    auth_service = AuthService(db)
-    user = auth_service.authenticate_user(login_data.username, login_data.password)
+    auth_service = AsyncAuthService(db)
+    user = await auth_service.authenticate_user(
+        login_data.username, login_data.password
+    )
 
     if not user:
         raise HTTPException(
@@ -112,6 +115,15 @@ async def verify_admin_access(current_admin: User = Depends(get_current_admin_us
     }
 
 
+@router.get("/password-hashing/stats")
+async def get_password_hashing_stats(
+    current_admin: User = Depends(get_current_admin_user),
+):
+    """Get password hashing executor counters for this API process (Admin only)"""
+
+    return password_hasher.stats()
+
+
 @router.post("/logout")
 async def logout(current_user: User = Depends(get_current_user)):
     """Logout endpoint (client-side token removal)"""
@@ -1,6 +1,11 @@
+import asyncio
+import json
 import logging
 import os
-from typing import Optional
+import re
+import time
+from typing import List, Optional
+from urllib.parse import urlencode
 
 from fastapi import (
     APIRouter,
@@ -9,31 +14,62 @@ from fastapi import (
     Form,
     HTTPException,
     Query,
+    Request,
     UploadFile,
     status,
 )
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.config import settings
-from app.database import get_db
+from app.database import AsyncSessionLocal, get_async_db, get_db
+from app.models.processing import ProcessingEvent
 from app.models.user import User
-from app.models.video import VideoStatus
+from app.models.video import Video, VideoStatus
 from app.schemas.video import (
+    UploadSessionCreate,
+    UploadSessionResponse,
     VideoListResponse,
+    VideoProgressResponse,
     VideoResponse,
     VideoStatsResponse,
     VideoUpdate,
     VideoUploadResponse,
 )
-from app.services.auth_service import get_current_admin_user, get_current_user_optional
-from app.services.video_service import VideoService
-from app.utils.security import verify_video_token
+from app.services.auth_service import (
+    get_current_admin_user,
+    get_current_admin_user_or_cookie,
+    get_current_user_optional,
+)
+from app.services.progress_channel import (
+    FINAL_STATUSES,
+    progress_broadcaster,
+    progress_message,
+)
+from app.services.upload_service import UploadService
+from app.services.video_cache import keyframe_index_cache, video_metadata_cache
+from app.services.video_service import AsyncVideoService, VideoService
+from app.tasks.video_tasks import SPRITE_VTT_NAME
+from app.utils.cache import segment_cache
+from app.utils.security import (
+    generate_signed_stream_params,
+    verify_stream_signature,
+    verify_video_token,
+)
+from app.utils.streaming import build_file_response
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/video", tags=["Video"])
 
+HLS_PLAYLIST_MEDIA_TYPE = "application/vnd.apple.mpegurl"
+HLS_SEGMENT_MEDIA_TYPE = "video/mp2t"
+HLS_FILENAME_PATTERN = re.compile(r"^(index\.m3u8|seg_\d{5}\.ts)$")
+SPRITE_FILENAME_PATTERN = re.compile(r"^sprite_\d{3}\.jpg$")
+VTT_MEDIA_TYPE = "text/vtt"
+
 
 @router.post("/upload", response_model=VideoUploadResponse)
 async def upload_video(
@@ -41,11 +77,11 @@ async def upload_video(
     description: str = Form(""),
     file: UploadFile = File(...),
     current_admin: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Upload a new video (Admin only)"""
 
-    video_service = VideoService(db)
+    video_service = AsyncVideoService(db)
 
     try:
         video = await video_service.upload_video(
@@ -68,18 +104,159 @@ async def upload_video(
         )
 
 
+@router.post("/upload-stream", response_model=VideoUploadResponse)
+async def upload_video_stream(
+    request: Request,
+    current_admin: User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Upload a new video without spooling the body (Admin only)
+
+    Accepts the same multipart form as ``/upload`` (title, description,
+    file); the file part is written to disk as it arrives.
+    """
+
+    video_service = AsyncVideoService(db)
+    video = await video_service.upload_video_stream(request, current_admin)
+
+    return VideoUploadResponse(
+        id=video.id,
+        unique_id=video.unique_id,
+        title=video.title,
+        status=video.status,
+        upload_progress=video.upload_progress,
+        message="Video upload started successfully",
+    )
+
+
+async def _upload_session_response(
+    upload_service: UploadService, upload
+) -> UploadSessionResponse:
+    received = await upload_service.received_chunks(upload)
+    received_set = set(received)
+    return UploadSessionResponse(
+        upload_id=upload.id,
+        title=upload.title,
+        original_filename=upload.original_filename,
+        status=upload.status,
+        total_size=upload.total_size,
+        chunk_size=upload.chunk_size,
+        total_chunks=upload.total_chunks,
+        received_chunks=received,
+        missing_chunks=[
+            index for index in range(upload.total_chunks) if index not in received_set
+        ],
+        expires_at=upload.expires_at,
+        video_id=upload.video_id,
+    )
+
+
+@router.post(
+    "/uploads",
+    response_model=UploadSessionResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_upload_session(
+    upload_data: UploadSessionCreate,
+    current_admin: User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Start a resumable upload (Admin only)
+
+    Send each chunk with ``PUT /uploads/{upload_id}/chunks/{index}`` (in any
+    order, in parallel if you like), then call ``/complete``.
+    """
+
+    upload_service = UploadService(db)
+    upload = await upload_service.create_session(
+        title=upload_data.title,
+        description=upload_data.description or "",
+        filename=upload_data.filename,
+        total_size=upload_data.total_size,
+        user=current_admin,
+    )
+    return await _upload_session_response(upload_service, upload)
+
+
+@router.get("/uploads/{upload_id}", response_model=UploadSessionResponse)
+async def get_upload_session(
+    upload_id: str,
+    current_admin: User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get upload state, including the chunks still missing (Admin only)"""
+
+    upload_service = UploadService(db)
+    upload = await upload_service.get_session(upload_id, current_admin)
+    return await _upload_session_response(upload_service, upload)
+
+
+@router.put("/uploads/{upload_id}/chunks/{index}")
+async def upload_chunk(
+    upload_id: str,
+    index: int,
+    request: Request,
+    current_admin: User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Upload one chunk as the raw request body (Admin only)"""
+
+    upload_service = UploadService(db)
+    upload = await upload_service.get_session(upload_id, current_admin)
+    size = await upload_service.write_chunk(upload, index, request.stream())
+
+    return {"upload_id": upload_id, "index": index, "size": size}
+
+
+@router.post("/uploads/{upload_id}/complete", response_model=VideoUploadResponse)
+async def complete_upload(
+    upload_id: str,
+    current_admin: User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Finish a resumable upload and start processing (Admin only)"""
+
+    upload_service = UploadService(db)
+    upload = await upload_service.get_session(upload_id, current_admin)
+    video = await upload_service.complete(upload)
+
+    return VideoUploadResponse(
+        id=video.id,
+        unique_id=video.unique_id,
+        title=video.title,
+        status=video.status,
+        upload_progress=video.upload_progress,
+        message="Video upload started successfully",
+    )
+
+
+@router.delete("/uploads/{upload_id}")
+async def abort_upload(
+    upload_id: str,
+    current_admin: User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Abort a resumable upload and discard its data (Admin only)"""
+
+    upload_service = UploadService(db)
+    upload = await upload_service.get_session(upload_id, current_admin)
+    await upload_service.abort(upload)
+
+    return {"message": "Upload aborted"}
+
+
 @router.get("/list", response_model=VideoListResponse)
 async def list_videos(
     page: int = Query(1, ge=1),
     per_page: int = Query(10, ge=1, le=100),
     status_filter: Optional[VideoStatus] = Query(None),
     current_admin: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get list of videos (Admin only)"""
 
-    video_service = VideoService(db)
-    result = video_service.get_user_videos(
+    video_service = AsyncVideoService(db)
+    result = await video_service.get_user_videos(
         user=current_admin, page=page, per_page=per_page, status_filter=status_filter
     )
 
@@ -88,26 +265,36 @@ async def list_videos(
 
 @router.get("/stats", response_model=VideoStatsResponse)
 async def get_video_stats(
-    current_admin: User = Depends(get_current_admin_user), db: Session = Depends(get_db)
+    current_admin: User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get video statistics (Admin only)"""
 
-    video_service = VideoService(db)
-    stats = video_service.get_video_stats(current_admin)
+    video_service = AsyncVideoService(db)
+    stats = await video_service.get_video_stats(current_admin)
 
     return VideoStatsResponse(**stats)
 
 
+@router.get("/cache/stats")
+async def get_segment_cache_stats(
+    current_admin: User = Depends(get_current_admin_user),
+):
+    """Get hot segment cache statistics for this API process (Admin only)"""
+
+    return segment_cache.stats()
+
+
 @router.get("/{video_id}", response_model=VideoResponse)
 async def get_video(
     video_id: int,
     current_admin: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get video details (Admin only)"""
 
-    video_service = VideoService(db)
-    video = video_service.get_video_by_id(video_id, current_admin)
+    video_service = AsyncVideoService(db)
+    video = await video_service.get_video_by_id(video_id, current_admin)
 
     if not video:
         raise HTTPException(
@@ -118,7 +305,7 @@ async def get_video(
 
 
 @router.put("/{video_id}", response_model=VideoResponse)
-async def update_video(
+def update_video(
     video_id: int,
     video_update: VideoUpdate,
     current_admin: User = Depends(get_current_admin_user),
@@ -143,7 +330,7 @@ async def update_video(
 
 
 @router.delete("/{video_id}")
-async def delete_video(
+def delete_video(
     video_id: int,
     current_admin: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db),
@@ -162,14 +349,26 @@ async def delete_video(
     return {"message": "Video deleted successfully"}
 
 
-@router.get("/stream/{unique_id}")
-async def stream_video(
-    unique_id: str, token: Optional[str] = Query(None), db: Session = Depends(get_db)
-):
-    """Stream video with token verification (Public endpoint)"""
+def stream_credentials(
+    token: Optional[str] = Query(None),
+    expires: Optional[int] = Query(None),
+    uid: Optional[int] = Query(None),
+    sig: Optional[str] = Query(None),
+) -> dict:
+    """Collect streaming credentials: a JWT token or a signed URL"""
+    if sig is not None:
+        return {"expires": expires, "uid": uid, "sig": sig}
+    if token is not None:
+        return {"token": token}
+    return {}
 
-    video_service = VideoService(db)
-    video = video_service.get_video_by_unique_id(unique_id)
+
+async def _authorize_stream(unique_id: str, credentials: dict):
+    """Resolve a streamable video and check its streaming credentials"""
+
+    # Served from the metadata cache in steady state; a miss uses a
+    # short-lived session that is released before any bytes are sent.
+    video = await video_metadata_cache.get(unique_id)
 
     if not video:
         raise HTTPException(
@@ -182,6 +381,25 @@ async def stream_video(
             detail="Video is not ready for streaming",
         )
 
+    # Signed URL: HMAC over unique_id + expiry + user, no JWT decoding
+    if "sig" in credentials:
+        expires, user_id = credentials["expires"], credentials["uid"]
+        if (
+            expires is None
+            or user_id is None
+            or not verify_stream_signature(
+                unique_id, user_id, expires, credentials["sig"]
+            )
+        ):
+            logger.warning(f"Signed URL verification failed for video {video.id}")
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid or expired signed URL",
+            )
+        return video, {"user_id": user_id, "exp": expires}
+
+    token = credentials.get("token")
+
     # Verify video token if provided
     if token:
         try:
@@ -206,6 +424,45 @@ async def stream_video(
             detail="Video token required for streaming",
         )
 
+    return video, token_data
+
+
+def _stream_cache_headers(token_data: dict) -> dict:
+    """Caching headers for token-protected media bytes.
+
+    In "private" mode only the viewer's browser may store the response, and
+    never for longer than the token that authorised it remains valid.
+    """
+    if settings.stream_cache_mode != "private":
+        return {
+            "Cache-Control": "no-cache, no-store, must-revalidate",
+            "Pragma": "no-cache",
+            "Expires": "0",
+        }
+
+    return _private_cache_headers(token_data)
+
+
+def _private_cache_headers(token_data: dict) -> dict:
+    """Let only the viewer's browser keep a response, within the token lifetime"""
+    max_age = settings.stream_cache_max_age
+    expires_at = token_data.get("exp")
+    if expires_at:
+        max_age = max(0, min(max_age, int(expires_at - time.time())))
+
+    return {"Cache-Control": f"private, max-age={max_age}"}
+
+
+@router.get("/stream/{unique_id}")
+async def stream_video(
+    request: Request,
+    unique_id: str,
+    credentials: dict = Depends(stream_credentials),
+):
+    """Stream video with token or signed URL verification (Public endpoint)"""
+
+    video, token_data = await _authorize_stream(unique_id, credentials)
+
     # Check if file exists
     if not video.file_path or not os.path.exists(video.file_path):
         raise HTTPException(
@@ -216,44 +473,157 @@ async def stream_video(
         f"Streaming video {video.id} ({video.title}) to user {token_data.get('user_id')}"
     )
 
-    # Stream the video file
-    def iterfile(file_path: str):
-        with open(file_path, mode="rb") as file_like:
-            yield from file_like
-
-    return StreamingResponse(
-        iterfile(video.file_path),
+    # Stream the video file (honours Range / If-Range for seeking and resume)
+    return build_file_response(
+        request,
+        video.file_path,
         media_type="video/mp4",
+        cache_key=(video.unique_id, "stream"),
         headers={
             "Content-Disposition": f"inline; filename={video.original_filename}",
-            "Accept-Ranges": "bytes",
-            "Cache-Control": "no-cache, no-store, must-revalidate",
-            "Pragma": "no-cache",
-            "Expires": "0",
+            **_stream_cache_headers(token_data),
         },
     )
 
 
+@router.get("/seek/{unique_id}")
+async def seek_video(
+    unique_id: str,
+    t: float = Query(..., ge=0, description="Time to seek to (s)"),
+    credentials: dict = Depends(stream_credentials),
+):
+    """Resolve a time to the byte range starting at its keyframe (Public endpoint)
+
+    For clients that fetch ranges themselves (download resume, custom
+    players). Browsers should seek with a ``#t=`` media fragment instead: a
+    range starting mid-file carries no ftyp/moov boxes and is not playable
+    on its own.
+    """
+
+    video, _ = await _authorize_stream(unique_id, credentials)
+
+    index = await keyframe_index_cache.get(video.unique_id)
+    if not index:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Keyframe index not available for this video",
+        )
+
+    keyframe_time, offset = index.seek(t)
+    return {
+        "t": t,
+        "keyframe_time": keyframe_time,
+        "offset": offset,
+        "range": f"bytes={offset}-",
+    }
+
+
+def _sign_playlist(playlist: str, credentials: dict) -> str:
+    """Append the streaming credentials to every URI line of an HLS playlist"""
+    query = urlencode(credentials)
+    return "\n".join(
+        f"{line}?{query}" if line and not line.startswith("#") else line
+        for line in playlist.splitlines()
+    )
+
+
+def _hls_playlist_response(playlist_path: str, credentials: dict) -> Response:
+    """Serve a playlist with the caller's credentials carried into its URIs"""
+    if not os.path.exists(playlist_path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Playlist not found"
+        )
+
+    with open(playlist_path, "r") as f:
+        playlist = f.read()
+
+    return Response(
+        content=_sign_playlist(playlist, credentials),
+        media_type=HLS_PLAYLIST_MEDIA_TYPE,
+        headers={"Cache-Control": "no-cache, no-store, must-revalidate"},
+    )
+
+
+@router.get("/hls/{unique_id}/master.m3u8")
+async def get_hls_master_playlist(
+    unique_id: str, credentials: dict = Depends(stream_credentials)
+):
+    """Adaptive-bitrate master playlist with token verification (Public endpoint)"""
+
+    video, _ = await _authorize_stream(unique_id, credentials)
+
+    if not video.hls_path:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="HLS renditions not available for this video",
+        )
+
+    return _hls_playlist_response(
+        os.path.join(video.hls_path, "master.m3u8"), credentials
+    )
+
+
+@router.get("/hls/{unique_id}/{rendition}/{filename}")
+async def get_hls_media(
+    request: Request,
+    unique_id: str,
+    rendition: str,
+    filename: str,
+    credentials: dict = Depends(stream_credentials),
+):
+    """HLS rendition playlist or media segment (Public endpoint)"""
+
+    video, token_data = await _authorize_stream(unique_id, credentials)
+
+    rendition_names = {r["name"] for r in video.rendition_list}
+    if (
+        not video.hls_path
+        or rendition not in rendition_names
+        or not HLS_FILENAME_PATTERN.match(filename)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="HLS resource not found"
+        )
+
+    file_path = os.path.join(video.hls_path, rendition, filename)
+
+    if filename.endswith(".m3u8"):
+        return _hls_playlist_response(file_path, credentials)
+
+    if not os.path.exists(file_path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Segment not found"
+        )
+
+    return build_file_response(
+        request,
+        file_path,
+        media_type=HLS_SEGMENT_MEDIA_TYPE,
+        headers=_stream_cache_headers(token_data),
+        cache_key=(video.unique_id, f"{rendition}/{filename}"),
+    )
+
+
 @router.get("/thumbnail/{video_id}")
 async def get_video_thumbnail(
     video_id: int,
     current_user: Optional[User] = Depends(get_current_user_optional),
-    db: Session = Depends(get_db),
 ):
     """Get video thumbnail"""
 
-    video_service = VideoService(db)
-
-    # Allow thumbnail access for admin or with valid context
-    if current_user and current_user.is_admin:
-        video = video_service.get_video_by_id(video_id, current_user)
-    else:
-        # For public access, you might want to add additional checks
-        video = (
-            video_service.get_video_by_id(video_id, current_user)
-            if current_user
-            else None
-        )
+    async with AsyncSessionLocal() as db:
+        video_service = AsyncVideoService(db)
+
+        # Allow thumbnail access for admin or with valid context
+        if current_user and current_user.is_admin:
+            video = await video_service.get_video_by_id(video_id, current_user)
+        else:
+            # For public access, you might want to add additional checks
+            video = (
+                await video_service.get_video_by_id(video_id, current_user)
+                if current_user
+                else None
+            )
 
     if not video:
         raise HTTPException(
@@ -272,41 +642,221 @@ async def get_video_thumbnail(
     )
 
 
-@router.get("/progress/{video_id}")
+@router.get("/sprites/{unique_id}/thumbnails.vtt")
+async def get_sprite_track(
+    unique_id: str, credentials: dict = Depends(stream_credentials)
+):
+    """WebVTT thumbnail track for seek previews (Public endpoint)"""
+
+    video, token_data = await _authorize_stream(unique_id, credentials)
+
+    track_path = (
+        os.path.join(video.sprites_path, SPRITE_VTT_NAME)
+        if video.sprites_path
+        else None
+    )
+    if not track_path or not os.path.exists(track_path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Thumbnail track not available for this video",
+        )
+
+    with open(track_path, "r") as f:
+        track = f.read()
+
+    # Carry the caller's credentials into the sprite URLs (before #xywh=)
+    query = urlencode(credentials)
+    track = re.sub(r"^(sprite_\d{3}\.jpg)#", rf"\1?{query}#", track, flags=re.M)
+
+    return Response(
+        content=track,
+        media_type=VTT_MEDIA_TYPE,
+        headers=_private_cache_headers(token_data),
+    )
+
+
+@router.get("/sprites/{unique_id}/{filename}")
+async def get_sprite_sheet(
+    request: Request,
+    unique_id: str,
+    filename: str,
+    credentials: dict = Depends(stream_credentials),
+):
+    """Trick-play sprite sheet referenced by the thumbnail track (Public endpoint)"""
+
+    video, token_data = await _authorize_stream(unique_id, credentials)
+
+    file_path = None
+    if video.sprites_path and SPRITE_FILENAME_PATTERN.match(filename):
+        file_path = os.path.join(video.sprites_path, filename)
+
+    if not file_path or not os.path.exists(file_path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Sprite sheet not found"
+        )
+
+    return build_file_response(
+        request,
+        file_path,
+        media_type="image/jpeg",
+        headers=_private_cache_headers(token_data),
+        cache_key=(video.unique_id, f"sprites/{filename}"),
+    )
+
+
+def _latest_progress(video: Video, latest: Optional[ProcessingEvent]) -> dict:
+    """Progress snapshot of a video from its most recent processing event"""
+    if latest is not None:
+        return progress_message(
+            video, latest.stage, latest.message, updated_at=latest.created_at
+        )
+
+    # Videos processed before events were recorded only have the log
+    message = None
+    if video.processing_log:
+        message = video.processing_log.rsplit("\n", 1)[-1]
+    return progress_message(video, message=message, updated_at=video.updated_at)
+
+
+async def _progress_snapshots(video_ids: List[int], user: User) -> List[dict]:
+    async with AsyncSessionLocal() as db:
+        video_service = AsyncVideoService(db)
+        videos = await video_service.get_videos_by_ids(video_ids, user)
+        latest = await video_service.get_latest_processing_events(video_ids)
+        return [_latest_progress(video, latest.get(video.id)) for video in videos]
+
+
+def _sse_message(payload: dict) -> str:
+    return f"data: {json.dumps(jsonable_encoder(payload))}\n\n"
+
+
+async def _progress_event_stream(video_ids: List[int], user: User):
+    """Current state of each video, then live updates until all are done"""
+    async with progress_broadcaster.subscribe(video_ids) as queue:
+        # Read the state only once subscribed, so no update falls in between
+        snapshots = await _progress_snapshots(video_ids, user)
+
+        yield f"retry: {settings.progress_sse_heartbeat * 1000}\n\n"
+
+        watching = set()
+        for snapshot in snapshots:
+            yield _sse_message(snapshot)
+            if snapshot["status"] not in FINAL_STATUSES:
+                watching.add(snapshot["video_id"])
+
+        while watching:
+            try:
+                payload = await asyncio.wait_for(
+                    queue.get(), settings.progress_sse_heartbeat
+                )
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                # Deletions are not published and an update can be lost with
+                # the subscription, so check the database on every beat
+                current = await _progress_snapshots(list(watching), user)
+                for snapshot in current:
+                    if snapshot["status"] in FINAL_STATUSES:
+                        yield _sse_message(snapshot)
+                watching = {
+                    snapshot["video_id"]
+                    for snapshot in current
+                    if snapshot["status"] not in FINAL_STATUSES
+                }
+                continue
+
+            if payload["video_id"] not in watching:
+                continue
+            yield _sse_message(payload)
+            if payload["status"] in FINAL_STATUSES:
+                watching.discard(payload["video_id"])
+
+
+@router.get("/progress/stream")
+async def stream_video_progress(
+    video_id: List[int] = Query(..., description="Video to watch, may repeat"),
+    current_admin: User = Depends(get_current_admin_user_or_cookie),
+):
+    """Stream processing progress as Server-Sent Events (Admin only)
+
+    Sends the current state of each video, then every update published by
+    the workers, relayed from this process's single Redis subscription. The
+    stream ends once all watched videos have completed, failed or been
+    deleted; the latter is noticed within a heartbeat. Accepts
+    the admin panel's cookie, since EventSource cannot set headers; no
+    database session is held while the stream is open.
+    """
+
+    video_ids = list(dict.fromkeys(video_id))
+    if len(video_ids) > settings.progress_sse_max_videos:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.progress_sse_max_videos} videos per stream",
+        )
+
+    if not await _progress_snapshots(video_ids, current_admin):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Video not found"
+        )
+
+    return StreamingResponse(
+        _progress_event_stream(video_ids, current_admin),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get(
+    "/progress/{video_id}",
+    response_model=VideoProgressResponse,
+    response_model_exclude_none=True,
+)
 async def get_video_progress(
     video_id: int,
+    events: bool = Query(False, description="Include the processing history"),
+    page: int = Query(1, ge=1),
+    per_page: int = Query(50, ge=1, le=200),
     current_admin: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """Get video processing progress (Admin only)"""
+    """Get video processing progress (Admin only)
 
-    video_service = VideoService(db)
-    video = video_service.get_video_by_id(video_id, current_admin)
+    Returns the latest processing state; pass ``events=true`` for a page
+    of the processing history, newest first.
+    """
+
+    video_service = AsyncVideoService(db)
+    video = await video_service.get_video_by_id(video_id, current_admin)
 
     if not video:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Video not found"
         )
 
-    return {
-        "video_id": video.id,
-        "status": video.status,
-        "progress": video.upload_progress,
-        "message": video.processing_log,
-        "error": video.error_message,
-    }
+    latest = await video_service.get_latest_processing_event(video.id)
+    progress = _latest_progress(video, latest)
+
+    if events:
+        history = await video_service.get_processing_events(video.id, page, per_page)
+        progress.update(
+            events=history["items"],
+            total_events=history["total"],
+            page=history["page"],
+            pages=history["pages"],
+        )
+
+    return progress
 
 
 @router.post("/{video_id}/generate-token")
 async def generate_streaming_token(
     video_id: int,
     current_admin: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Generate secure streaming token for video (Admin only)"""
 
-    video_service = VideoService(db)
-    token = video_service.generate_streaming_token(video_id, current_admin)
+    video_service = AsyncVideoService(db)
+    token = await video_service.generate_streaming_token(video_id, current_admin)
 
     if not token:
         raise HTTPException(
@@ -314,10 +864,26 @@ async def generate_streaming_token(
             detail="Video not found or not ready for streaming",
         )
 
-    video = video_service.get_video_by_id(video_id, current_admin)
+    video = await video_service.get_video_by_id(video_id, current_admin)
+
+    hls_url = None
+    if video.hls_path:
+        hls_url = f"{settings.api_prefix}/video/hls/{video.unique_id}/master.m3u8?token={token}"
+
+    thumbnails_url = None
+    if video.sprites_path:
+        thumbnails_url = f"{settings.api_prefix}/video/sprites/{video.unique_id}/thumbnails.vtt?token={token}"
+
+    # Signed URL alternative: verified with one HMAC instead of a JWT decode
+    signed_query = urlencode(
+        generate_signed_stream_params(video.unique_id, current_admin.id)
+    )
 
     return {
         "streaming_url": f"{settings.api_prefix}/video/stream/{video.unique_id}?token={token}",
+        "signed_streaming_url": f"{settings.api_prefix}/video/stream/{video.unique_id}?{signed_query}",
+        "hls_url": hls_url,
+        "thumbnails_url": thumbnails_url,
         "token": token,
         "expires_in": 3600,  # 1 hour
         "video_id": video_id,
@@ -33,6 +33,10 @@ class Settings(BaseSettings):
     secret_key: str
     algorithm: str
     access_token_expire_minutes: int
+    principal_cache_size: int = 10000  # Authenticated users kept in memory
+    principal_cache_ttl: int = 30  # Seconds a cached user is trusted
+    password_hash_workers: int = 2  # Threads running bcrypt per API process
+    password_hash_queue_limit: int = 16  # Waiting hashes before 503 responses
 
     # Admin
     admin_username: str
@@ -44,12 +48,51 @@ class Settings(BaseSettings):
     video_dir: str
     max_file_size: int
     allowed_video_types: str
+    upload_chunk_size: int = 8 * 1024 * 1024  # Rounded down to 4MB multiples
+    upload_session_ttl_hours: int = 24  # Unfinished uploads expire after this
+
+    # Streaming
+    stream_transport: str = "auto"  # "auto" uses zero-copy ASGI extensions
+    stream_chunk_size: int = 1024 * 1024  # Bytes per read in chunked mode
+    # Per process, 0 disables it; invalidation on update/delete only reaches
+    # the process handling that request, others age entries out by LRU
+    segment_cache_max_bytes: int = 256 * 1024 * 1024
+    stream_cache_mode: str = "no-store"  # "private" lets browsers reuse bytes
+    stream_cache_max_age: int = 3600  # Capped by the token's remaining lifetime
+    stream_token_cache_size: int = 10000  # Verified video tokens kept in memory
+    stream_token_cache_ttl: int = 300  # Seconds a verified token is trusted
+    video_metadata_cache_size: int = 10000  # unique_id lookups kept in memory
+    video_metadata_cache_ttl: int = 60
+    # Share entries and invalidations across processes; without it the local
+    # tier is disabled when WEB_CONCURRENCY runs several API workers
+    video_metadata_cache_redis: bool = False
+    video_metadata_cache_channel: str = "video_meta_invalidate"
+    keyframe_index_cache_size: int = 1000  # Decoded indexes for /seek lookups
+
+    # Packaging
+    video_packaging_mode: str = "mp4"  # "mp4" or "hls"
+    hls_renditions: str = "1080p,720p,480p,360p,audio"
+    hls_segment_seconds: int = 6
+    transcode_chunk_seconds: int = 0  # > 0 encodes conversions in parallel chunks
+    single_decode_processing: bool = False  # Poster frame from the conversion pass
+    video_stills: int = 0  # Extra evenly spaced stills per video
+    sprite_interval: int = 10  # Seconds between trick-play tiles, 0 disables
+    sprite_tile_width: int = 160
+    sprite_columns: int = 10
+    sprite_rows: int = 10
+
+    # Processing progress
+    progress_pubsub: bool = True  # Workers publish progress to Redis for SSE
+    progress_channel: str = "video_progress"
+    progress_sse_heartbeat: int = 15  # Seconds between SSE keep-alives/DB checks
+    progress_sse_max_videos: int = 100  # Videos one event stream may watch
 
     # Application
     app_name: str
     app_version: str
     debug: bool
     api_prefix: str
+    web_concurrency: int = 1  # API worker processes (as read by uvicorn/gunicorn)
 
     # CORS
     allowed_origins: str
@@ -79,6 +122,11 @@ class Settings(BaseSettings):
         """Convert comma-separated string to list"""
         return [ext.strip() for ext in self.allowed_video_types.split(",")]
 
+    @property
+    def hls_renditions_list(self) -> List[str]:
+        """Convert comma-separated string to list"""
+        return [name.strip() for name in self.hls_renditions.split(",") if name.strip()]
+
     @property
     def allowed_origins_list(self) -> List[str]:
         """Convert comma-separated string to list"""
@@ -1,6 +1,7 @@
 import logging
 
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
@@ -32,6 +33,38 @@ else:
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def get_async_database_url(database_url: str) -> str:
+    """Map a sync database URL onto its asyncio driver"""
+    if database_url.startswith("postgresql://"):
+        return database_url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    if database_url.startswith("sqlite://"):
+        return database_url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    return database_url
+
+
+# Create async engine for the FastAPI endpoints (asyncpg / aiosqlite)
+if "sqlite" in settings.database_url:
+    async_engine = create_async_engine(
+        get_async_database_url(settings.database_url),
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+else:
+    async_engine = create_async_engine(
+        get_async_database_url(settings.database_url),
+        pool_size=10,
+        max_overflow=20,
+        pool_pre_ping=True,
+        pool_recycle=300,
+        echo=False,
+    )
+
+# Objects stay usable after commit since handlers return them after the session
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 # Create Base class for models
 Base = declarative_base()
 
@@ -50,11 +83,22 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """Async database session dependency"""
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception as e:
+            logger.error(f"Database session error: {e}")
+            await db.rollback()
+            raise
+
+
 async def init_db():
     """Initialize database tables"""
     try:
         # Import all models to ensure they are registered
-        from app.models import user, video
+        from app.models import asset, processing, upload, user, video
 
         # Create all tables
         Base.metadata.create_all(bind=engine)
@@ -69,6 +113,7 @@ async def close_db():
     """Close database connections"""
     try:
         engine.dispose()
+        await async_engine.dispose()
         logger.info("Database connections closed")
     except Exception as e:
         logger.error(f"Error closing database: {e}")
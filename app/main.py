@@ -13,6 +13,8 @@ from app.api.video import router as video_router
 from app.config import settings
 from app.database import close_db, init_db
 from app.middleware.auth import AdminAuthMiddleware
+from app.services.progress_channel import progress_broadcaster
+from app.services.video_cache import video_metadata_cache
 from app.utils.helpers import create_directory_structure
 
 # Configure logging
@@ -53,6 +55,8 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     logger.info("Shutting down Video Streaming Service...")
+    await progress_broadcaster.close()
+    await video_metadata_cache.close()
     await close_db()
     logger.info("Application shutdown complete")
 
@@ -1,111 +1,125 @@
 import logging
+import re
+from typing import Iterable, Optional
 
 from fastapi import HTTPException, Request, status
 from fastapi.responses import RedirectResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import Response
+from starlette.types import ASGIApp, Receive, Scope, Send
 
-from app.database import SessionLocal
 from app.utils.security import verify_token
 
 logger = logging.getLogger(__name__)
 
-
-import logging
-
-logger = logging.getLogger(__name__)
-
-
-class AdminAuthMiddleware(BaseHTTPMiddleware):
-    """Middleware to protect admin routes"""
-
-    def __init__(self, app, protected_paths: list = None):
-        super().__init__(app)
+# Path prefixes that never require admin authentication
+DEFAULT_SKIP_PATHS = (
+    "/auth/login",
+    "/auth/login-json",
+    "/admin/login",  # Admin login page
+    "/admin/logout",  # Admin logout
+    "/admin/debug",  # Debug endpoint
+    "/docs",
+    "/redoc",
+    "/openapi.json",
+    "/static",
+    "/health",  # Health check
+)
+
+# Paths skipped only on an exact match ("/" as a prefix would match everything)
+DEFAULT_SKIP_EXACT_PATHS = ("/",)
+
+
+def compile_path_matcher(
+    prefixes: Iterable[str], exact: Iterable[str] = ()
+) -> Optional[re.Pattern]:
+    """Compile path prefixes and exact paths into a single regex"""
+    alternatives = [re.escape(path) + r"\Z" for path in sorted(set(exact))]
+    alternatives += [
+        re.escape(prefix) for prefix in sorted(set(prefixes), key=len, reverse=True)
+    ]
+    if not alternatives:
+        return None
+    return re.compile("|".join(alternatives))
+
+
+class AdminAuthMiddleware:
+    """Pure ASGI middleware protecting admin routes.
+
+    Requests outside the protected prefixes are handed straight to the app,
+    so streaming responses pass through without any wrapping. For protected
+    paths the token is read from the Authorization header or the
+    ``access_token`` cookie and the user is stored in ``request.state``.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        protected_paths: Optional[list] = None,
+        skip_paths: Iterable[str] = DEFAULT_SKIP_PATHS,
+        skip_exact_paths: Iterable[str] = DEFAULT_SKIP_EXACT_PATHS,
+    ):
+        self.app = app
         self.protected_paths = protected_paths or ["/admin"]
-
-    async def dispatch(self, request: Request, call_next):
-        # Check if the path requires admin authentication
-        path = request.url.path
-
-        # Skip authentication for certain paths
-        skip_paths = [
-            "/auth/login",
-            "/auth/login-json",
-            "/admin/login",  # Admin login page
-            "/admin/logout",  # Admin logout
-            "/admin/debug",  # Debug endpoint
-            "/docs",
-            "/redoc",
-            "/openapi.json",
-            "/static",
-            "/health",  # Health check
-            "/",  # Root path
-            #  "/api/v1/video/stream/", # Video streaming (has own token check)
-        ]
-
-        if any(path.startswith(skip_path) for skip_path in skip_paths):
-            logger.info(f"Skipping authentication for path: {path}")
-            return await call_next(request)
-
-        # Check if path requires admin access
-        if any(
-            path.startswith(protected_path) for protected_path in self.protected_paths
+        # Matched with re.match, i.e. anchored at the start of the path
+        self._protected = compile_path_matcher(self.protected_paths)
+        self._skip = compile_path_matcher(skip_paths, skip_exact_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        if (
+            self._protected is None
+            or not self._protected.match(path)
+            or (self._skip is not None and self._skip.match(path))
         ):
-            logger.info(f"Admin middleware - Protecting path: {path}")
-
-            # Get token from header or cookie
-            token = None
-
-            # Try to get token from Authorization header
-            auth_header = request.headers.get("Authorization")
-            if auth_header and auth_header.startswith("Bearer "):
-                token = auth_header.split(" ")[1]
-
-            # Try to get token from cookie
-            if not token:
-                token = request.cookies.get("access_token")
-
-            # Debug logging
-            logger.info(f"Admin middleware - Path: {path}")
-            logger.info(f"Admin middleware - Cookies: {dict(request.cookies)}")
-            logger.info(f"Admin middleware - Token found: {bool(token)}")
-
-            if not token:
-                logger.info("Admin middleware - No token found, redirecting to login")
-                return RedirectResponse(
-                    url="/admin/login", status_code=status.HTTP_302_FOUND
-                )
-
-            try:
-                # Verify token
-                payload = verify_token(token)
-                logger.info(f"Admin middleware - Token payload: {payload}")
-
-                # Check if user is admin
-                if not payload.get("is_admin", False):
-                    logger.info(
-                        "Admin middleware - User is not admin, redirecting to login"
-                    )
-                    return RedirectResponse(
-                        url="/admin/login", status_code=status.HTTP_302_FOUND
-                    )
-
-                # Add user info to request state
-                request.state.user_id = payload.get("user_id")
-                request.state.username = payload.get("sub")
-                request.state.is_admin = payload.get("is_admin", False)
-                logger.info(
-                    f"Admin middleware - User authenticated: {request.state.username}"
-                )
-
-            except HTTPException as e:
-                logger.error(f"Admin middleware - Token verification failed: {e}")
-                return RedirectResponse(
-                    url="/admin/login", status_code=status.HTTP_302_FOUND
-                )
-
-        response = await call_next(request)
-        return response
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+
+        # Get token from Authorization header, then from cookie
+        token = None
+        auth_header = request.headers.get("authorization")
+        if auth_header and auth_header.startswith("Bearer "):
+            token = auth_header.split(" ")[1]
+        if not token:
+            token = request.cookies.get("access_token")
+
+        if not token:
+            logger.debug(f"Admin middleware - No token for {path}, redirecting")
+            await self._redirect_to_login(scope, receive, send)
+            return
+
+        try:
+            payload = verify_token(token)
+        except HTTPException as e:
+            logger.debug(f"Admin middleware - Token verification failed: {e.detail}")
+            await self._redirect_to_login(scope, receive, send)
+            return
+
+        if not payload.get("is_admin", False):
+            logger.debug(f"Admin middleware - Non-admin user for {path}, redirecting")
+            await self._redirect_to_login(scope, receive, send)
+            return
+
+        # Add user info to request state (backed by scope["state"])
+        request.state.user_id = payload.get("user_id")
+        request.state.username = payload.get("sub")
+        request.state.is_admin = payload.get("is_admin", False)
+        logger.debug(f"Admin middleware - {request.state.username} -> {path}")
+
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    async def _redirect_to_login(scope: Scope, receive: Receive, send: Send) -> None:
+        response = RedirectResponse(
+            url="/admin/login", status_code=status.HTTP_302_FOUND
+        )
+        await response(scope, receive, send)
 
 
 class CORSMiddleware(BaseHTTPMiddleware):
@@ -1,4 +1,16 @@
+from .asset import MediaAsset
+from .processing import ProcessingEvent
+from .upload import UploadChunk, UploadSession, UploadSessionStatus
 from .user import User
 from .video import Video, VideoStatus
 
-__all__ = ["User", "Video", "VideoStatus"]  # noqa: F401, F403
+__all__ = [
+    "MediaAsset",
+    "ProcessingEvent",
+    "UploadChunk",
+    "UploadSession",
+    "UploadSessionStatus",
+    "User",
+    "Video",
+    "VideoStatus",
+]  # noqa: F401, F403
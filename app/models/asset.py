@@ -0,0 +1,47 @@
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+)
+from sqlalchemy.orm import deferred, relationship
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class MediaAsset(Base):
+    """Processed files shared by every video uploaded with the same content"""
+
+    __tablename__ = "media_assets"
+
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String(64), unique=True, index=True, nullable=False)
+
+    # Processed artifacts
+    file_path = Column(String(500), nullable=False)
+    file_size = Column(BigInteger, nullable=True)
+    thumbnail_path = Column(String(500), nullable=True)
+    hls_path = Column(String(500), nullable=True)
+    renditions = Column(Text, nullable=True)
+    sprites_path = Column(String(500), nullable=True)
+    keyframe_index = deferred(Column(LargeBinary, nullable=True))
+
+    # Probed metadata, copied onto videos sharing the asset
+    duration = Column(Integer, nullable=True)
+    resolution = Column(String(20), nullable=True)
+    format = Column(String(10), nullable=True)
+
+    # Number of live (not deleted) videos using these files
+    ref_count = Column(Integer, nullable=False, default=0)
+
+    videos = relationship("Video", back_populates="asset")
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<MediaAsset(id={self.id}, refs={self.ref_count})>"
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy.orm import relationship
+
+from app.database import Base
+
+
+class ProcessingEvent(Base):
+    """One step of a video's processing, appended and never updated"""
+
+    __tablename__ = "processing_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    video_id = Column(Integer, ForeignKey("videos.id", ondelete="CASCADE"), index=True)
+    stage = Column(String(50), nullable=False)  # e.g. "metadata", "hls"
+    message = Column(Text, nullable=True)
+    duration_ms = Column(Integer, nullable=True)  # Time since the previous event
+
+    # Set when the event happens; events are written in batches at commit
+    created_at = Column(DateTime(timezone=True), nullable=False)
+
+    video = relationship("Video", back_populates="processing_events")
+
+    def __repr__(self):
+        return f"<ProcessingEvent(video_id={self.video_id}, stage='{self.stage}')>"
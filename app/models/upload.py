@@ -0,0 +1,88 @@
+import enum
+import uuid
+
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+    UniqueConstraint,
+)
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class UploadSessionStatus(str, enum.Enum):
+    ACTIVE = "active"
+    COMPLETING = "completing"
+    COMPLETED = "completed"
+    ABORTED = "aborted"
+
+
+class UploadSession(Base):
+    """A resumable upload whose chunks are written straight into temp_path"""
+
+    __tablename__ = "upload_sessions"
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    title = Column(String(255), nullable=False)
+    description = Column(Text, nullable=True)
+    original_filename = Column(String(255), nullable=False)
+
+    # Layout of the preallocated temporary file
+    temp_path = Column(String(500), nullable=False)
+    total_size = Column(BigInteger, nullable=False)
+    chunk_size = Column(Integer, nullable=False)
+    total_chunks = Column(Integer, nullable=False)
+
+    status = Column(
+        Enum(UploadSessionStatus), default=UploadSessionStatus.ACTIVE, index=True
+    )
+
+    # Relationships
+    uploaded_by_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    video_id = Column(Integer, ForeignKey("videos.id"), nullable=True)
+    chunks = relationship(
+        "UploadChunk", back_populates="session", cascade="all, delete-orphan"
+    )
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self):
+        return f"<UploadSession(id={self.id}, status='{self.status}')>"
+
+    def chunk_length(self, index: int) -> int:
+        """Expected byte length of a chunk (the last one may be shorter)"""
+        if index == self.total_chunks - 1:
+            return self.total_size - index * self.chunk_size
+        return self.chunk_size
+
+
+class UploadChunk(Base):
+    """A chunk of an upload session that has been fully written to disk"""
+
+    __tablename__ = "upload_chunks"
+    __table_args__ = (
+        UniqueConstraint("session_id", "chunk_index", name="uq_upload_chunk"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(
+        String(36), ForeignKey("upload_sessions.id", ondelete="CASCADE"), index=True
+    )
+    chunk_index = Column(Integer, nullable=False)
+    size = Column(Integer, nullable=False)
+    block_digests = Column(LargeBinary, nullable=True)  # ContentHasher blocks
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    session = relationship("UploadSession", back_populates="chunks")
@@ -1,4 +1,5 @@
 import enum
+import json
 import uuid
 
 from sqlalchemy import (
@@ -8,10 +9,11 @@ from sqlalchemy import (
     Enum,
     ForeignKey,
     Integer,
+    LargeBinary,
     String,
     Text,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 
 from app.database import Base
@@ -39,6 +41,9 @@ class Video(Base):
     original_filename = Column(String(255), nullable=False)
     file_path = Column(String(500), nullable=True)  # Path to processed video
     file_size = Column(BigInteger, nullable=True)  # Size in bytes
+    content_hash = Column(
+        String(64), nullable=True, index=True
+    )  # BLAKE2b content digest of the upload
     duration = Column(Integer, nullable=True)  # Duration in seconds
     resolution = Column(String(20), nullable=True)  # e.g., "1920x1080"
     format = Column(String(10), nullable=True)  # e.g., "mp4"
@@ -46,16 +51,29 @@ class Video(Base):
     # Processing status
     status = Column(Enum(VideoStatus), default=VideoStatus.UPLOADING, index=True)
     upload_progress = Column(Integer, default=0)  # Progress percentage
-    processing_log = Column(Text, nullable=True)
+    processing_log = Column(Text, nullable=True)  # Legacy; see processing_events
     error_message = Column(Text, nullable=True)
 
     # Streaming information
     streaming_url = Column(String(500), nullable=True)  # Secure streaming URL
     thumbnail_path = Column(String(500), nullable=True)
+    hls_path = Column(String(500), nullable=True)  # Directory with master.m3u8
+    renditions = Column(Text, nullable=True)  # JSON list of HLS renditions
+    sprites_path = Column(String(500), nullable=True)  # Trick-play sheets + VTT
+    # Packed (ms, byte offset) pairs; deferred, only /seek and processing read it
+    keyframe_index = deferred(Column(LargeBinary, nullable=True))
 
     # Relationships
     uploaded_by_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     uploaded_by = relationship("User", back_populates="videos")
+    asset_id = Column(Integer, ForeignKey("media_assets.id"), nullable=True)
+    asset = relationship("MediaAsset", back_populates="videos")
+    processing_events = relationship(
+        "ProcessingEvent",
+        back_populates="video",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
 
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -81,6 +99,11 @@ class Video(Base):
         seconds = self.duration % 60
         return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
 
+    @property
+    def rendition_list(self):
+        """Return HLS renditions as a list of dicts"""
+        return json.loads(self.renditions) if self.renditions else []
+
     @property
     def is_completed(self):
         return self.status == VideoStatus.COMPLETED
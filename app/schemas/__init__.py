@@ -1,5 +1,7 @@
 from .auth import Token, TokenData, User, UserCreate, UserLogin, UserUpdate
 from .video import (
+    UploadSessionCreate,
+    UploadSessionResponse,
     VideoCreate,
     VideoListResponse,
     VideoProgressResponse,
@@ -25,4 +27,6 @@ __all__ = [
     "VideoStatsResponse",
     "VideoStreamResponse",
     "VideoProgressResponse",
+    "UploadSessionCreate",
+    "UploadSessionResponse",
 ]
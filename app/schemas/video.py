@@ -3,6 +3,7 @@ from typing import List, Optional
 
 from pydantic import BaseModel
 
+from app.models.upload import UploadSessionStatus
 from app.models.video import VideoStatus
 
 
@@ -25,6 +26,7 @@ class VideoResponse(VideoBase):
     unique_id: str
     original_filename: str
     file_size: Optional[int] = None
+    content_hash: Optional[str] = None
     duration: Optional[int] = None
     resolution: Optional[str] = None
     format: Optional[str] = None
@@ -32,6 +34,8 @@ class VideoResponse(VideoBase):
     upload_progress: int
     streaming_url: Optional[str] = None
     thumbnail_path: Optional[str] = None
+    hls_path: Optional[str] = None
+    sprites_path: Optional[str] = None
     uploaded_by_id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
@@ -72,6 +76,25 @@ class VideoUploadResponse(BaseModel):
     message: str
 
 
+class UploadSessionCreate(VideoBase):
+    filename: str
+    total_size: int
+
+
+class UploadSessionResponse(BaseModel):
+    upload_id: str
+    title: str
+    original_filename: str
+    status: UploadSessionStatus
+    total_size: int
+    chunk_size: int
+    total_chunks: int
+    received_chunks: List[int]
+    missing_chunks: List[int]
+    expires_at: datetime
+    video_id: Optional[int] = None
+
+
 class VideoStatsResponse(BaseModel):
     total_videos: int
     completed_videos: int
@@ -87,11 +110,27 @@ class VideoStreamResponse(BaseModel):
     expires_in: int
 
 
+class ProcessingEventResponse(BaseModel):
+    stage: str
+    message: Optional[str] = None
+    duration_ms: Optional[int] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 class VideoProgressResponse(BaseModel):
     video_id: int
     status: VideoStatus
     progress: int
+    stage: Optional[str] = None
     message: Optional[str] = None
     error: Optional[str] = None
-    message: Optional[str] = None
-    error: Optional[str] = None
+    updated_at: Optional[datetime] = None
+
+    # Processing history, only when requested with ?events=true
+    events: Optional[List[ProcessingEventResponse]] = None
+    total_events: Optional[int] = None
+    page: Optional[int] = None
+    pages: Optional[int] = None
@@ -0,0 +1,131 @@
+import glob
+import logging
+import os
+import shutil
+from typing import Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.asset import MediaAsset
+from app.models.video import Video
+
+logger = logging.getLogger(__name__)
+
+# Columns copied between a video and the asset holding its processed files
+ASSET_FIELDS = (
+    "file_path",
+    "file_size",
+    "thumbnail_path",
+    "hls_path",
+    "renditions",
+    "sprites_path",
+    "keyframe_index",
+    "duration",
+    "resolution",
+    "format",
+)
+
+
+def find_asset(db: Session, content_hash: str) -> Optional[MediaAsset]:
+    """Get the asset processed from identical source content, if any"""
+    return (
+        db.query(MediaAsset)
+        .filter(MediaAsset.content_hash == content_hash)
+        .with_for_update()
+        .first()
+    )
+
+
+def attach_asset(db: Session, video: Video, asset: MediaAsset) -> None:
+    """Point the video at the asset's files and take a reference to it"""
+    for field in ASSET_FIELDS:
+        setattr(video, field, getattr(asset, field))
+
+    video.asset_id = asset.id
+    asset.ref_count = MediaAsset.ref_count + 1
+
+
+def register_asset(db: Session, video: Video) -> MediaAsset:
+    """Record a freshly processed video's files as the asset for its content.
+
+    If another worker registered the same content in the meantime, the
+    video is attached to that asset instead and its own outputs are removed.
+    """
+    asset = MediaAsset(
+        content_hash=video.content_hash,
+        ref_count=1,
+        **{field: getattr(video, field) for field in ASSET_FIELDS},
+    )
+    try:
+        with db.begin_nested():
+            db.add(asset)
+    except IntegrityError:
+        existing = find_asset(db, video.content_hash)
+        logger.info(
+            f"Content of video {video.id} was processed concurrently, "
+            f"sharing asset {existing.id}"
+        )
+        duplicate = {field: getattr(video, field) for field in ASSET_FIELDS}
+        attach_asset(db, video, existing)
+        db.flush()
+        remove_files(**duplicate)
+        return existing
+
+    video.asset_id = asset.id
+    return asset
+
+
+def release_asset(db: Session, video: Video) -> bool:
+    """Drop the video's reference to its asset.
+
+    The asset row is deleted with its last reference; returns True when
+    that happened and the files are no longer used by any video.
+    """
+    asset = (
+        db.query(MediaAsset)
+        .filter(MediaAsset.id == video.asset_id)
+        .with_for_update()
+        .first()
+    )
+    video.asset_id = None
+    if asset is None:
+        return False
+
+    asset.ref_count -= 1
+    if asset.ref_count > 0:
+        logger.info(f"Asset {asset.id} still used by {asset.ref_count} videos")
+        return False
+
+    db.delete(asset)
+    return True
+
+
+def remove_files(
+    file_path: Optional[str] = None,
+    thumbnail_path: Optional[str] = None,
+    hls_path: Optional[str] = None,
+    sprites_path: Optional[str] = None,
+    **_,
+) -> None:
+    """Delete processed files from disk"""
+    if file_path and os.path.exists(file_path):
+        os.remove(file_path)
+        logger.info(f"Deleted video file: {file_path}")
+
+    if thumbnail_path and os.path.exists(thumbnail_path):
+        os.remove(thumbnail_path)
+        logger.info(f"Deleted thumbnail: {thumbnail_path}")
+
+    # Extra stills are stored next to the poster as <poster>_<n>.jpg
+    if thumbnail_path:
+        for still in glob.glob(f"{os.path.splitext(thumbnail_path)[0]}_*.jpg"):
+            os.remove(still)
+
+    if hls_path and os.path.isdir(hls_path):
+        shutil.rmtree(hls_path)
+        logger.info(f"Deleted HLS renditions: {hls_path}")
+
+    if sprites_path and os.path.isdir(sprites_path):
+        shutil.rmtree(sprites_path)
+        logger.info(f"Deleted trick-play sprites: {sprites_path}")
@@ -1,19 +1,25 @@
 import logging
 from typing import Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.database import get_db
 from app.models.user import User
-from app.utils.security import verify_password, verify_token
+from app.schemas.auth import User as UserSchema
+from app.services.principal_cache import principal_cache
+from app.utils.security import password_hasher, verify_password, verify_token
 
 logger = logging.getLogger(__name__)
 
 # Security scheme
 security = HTTPBearer()
 
+# Same scheme without the automatic 403, for endpoints with a cookie fallback
+optional_security = HTTPBearer(auto_error=False)
+
 
 class AuthService:
     def __init__(self, db: Session):
@@ -62,12 +68,67 @@ class AuthService:
             return None
 
 
+class AsyncAuthService:
+    """AuthService variant running on an AsyncSession"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def authenticate_user(self, username: str, password: str) -> Optional[User]:
+        """Authenticate user with username and password"""
+        try:
+            user = await self.get_user_by_username(username)
+
+            if not user:
+                logger.warning(f"Authentication failed: User '{username}' not found")
+                return None
+
+            if not user.is_active:
+                logger.warning(f"Authentication failed: User '{username}' is inactive")
+                return None
+
+            if not await password_hasher.verify(password, user.hashed_password):
+                logger.warning(
+                    f"Authentication failed: Invalid password for user '{username}'"
+                )
+                return None
+
+            logger.info(f"User '{username}' authenticated successfully")
+            return user
+
+        except HTTPException:
+            # Password hashing is saturated; let the client retry
+            raise
+        except Exception as e:
+            logger.error(f"Authentication error: {e}")
+            return None
+
+    async def get_user_by_username(self, username: str) -> Optional[User]:
+        """Get user by username"""
+        try:
+            return await self.db.scalar(select(User).where(User.username == username))
+        except Exception as e:
+            logger.error(f"Error getting user by username: {e}")
+            return None
+
+    async def get_user_by_id(self, user_id: int) -> Optional[User]:
+        """Get user by ID"""
+        try:
+            return await self.db.scalar(select(User).where(User.id == user_id))
+        except Exception as e:
+            logger.error(f"Error getting user by ID: {e}")
+            return None
+
+
 # Dependency to get current user from token
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
-) -> User:
-    """Get current authenticated user"""
+) -> UserSchema:
+    """Get current authenticated user
+
+    Users are resolved through the principal cache, so repeated calls with
+    the same token do not query the database.
+    """
 
     if not credentials:
         raise HTTPException(
@@ -79,19 +140,19 @@ async def get_current_user(
     # Verify token
     payload = verify_token(credentials.credentials)
     username: str = payload.get("sub")
+    user_id: int = payload.get("user_id")
 
-    if username is None:
+    if username is None or user_id is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # Get user from database
-    auth_service = AuthService(db)
-    user = auth_service.get_user_by_username(username)
+    # Get user from cache or database
+    user = await principal_cache.get(user_id)
 
-    if user is None:
+    if user is None or user.username != username:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
@@ -110,8 +171,8 @@ async def get_current_user(
 
 # Dependency to get current admin user
 async def get_current_admin_user(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: UserSchema = Depends(get_current_user),
+) -> UserSchema:
     """Get current authenticated admin user"""
 
     if not current_user.is_admin:
@@ -122,12 +183,37 @@ async def get_current_admin_user(
     return current_user
 
 
+# Admin authentication for browser event streams
+async def get_current_admin_user_or_cookie(
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+) -> UserSchema:
+    """Get current admin user from the bearer token or the login cookie
+
+    EventSource cannot send an Authorization header, so event streams opened
+    by the admin pages authenticate with the panel's access_token cookie.
+    """
+
+    if credentials is None:
+        token = request.cookies.get("access_token")
+        if token:
+            credentials = HTTPAuthorizationCredentials(
+                scheme="Bearer", credentials=token
+            )
+
+    return await get_current_admin_user(await get_current_user(credentials))
+
+
 # Optional authentication (for public endpoints that can benefit from user context)
 async def get_current_user_optional(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    db: Session = Depends(get_db),
-) -> Optional[User]:
-    """Get current user if authenticated, otherwise return None"""
+) -> Optional[UserSchema]:
+    """Get current user if authenticated, otherwise return None
+
+    Resolved through the principal cache, whose short-lived session keeps
+    file-serving endpoints from holding a pooled connection for the whole
+    response.
+    """
 
     if not credentials:
         return None
@@ -135,14 +221,14 @@ async def get_current_user_optional(
     try:
         payload = verify_token(credentials.credentials)
         username: str = payload.get("sub")
+        user_id: int = payload.get("user_id")
 
-        if username is None:
+        if username is None or user_id is None:
             return None
 
-        auth_service = AuthService(db)
-        user = auth_service.get_user_by_username(username)
+        user = await principal_cache.get(user_id)
 
-        if user and user.is_active:
+        if user and user.is_active and user.username == username:
             return user
 
     except HTTPException:
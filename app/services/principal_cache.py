@@ -0,0 +1,89 @@
+import logging
+from typing import Optional
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, object_session
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.user import User
+from app.schemas.auth import User as UserSchema
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# session.info key collecting user ids to invalidate once the session commits
+PENDING_INVALIDATIONS_KEY = "invalidated_principals"
+
+
+class PrincipalCache:
+    """Short-lived user id -> authenticated user snapshot cache.
+
+    Entries are pydantic ``schemas.auth.User`` snapshots rather than ORM
+    instances, so they can be shared between requests without a session.
+    Any change to a user flushed through the ORM (deactivation, admin flag,
+    rename, deletion) drops its entry when the transaction commits; the TTL
+    bounds staleness for changes made outside this process.
+    """
+
+    def __init__(self, max_entries: int, ttl: int):
+        self.local = TTLCache(max_entries=max_entries, ttl=ttl)
+
+    async def get(self, user_id: int) -> Optional[UserSchema]:
+        principal = self.local.get(user_id)
+        if principal is not None:
+            return principal
+
+        async with AsyncSessionLocal() as db:
+            user = await db.scalar(select(User).where(User.id == user_id))
+            if user is None:
+                return None
+            principal = UserSchema.model_validate(user)
+
+        self.local.set(user_id, principal)
+        return principal
+
+    def invalidate(self, user_id: int) -> None:
+        self.local.delete(user_id)
+        logger.debug(f"Invalidated cached principal for user {user_id}")
+
+    def clear(self) -> None:
+        self.local.clear()
+
+
+# Process-wide cache of authenticated users
+principal_cache = PrincipalCache(
+    max_entries=settings.principal_cache_size,
+    ttl=settings.principal_cache_ttl,
+)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _queue_principal_invalidation(mapper, connection, target: User) -> None:
+    """Remember changed users; they are invalidated after the commit"""
+    session = object_session(target)
+    if session is None:
+        principal_cache.invalidate(target.id)
+        return
+
+    session.info.setdefault(PENDING_INVALIDATIONS_KEY, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_principal_invalidations(session: Session) -> None:
+    # A released savepoint is not durable yet; wait for the outer commit
+    if session.in_nested_transaction():
+        return
+
+    for user_id in session.info.pop(PENDING_INVALIDATIONS_KEY, ()):
+        principal_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_principal_invalidations(session: Session) -> None:
+    # Only a rollback of the outer transaction undoes the queued changes
+    if session.in_nested_transaction():
+        return
+
+    session.info.pop(PENDING_INVALIDATIONS_KEY, None)
@@ -0,0 +1,96 @@
+import logging
+import time
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+
+from app.models.processing import ProcessingEvent
+from app.models.video import Video
+from app.services.progress_channel import progress_message, progress_publisher
+
+logger = logging.getLogger(__name__)
+
+# session.info key collecting events to insert when the session commits
+PENDING_EVENTS_KEY = "pending_processing_events"
+
+# session.info key holding video id -> monotonic time of its last event
+EVENT_CLOCK_KEY = "processing_event_clock"
+
+# session.info keys for the videos with queued events, and the progress
+# snapshots to publish once their events are committed
+EVENT_VIDEOS_KEY = "processing_event_videos"
+PENDING_PUBLISH_KEY = "pending_progress_messages"
+
+
+def record_event(
+    db: Session, video: Video, stage: str, message: Optional[str] = None
+) -> None:
+    """Queue a processing event for the video.
+
+    Events are buffered on the session and inserted together in one
+    statement by the next commit, so a stage costs no extra round trip.
+    ``duration_ms`` is the time since the video's previous event in this
+    session, i.e. how long the stage that just ended took. Once committed,
+    the latest event of each video is published to progress subscribers.
+    """
+    now = time.monotonic()
+    clock = db.info.setdefault(EVENT_CLOCK_KEY, {})
+    previous = clock.get(video.id)
+    clock[video.id] = now
+
+    db.info.setdefault(EVENT_VIDEOS_KEY, {})[video.id] = video
+    db.info.setdefault(PENDING_EVENTS_KEY, []).append(
+        {
+            "video_id": video.id,
+            "stage": stage,
+            "message": message,
+            "duration_ms": None if previous is None else int((now - previous) * 1000),
+            "created_at": datetime.utcnow(),
+        }
+    )
+    logger.debug(f"Video {video.id} [{stage}] {message}")
+
+
+@event.listens_for(Session, "before_commit")
+def _insert_pending_events(session: Session) -> None:
+    # Savepoints (e.g. register_asset) fire commit events too; events belong
+    # to the outer transaction, which may still roll the savepoint back
+    if session.in_nested_transaction():
+        return
+
+    pending = session.info.pop(PENDING_EVENTS_KEY, None)
+    videos = session.info.pop(EVENT_VIDEOS_KEY, {})
+    if not pending:
+        return
+
+    session.execute(insert(ProcessingEvent), pending)
+
+    # Snapshot state now: instances are expired once the commit completes
+    latest = {row["video_id"]: row for row in pending}
+    session.info[PENDING_PUBLISH_KEY] = [
+        progress_message(videos[video_id], row["stage"], row["message"])
+        for video_id, row in latest.items()
+    ]
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed_events(session: Session) -> None:
+    if session.in_nested_transaction():
+        return
+
+    for payload in session.info.pop(PENDING_PUBLISH_KEY, ()):
+        progress_publisher.publish(payload)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_events(session: Session) -> None:
+    # A rolled back savepoint (e.g. register_asset losing a race) leaves the
+    # outer transaction, and the events it queued, in place
+    if session.in_nested_transaction():
+        return
+
+    session.info.pop(PENDING_EVENTS_KEY, None)
+    session.info.pop(EVENT_VIDEOS_KEY, None)
+    session.info.pop(PENDING_PUBLISH_KEY, None)
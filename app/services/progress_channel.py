@@ -0,0 +1,151 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Dict, Iterable, Optional, Set
+
+import redis
+import redis.asyncio as aioredis
+
+from app.config import settings
+from app.models.video import Video
+
+logger = logging.getLogger(__name__)
+
+# Statuses after which a video sends no more progress
+FINAL_STATUSES = ("completed", "failed", "deleted")
+
+
+def progress_message(
+    video: Video,
+    stage: Optional[str] = None,
+    message: Optional[str] = None,
+    **extra,
+) -> dict:
+    """Progress snapshot of a video, as published and sent to SSE clients"""
+    return {
+        "video_id": video.id,
+        "status": video.status.value if video.status else None,
+        "progress": video.upload_progress,
+        "stage": stage,
+        "message": message,
+        "error": video.error_message,
+        **extra,
+    }
+
+
+class ProgressPublisher:
+    """Publishes progress snapshots from the workers to a Redis channel.
+
+    Delivery is best effort: a Redis outage is logged and never fails the
+    processing task, and the database stays the source of truth.
+    """
+
+    def __init__(self, channel: str, enabled: bool):
+        self.channel = channel
+        # Short connect timeout so an unreachable Redis cannot stall encodes
+        self.redis = (
+            redis.Redis.from_url(settings.redis_url, socket_connect_timeout=2)
+            if enabled
+            else None
+        )
+
+    def publish(self, payload: dict) -> None:
+        if self.redis is None:
+            return
+
+        try:
+            self.redis.publish(self.channel, json.dumps(payload, default=str))
+        except redis.RedisError as e:
+            logger.warning(f"Progress publish failed: {e}")
+
+
+class ProgressBroadcaster:
+    """Fans progress from one Redis subscription out to the API's SSE clients.
+
+    The subscription is opened with the first subscriber and shared by every
+    stream in the process; each stream gets a bounded queue of snapshots for
+    the videos it watches. Snapshots supersede each other, so a client that
+    falls behind loses its oldest ones rather than slowing the others down.
+    """
+
+    queue_size = 32
+    retry_delay = 5.0
+
+    def __init__(self, channel: str):
+        self.channel = channel
+        self.subscribers: Dict[int, Set[asyncio.Queue]] = defaultdict(set)
+        self._listener: Optional[asyncio.Task] = None
+
+    @asynccontextmanager
+    async def subscribe(self, video_ids: Iterable[int]):
+        """Queue receiving the progress snapshots of the given videos"""
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        video_ids = set(video_ids)
+        for video_id in video_ids:
+            self.subscribers[video_id].add(queue)
+
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+        try:
+            yield queue
+        finally:
+            for video_id in video_ids:
+                queues = self.subscribers.get(video_id)
+                if queues is not None:
+                    queues.discard(queue)
+                    if not queues:
+                        del self.subscribers[video_id]
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    async def _listen(self) -> None:
+        while True:
+            client = aioredis.Redis.from_url(settings.redis_url)
+            try:
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    logger.info(f"Subscribed to progress channel {self.channel}")
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self._dispatch(message["data"])
+            except (redis.RedisError, OSError) as e:
+                logger.warning(
+                    f"Progress subscription lost: {e}; "
+                    f"retrying in {self.retry_delay}s"
+                )
+            finally:
+                await client.aclose()
+
+            await asyncio.sleep(self.retry_delay)
+
+    def _dispatch(self, raw: bytes) -> None:
+        try:
+            payload = json.loads(raw)
+            queues = self.subscribers.get(payload["video_id"], ())
+        except (ValueError, KeyError, TypeError):
+            logger.warning(f"Ignoring malformed progress message: {raw!r}")
+            return
+
+        for queue in tuple(queues):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(payload)
+
+
+# Worker side: where processing tasks report progress
+progress_publisher = ProgressPublisher(
+    channel=settings.progress_channel, enabled=settings.progress_pubsub
+)
+
+# API side: one shared subscription per process for the SSE endpoint
+progress_broadcaster = ProgressBroadcaster(channel=settings.progress_channel)
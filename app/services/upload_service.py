@@ -0,0 +1,375 @@
+import logging
+import math
+import os
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, List
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.models.upload import UploadChunk, UploadSession, UploadSessionStatus
+from app.models.user import User
+from app.models.video import Video, VideoStatus
+from app.tasks.video_tasks import process_video
+from app.utils.helpers import (
+    CONTENT_HASH_BLOCK_SIZE,
+    ContentHasher,
+    calculate_content_hash,
+    combine_block_digests,
+    hash_and_pwrite,
+    validate_video_filename,
+)
+from app.utils.security import generate_secure_filename
+
+logger = logging.getLogger(__name__)
+
+# Request body pieces are coalesced into writes of about this size
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+
+def preallocate_file(path: str, size: int) -> None:
+    """Create a file of the final upload size so chunks can be written in place"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        try:
+            os.posix_fallocate(fd, 0, size)
+        except (AttributeError, OSError):
+            # Not supported on this platform / filesystem: sparse file instead
+            os.ftruncate(fd, size)
+    finally:
+        os.close(fd)
+
+
+class UploadService:
+    """Resumable uploads: create a session, PUT chunks in any order, complete.
+
+    The temporary file is preallocated at its final size and every chunk is
+    written straight to its offset, so completing an upload needs no
+    assembly step; the file is handed to ``process_video`` as is.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_session(
+        self,
+        title: str,
+        description: str,
+        filename: str,
+        total_size: int,
+        user: User,
+    ) -> UploadSession:
+        """Validate the upload and preallocate its temporary file"""
+
+        validate_video_filename(filename, total_size)
+        if total_size <= 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="total_size must be positive",
+            )
+
+        # Chunks must be whole hash blocks for their digests to combine
+        chunk_size = max(
+            settings.upload_chunk_size
+            // CONTENT_HASH_BLOCK_SIZE
+            * CONTENT_HASH_BLOCK_SIZE,
+            CONTENT_HASH_BLOCK_SIZE,
+        )
+        temp_path = os.path.join(
+            settings.upload_dir, "temp", generate_secure_filename(filename)
+        )
+        await run_in_threadpool(preallocate_file, temp_path, total_size)
+
+        upload = UploadSession(
+            title=title,
+            description=description,
+            original_filename=filename,
+            temp_path=temp_path,
+            total_size=total_size,
+            chunk_size=chunk_size,
+            total_chunks=math.ceil(total_size / chunk_size),
+            status=UploadSessionStatus.ACTIVE,
+            uploaded_by_id=user.id,
+            expires_at=datetime.now(timezone.utc)
+            + timedelta(hours=settings.upload_session_ttl_hours),
+        )
+        self.db.add(upload)
+        await self.db.commit()
+
+        logger.info(
+            f"Created upload session {upload.id} "
+            f"({total_size} bytes in {upload.total_chunks} chunks)"
+        )
+        return upload
+
+    async def get_session(self, upload_id: str, user: User) -> UploadSession:
+        """Get an upload session visible to the user or raise 404"""
+
+        stmt = select(UploadSession).where(UploadSession.id == upload_id)
+        if not user.is_admin:
+            stmt = stmt.where(UploadSession.uploaded_by_id == user.id)
+
+        upload = await self.db.scalar(stmt)
+        if not upload:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found"
+            )
+        return upload
+
+    async def received_chunks(self, upload: UploadSession) -> List[int]:
+        """Indexes of chunks already written, in ascending order"""
+
+        result = await self.db.scalars(
+            select(UploadChunk.chunk_index)
+            .where(UploadChunk.session_id == upload.id)
+            .order_by(UploadChunk.chunk_index)
+        )
+        return list(result)
+
+    async def write_chunk(
+        self, upload: UploadSession, index: int, body: AsyncIterator[bytes]
+    ) -> int:
+        """Write one chunk at its offset; re-sending a chunk overwrites it"""
+
+        self._ensure_active(upload)
+        if not 0 <= index < upload.total_chunks:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Chunk index must be between 0 and {upload.total_chunks - 1}",
+            )
+
+        upload_id = upload.id
+        expected = upload.chunk_length(index)
+        offset = index * upload.chunk_size
+
+        # Release the pooled connection while the chunk body streams in
+        await self.db.commit()
+
+        # Chunks start on a hash block boundary, so their block digests
+        # concatenate into the digest of the whole file
+        hasher = ContentHasher()
+        fd = await run_in_threadpool(os.open, upload.temp_path, os.O_WRONLY)
+        try:
+            written = await self._write_body(fd, offset, expected, body, hasher)
+        finally:
+            os.close(fd)
+
+        if written != expected:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Chunk {index} must be {expected} bytes, got {written}",
+            )
+
+        # complete() or expiry may have ended the session while the body
+        # streamed in; the chunk is only recorded while it is still active
+        await self._lock_active(upload)
+
+        block_digests = hasher.block_digests()
+        chunk_id = await self.db.scalar(
+            select(UploadChunk.id).where(
+                UploadChunk.session_id == upload_id,
+                UploadChunk.chunk_index == index,
+            )
+        )
+        if chunk_id is None:
+            self.db.add(
+                UploadChunk(
+                    session_id=upload_id,
+                    chunk_index=index,
+                    size=written,
+                    block_digests=block_digests,
+                )
+            )
+        else:
+            # Chunk was uploaded before and its bytes have just been rewritten
+            await self.db.execute(
+                update(UploadChunk)
+                .where(UploadChunk.id == chunk_id)
+                .values(size=written, block_digests=block_digests)
+            )
+        await self.db.commit()
+
+        return written
+
+    async def complete(self, upload: UploadSession) -> Video:
+        """Create the video once every chunk is in and start processing"""
+
+        self._ensure_active(upload)
+
+        # Only one concurrent complete() may proceed
+        result = await self.db.execute(
+            update(UploadSession)
+            .where(
+                UploadSession.id == upload.id,
+                UploadSession.status == UploadSessionStatus.ACTIVE,
+            )
+            .values(status=UploadSessionStatus.COMPLETING)
+        )
+        if result.rowcount != 1:
+            await self.db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Upload is already being completed",
+            )
+
+        received = await self.db.scalar(
+            select(func.count(UploadChunk.id)).where(
+                UploadChunk.session_id == upload.id
+            )
+        )
+        missing = upload.total_chunks - received
+        if missing:
+            await self.db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"{missing} chunks are still missing",
+            )
+
+        # Size and content hash are usually known without reading the file
+        # again; a chunk without stored digests means hashing it from disk
+        chunk_digests = (
+            await self.db.scalars(
+                select(UploadChunk.block_digests)
+                .where(UploadChunk.session_id == upload.id)
+                .order_by(UploadChunk.chunk_index)
+            )
+        ).all()
+        if all(digests is not None for digests in chunk_digests):
+            content_hash = combine_block_digests(b"".join(chunk_digests))
+        else:
+            logger.warning(f"Upload {upload.id} lacks chunk digests, rehashing file")
+            _, content_hash = await run_in_threadpool(
+                calculate_content_hash, upload.temp_path
+            )
+
+        video = Video(
+            title=upload.title,
+            description=upload.description,
+            original_filename=upload.original_filename,
+            file_size=upload.total_size,
+            content_hash=content_hash,
+            status=VideoStatus.UPLOADING,
+            uploaded_by_id=upload.uploaded_by_id,
+            upload_progress=5,
+        )
+        self.db.add(video)
+        await self.db.flush()
+
+        upload.video_id = video.id
+        upload.status = UploadSessionStatus.COMPLETED
+        await self.db.commit()
+
+        # Start background processing task (the broker call blocks)
+        try:
+            task = await run_in_threadpool(
+                process_video.delay, video.id, upload.temp_path
+            )
+        except Exception as e:
+            # Reopen the session so the client can complete it again
+            logger.error(f"Could not queue processing for upload {upload.id}: {e}")
+            upload.status = UploadSessionStatus.ACTIVE
+            upload.video_id = None
+            await self.db.flush()
+            await self.db.delete(video)
+            await self.db.commit()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Processing queue unavailable, try completing again",
+            )
+
+        logger.info(
+            f"Upload {upload.id} completed as video {video.id}, "
+            f"started processing task {task.id}"
+        )
+        return video
+
+    async def abort(self, upload: UploadSession) -> None:
+        """Abort an unfinished upload and remove its temporary file"""
+
+        self._ensure_active(upload)
+        upload.status = UploadSessionStatus.ABORTED
+        await self.db.commit()
+
+        if os.path.exists(upload.temp_path):
+            await run_in_threadpool(os.remove, upload.temp_path)
+
+        logger.info(f"Aborted upload session {upload.id}")
+
+    async def _lock_active(self, upload: UploadSession) -> None:
+        """Lock the session row until commit, provided it is still active
+
+        complete() and abort() change the status with an UPDATE, so they wait
+        for this transaction and cannot interleave with it.
+        """
+        result = await self.db.execute(
+            update(UploadSession)
+            .where(
+                UploadSession.id == upload.id,
+                UploadSession.status == UploadSessionStatus.ACTIVE,
+            )
+            .values(status=UploadSessionStatus.ACTIVE)
+        )
+        if result.rowcount != 1:
+            await self.db.rollback()
+            await self.db.refresh(upload)
+
+        try:
+            self._ensure_active(upload)
+        except HTTPException:
+            await self.db.rollback()
+            raise
+
+    @staticmethod
+    def _ensure_active(upload: UploadSession) -> None:
+        if upload.status != UploadSessionStatus.ACTIVE:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Upload is {upload.status.value}",
+            )
+
+        expires_at = upload.expires_at
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        if expires_at <= datetime.now(timezone.utc):
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE, detail="Upload session expired"
+            )
+
+    @staticmethod
+    async def _write_body(
+        fd: int,
+        offset: int,
+        limit: int,
+        body: AsyncIterator[bytes],
+        hasher: ContentHasher,
+    ) -> int:
+        """Copy a request body to fd at offset, refusing more than limit bytes"""
+
+        written = 0
+        buffer = bytearray()
+        async for data in body:
+            if written + len(buffer) + len(data) > limit:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Chunk is larger than {limit} bytes",
+                )
+
+            buffer += data
+            if len(buffer) >= WRITE_BUFFER_SIZE:
+                await run_in_threadpool(
+                    hash_and_pwrite, hasher, fd, bytes(buffer), offset + written
+                )
+                written += len(buffer)
+                buffer.clear()
+
+        if buffer:
+            await run_in_threadpool(
+                hash_and_pwrite, hasher, fd, bytes(buffer), offset + written
+            )
+            written += len(buffer)
+
+        return written
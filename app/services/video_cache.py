@@ -0,0 +1,266 @@
+import asyncio
+import json
+import logging
+from typing import Any, NamedTuple, Optional, Tuple
+
+import redis
+import redis.asyncio as aioredis
+from sqlalchemy import select
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.video import Video, VideoStatus
+from app.utils.cache import TTLCache
+from app.utils.keyframes import KeyframeIndex
+
+logger = logging.getLogger(__name__)
+
+# Generation of a shared entry that could not be read; nothing is written back
+UNKNOWN_GENERATION = object()
+
+
+class VideoRecord(NamedTuple):
+    """Immutable snapshot of what the streaming endpoints need from a video"""
+
+    id: int
+    unique_id: str
+    title: str
+    status: VideoStatus
+    file_path: Optional[str]
+    original_filename: str
+    file_size: Optional[int]
+    hls_path: Optional[str]
+    renditions: Optional[str]
+    sprites_path: Optional[str] = None
+
+    @classmethod
+    def from_video(cls, video: Video) -> "VideoRecord":
+        return cls(
+            id=video.id,
+            unique_id=video.unique_id,
+            title=video.title,
+            status=video.status,
+            file_path=video.file_path,
+            original_filename=video.original_filename,
+            file_size=video.file_size,
+            hls_path=video.hls_path,
+            renditions=video.renditions,
+            sprites_path=video.sprites_path,
+        )
+
+    @property
+    def rendition_list(self):
+        """Return HLS renditions as a list of dicts"""
+        return json.loads(self.renditions) if self.renditions else []
+
+
+class VideoMetadataCache:
+    """Read-through unique_id -> VideoRecord cache.
+
+    An in-process TTL tier answers the hot path; an optional Redis tier
+    shares records between API processes. Only completed videos are cached,
+    since their path and status no longer change until they are updated or
+    deleted, and both of those invalidate the entry.
+
+    Invalidations are published on a Redis channel that every API process
+    listens to, so none of them keeps serving a deleted video from its local
+    tier. Without Redis they cannot leave the process, so the local tier is
+    only used when a single API worker is configured.
+
+    A record read from the database is only written back to a tier if no
+    invalidation arrived meanwhile: locally an invalidation counter must be
+    unchanged, and in Redis the key's generation, bumped by ``invalidate``,
+    must still be the one read before the load (checked under WATCH).
+    """
+
+    key_prefix = "video_meta:"
+    generation_prefix = "video_meta_gen:"
+    retry_delay = 5.0
+
+    def __init__(
+        self, max_entries: int, ttl: int, use_redis: bool, channel: str, workers: int
+    ):
+        self.ttl = ttl
+        self.channel = channel
+        local_ttl = ttl
+        if not use_redis and workers > 1:
+            logger.warning(
+                f"{workers} API workers without the Redis metadata cache tier: "
+                f"local video metadata caching is disabled"
+            )
+            local_ttl = 0
+        self.local = TTLCache(max_entries=max_entries, ttl=local_ttl)
+        self.redis = redis.Redis.from_url(settings.redis_url) if use_redis else None
+        self._listener: Optional[asyncio.Task] = None
+        self._invalidations = 0
+
+    async def get(self, unique_id: str) -> Optional[VideoRecord]:
+        if self.redis is not None and (self._listener is None or self._listener.done()):
+            self._listener = asyncio.create_task(self._listen())
+
+        record = self.local.get(unique_id)
+        if record is not None:
+            return record
+
+        invalidations = self._invalidations
+        record, generation = None, None
+        if self.redis is not None:
+            record, generation = await run_in_threadpool(self._get_shared, unique_id)
+
+        if record is None:
+            record = await self._load(unique_id)
+            if record is None:
+                return None
+            if self.redis is not None and record.status == VideoStatus.COMPLETED:
+                await run_in_threadpool(self._set_shared, record, generation)
+
+        if (
+            record.status == VideoStatus.COMPLETED
+            and self._invalidations == invalidations
+        ):
+            self.local.set(unique_id, record)
+
+        return record
+
+    def invalidate(self, unique_id: str) -> None:
+        self._drop_local(unique_id)
+        if self.redis is None:
+            return
+
+        generation_key = self.generation_prefix + unique_id
+        try:
+            with self.redis.pipeline() as pipe:
+                pipe.delete(self.key_prefix + unique_id)
+                pipe.incr(generation_key)
+                # Outlives any read-through that started before this call
+                pipe.expire(generation_key, self.ttl * 2)
+                pipe.publish(self.channel, unique_id)
+                pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Video metadata cache invalidation failed: {e}")
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    async def _listen(self) -> None:
+        """Drop local entries invalidated by any process"""
+        while True:
+            client = aioredis.Redis.from_url(settings.redis_url)
+            try:
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    # Invalidations sent while unsubscribed were missed
+                    self.local.clear()
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self._drop_local(message["data"].decode())
+            except (redis.RedisError, OSError) as e:
+                logger.warning(
+                    f"Video metadata invalidation subscription lost: {e}; "
+                    f"retrying in {self.retry_delay}s"
+                )
+            finally:
+                await client.aclose()
+
+            await asyncio.sleep(self.retry_delay)
+
+    def _drop_local(self, unique_id: str) -> None:
+        self._invalidations += 1
+        self.local.delete(unique_id)
+
+    async def _load(self, unique_id: str) -> Optional[VideoRecord]:
+        async with AsyncSessionLocal() as db:
+            video = await db.scalar(select(Video).where(Video.unique_id == unique_id))
+            return VideoRecord.from_video(video) if video else None
+
+    def _get_shared(self, unique_id: str) -> Tuple[Optional[VideoRecord], Any]:
+        """Shared record, if any, and the key's current generation"""
+        if self.redis is None:
+            return None, UNKNOWN_GENERATION
+
+        try:
+            raw, generation = self.redis.mget(
+                self.key_prefix + unique_id, self.generation_prefix + unique_id
+            )
+        except redis.RedisError as e:
+            logger.warning(f"Video metadata cache read failed: {e}")
+            return None, UNKNOWN_GENERATION
+
+        if raw is None:
+            return None, generation
+
+        data = json.loads(raw)
+        data["status"] = VideoStatus(data["status"])
+        return VideoRecord(**data), generation
+
+    def _set_shared(self, record: VideoRecord, generation: Any) -> None:
+        """Store a loaded record unless it was invalidated since generation"""
+        if self.redis is None or generation is UNKNOWN_GENERATION:
+            return
+
+        data = record._asdict()
+        data["status"] = record.status.value
+        generation_key = self.generation_prefix + record.unique_id
+        try:
+            with self.redis.pipeline() as pipe:
+                pipe.watch(generation_key)
+                if pipe.get(generation_key) != generation:
+                    return
+                pipe.multi()
+                pipe.set(
+                    self.key_prefix + record.unique_id, json.dumps(data), ex=self.ttl
+                )
+                pipe.execute()
+        except redis.WatchError:
+            logger.debug(f"Video {record.unique_id} invalidated while loading")
+        except redis.RedisError as e:
+            logger.warning(f"Video metadata cache write failed: {e}")
+
+
+class KeyframeIndexCache:
+    """unique_id -> KeyframeIndex, decoded once per process for repeated seeks"""
+
+    def __init__(self, max_entries: int, ttl: int):
+        self.local = TTLCache(max_entries=max_entries, ttl=ttl)
+
+    async def get(self, unique_id: str) -> Optional[KeyframeIndex]:
+        index = self.local.get(unique_id)
+        if index is not None:
+            return index
+
+        async with AsyncSessionLocal() as db:
+            packed = await db.scalar(
+                select(Video.keyframe_index).where(Video.unique_id == unique_id)
+            )
+        if not packed:
+            return None
+
+        index = KeyframeIndex.from_bytes(packed)
+        self.local.set(unique_id, index)
+        return index
+
+    def invalidate(self, unique_id: str) -> None:
+        self.local.delete(unique_id)
+
+
+# Process-wide video metadata cache for the streaming hot path
+video_metadata_cache = VideoMetadataCache(
+    max_entries=settings.video_metadata_cache_size,
+    ttl=settings.video_metadata_cache_ttl,
+    use_redis=settings.video_metadata_cache_redis,
+    channel=settings.video_metadata_cache_channel,
+    workers=settings.web_concurrency,
+)
+
+# Keyframe indexes of recently seeked videos
+keyframe_index_cache = KeyframeIndexCache(
+    max_entries=settings.keyframe_index_cache_size,
+    ttl=settings.video_metadata_cache_ttl,
+)
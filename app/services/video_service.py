@@ -1,17 +1,30 @@
 import logging
 import os
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
 import aiofiles
-from fastapi import HTTPException, UploadFile, status
-from sqlalchemy import func
+from fastapi import HTTPException, Request, UploadFile, status
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.config import settings
+from app.models.processing import ProcessingEvent
 from app.models.user import User
 from app.models.video import Video, VideoStatus
+from app.services.asset_store import release_asset, remove_files
+from app.services.video_cache import video_metadata_cache
 from app.tasks.video_tasks import process_video
-from app.utils.helpers import get_file_size, paginate_query, validate_video_file
+from app.utils.cache import segment_cache
+from app.utils.helpers import (
+    ContentHasher,
+    get_file_size,
+    paginate_query,
+    paginate_select,
+    validate_video_file,
+)
+from app.utils.multipart import StreamingUploadParser
 from app.utils.security import generate_secure_filename, generate_video_token
 
 logger = logging.getLogger(__name__)
@@ -21,80 +34,6 @@ class VideoService:
     def __init__(self, db: Session):
         self.db = db
 
-    async def upload_video(
-        self, file: UploadFile, title: str, description: str, user: User
-    ) -> Video:
-        """Handle video upload"""
-
-        # Validate file
-        validate_video_file(file)
-
-        try:
-            # Create video record
-            video = Video(
-                title=title,
-                description=description,
-                original_filename=file.filename,
-                status=VideoStatus.UPLOADING,
-                uploaded_by_id=user.id,
-                upload_progress=0,
-            )
-
-            self.db.add(video)
-            self.db.commit()
-            self.db.refresh(video)
-
-            logger.info(f"Created video record with ID: {video.id}")
-
-            # Generate secure filename for temporary storage
-            temp_filename = generate_secure_filename(file.filename)
-            temp_path = os.path.join(settings.upload_dir, "temp", temp_filename)
-
-            # Ensure temp directory exists
-            os.makedirs(os.path.dirname(temp_path), exist_ok=True)
-
-            # Save uploaded file to temporary location
-            await self._save_upload_file(file, temp_path)
-
-            # Update video record with progress
-            video.upload_progress = 5
-            self.db.commit()
-
-            # Start background processing task
-            task = process_video.delay(video.id, temp_path)
-
-            logger.info(f"Started processing task {task.id} for video {video.id}")
-
-            return video
-
-        except Exception as e:
-            logger.error(f"Error uploading video: {e}")
-            # Clean up video record if created
-            if "video" in locals():
-                self.db.delete(video)
-                self.db.commit()
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Upload failed: {str(e)}",
-            )
-
-    async def _save_upload_file(self, upload_file: UploadFile, destination: str):
-        """Save uploaded file to destination"""
-        try:
-            async with aiofiles.open(destination, "wb") as f:
-                chunk_size = 1024 * 1024  # 1MB chunks
-                while chunk := await upload_file.read(chunk_size):
-                    await f.write(chunk)
-
-            logger.info(f"File saved to: {destination}")
-
-        except Exception as e:
-            logger.error(f"Error saving file: {e}")
-            # Clean up partial file
-            if os.path.exists(destination):
-                os.remove(destination)
-            raise
-
     def get_video_by_id(self, video_id: int, user: User) -> Optional[Video]:
         """Get video by ID (admin can see all, users see only their own)"""
         query = self.db.query(Video).filter(Video.id == video_id)
@@ -166,6 +105,8 @@ class VideoService:
         self.db.commit()
         self.db.refresh(video)
 
+        video_metadata_cache.invalidate(video.unique_id)
+
         logger.info(f"Updated video {video_id}")
         return video
 
@@ -177,19 +118,28 @@ class VideoService:
             return False
 
         try:
-            # Delete physical files
-            if video.file_path and os.path.exists(video.file_path):
-                os.remove(video.file_path)
-                logger.info(f"Deleted video file: {video.file_path}")
-
-            if video.thumbnail_path and os.path.exists(video.thumbnail_path):
-                os.remove(video.thumbnail_path)
-                logger.info(f"Deleted thumbnail: {video.thumbnail_path}")
+            # Files shared through a content-addressed asset are only
+            # removed with its last reference
+            remove = True
+            if video.asset_id is not None:
+                remove = release_asset(self.db, video)
 
             # Update status instead of deleting record (for audit trail)
             video.status = VideoStatus.DELETED
             self.db.commit()
 
+            # Delete physical files
+            if remove:
+                remove_files(
+                    video.file_path,
+                    video.thumbnail_path,
+                    video.hls_path,
+                    video.sprites_path,
+                )
+
+            segment_cache.invalidate(video.unique_id)
+            video_metadata_cache.invalidate(video.unique_id)
+
             logger.info(f"Video {video_id} marked as deleted")
             return True
 
@@ -236,3 +186,271 @@ class VideoService:
             "total_size_bytes": total_size,
             "total_size_mb": round(total_size / (1024 * 1024), 2),
         }
+
+
+class AsyncVideoService:
+    """VideoService variant running on an AsyncSession"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def upload_video(
+        self, file: UploadFile, title: str, description: str, user: User
+    ) -> Video:
+        """Handle video upload"""
+
+        # Validate file
+        validate_video_file(file)
+
+        try:
+            # Create video record
+            video = Video(
+                title=title,
+                description=description,
+                original_filename=file.filename,
+                status=VideoStatus.UPLOADING,
+                uploaded_by_id=user.id,
+                upload_progress=0,
+            )
+
+            self.db.add(video)
+            await self.db.commit()
+
+            logger.info(f"Created video record with ID: {video.id}")
+
+            # Generate secure filename for temporary storage
+            temp_filename = generate_secure_filename(file.filename)
+            temp_path = os.path.join(settings.upload_dir, "temp", temp_filename)
+
+            # Ensure temp directory exists
+            os.makedirs(os.path.dirname(temp_path), exist_ok=True)
+
+            # Save uploaded file to temporary location, sizing and hashing it
+            file_size, content_hash = await self._save_upload_file(file, temp_path)
+
+            # Update video record with progress
+            video.file_size = file_size
+            video.content_hash = content_hash
+            video.upload_progress = 5
+            await self.db.commit()
+
+            # Start background processing task (the broker call blocks)
+            task = await run_in_threadpool(process_video.delay, video.id, temp_path)
+
+            logger.info(f"Started processing task {task.id} for video {video.id}")
+
+            return video
+
+        except Exception as e:
+            logger.error(f"Error uploading video: {e}")
+            # Clean up video record if created
+            if "video" in locals():
+                await self.db.rollback()
+                await self.db.delete(video)
+                await self.db.commit()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Upload failed: {str(e)}",
+            )
+
+    async def _save_upload_file(
+        self, upload_file: UploadFile, destination: str
+    ) -> Tuple[int, str]:
+        """Save uploaded file to destination, returning its size and content hash"""
+        hasher = ContentHasher()
+        try:
+            async with aiofiles.open(destination, "wb") as f:
+                chunk_size = 1024 * 1024  # 1MB chunks
+                while chunk := await upload_file.read(chunk_size):
+                    await run_in_threadpool(hasher.update, chunk)
+                    await f.write(chunk)
+
+            logger.info(f"File saved to: {destination}")
+            return hasher.size, hasher.hexdigest()
+
+        except Exception as e:
+            logger.error(f"Error saving file: {e}")
+            # Clean up partial file
+            if os.path.exists(destination):
+                os.remove(destination)
+            raise
+
+    async def upload_video_stream(self, request: Request, user: User) -> Video:
+        """Handle a multipart upload whose file part is streamed straight to disk
+
+        Takes the same form fields as ``upload_video`` but never
+        spools the body, and records size and content hash on the way.
+        """
+
+        temp_path = os.path.join(
+            settings.upload_dir, "temp", generate_secure_filename("upload")
+        )
+        parser = StreamingUploadParser(
+            request.headers,
+            request.stream(),
+            destination=temp_path,
+            max_size=settings.max_file_size,
+        )
+        fields = await parser.parse()
+
+        title = fields.get("title", "").strip()
+        if not title:
+            os.remove(temp_path)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Title is required"
+            )
+
+        video = Video(
+            title=title,
+            description=fields.get("description", ""),
+            original_filename=parser.filename,
+            file_size=parser.size,
+            content_hash=parser.content_hash,
+            status=VideoStatus.UPLOADING,
+            uploaded_by_id=user.id,
+            upload_progress=5,
+        )
+        video_id = None
+        try:
+            self.db.add(video)
+            await self.db.commit()
+            video_id = video.id
+
+            logger.info(f"Created video record with ID: {video_id}")
+
+            # Start background processing task (the broker call blocks)
+            task = await run_in_threadpool(process_video.delay, video_id, temp_path)
+
+            logger.info(f"Started processing task {task.id} for video {video_id}")
+
+            return video
+
+        except Exception as e:
+            logger.error(f"Error uploading video: {e}")
+            # Clean up the video record if it was created, and the file
+            await self.db.rollback()
+            if video_id is not None:
+                await self.db.execute(delete(Video).where(Video.id == video_id))
+                await self.db.commit()
+            if os.path.exists(temp_path):
+                await run_in_threadpool(os.remove, temp_path)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Upload failed: {str(e)}",
+            )
+
+    def _visible_videos(self, user: User):
+        """Select videos the user may see (admin can see all)"""
+        stmt = select(Video)
+
+        if not user.is_admin:
+            stmt = stmt.where(Video.uploaded_by_id == user.id)
+
+        return stmt
+
+    async def get_video_by_id(self, video_id: int, user: User) -> Optional[Video]:
+        """Get video by ID (admin can see all, users see only their own)"""
+        return await self.db.scalar(
+            self._visible_videos(user).where(Video.id == video_id)
+        )
+
+    async def get_videos_by_ids(self, video_ids: List[int], user: User) -> List[Video]:
+        """Get several videos by ID, skipping those the user cannot see"""
+        result = await self.db.scalars(
+            self._visible_videos(user).where(Video.id.in_(video_ids))
+        )
+        return result.all()
+
+    async def get_video_by_unique_id(self, unique_id: str) -> Optional[Video]:
+        """Get video by unique ID"""
+        return await self.db.scalar(select(Video).where(Video.unique_id == unique_id))
+
+    async def get_latest_processing_event(
+        self, video_id: int
+    ) -> Optional[ProcessingEvent]:
+        """Get the most recent processing event of a video"""
+        return await self.db.scalar(
+            select(ProcessingEvent)
+            .where(ProcessingEvent.video_id == video_id)
+            .order_by(ProcessingEvent.id.desc())
+            .limit(1)
+        )
+
+    async def get_latest_processing_events(
+        self, video_ids: List[int]
+    ) -> Dict[int, ProcessingEvent]:
+        """Get the most recent processing event of each video, by video ID"""
+        latest_ids = (
+            select(func.max(ProcessingEvent.id))
+            .where(ProcessingEvent.video_id.in_(video_ids))
+            .group_by(ProcessingEvent.video_id)
+        )
+        result = await self.db.scalars(
+            select(ProcessingEvent).where(ProcessingEvent.id.in_(latest_ids))
+        )
+        return {event.video_id: event for event in result}
+
+    async def get_processing_events(
+        self, video_id: int, page: int = 1, per_page: int = 50
+    ) -> dict:
+        """Get paginated processing history of a video, newest first"""
+        stmt = (
+            select(ProcessingEvent)
+            .where(ProcessingEvent.video_id == video_id)
+            .order_by(ProcessingEvent.id.desc())
+        )
+        return await paginate_select(self.db, stmt, page, per_page)
+
+    async def get_user_videos(
+        self,
+        user: User,
+        page: int = 1,
+        per_page: int = 10,
+        status_filter: Optional[VideoStatus] = None,
+    ) -> dict:
+        """Get paginated list of user's videos"""
+        stmt = self._visible_videos(user)
+
+        if status_filter:
+            stmt = stmt.where(Video.status == status_filter)
+
+        stmt = stmt.order_by(Video.created_at.desc())
+
+        return await paginate_select(self.db, stmt, page, per_page)
+
+    async def generate_streaming_token(
+        self, video_id: int, user: User
+    ) -> Optional[str]:
+        """Generate secure token for video streaming"""
+        video = await self.get_video_by_id(video_id, user)
+
+        if not video or video.status != VideoStatus.COMPLETED:
+            return None
+
+        return generate_video_token(video.id, user.id)
+
+    async def get_video_stats(self, user: User) -> dict:
+        """Get video statistics in a single aggregate query"""
+        processing_statuses = [VideoStatus.UPLOADING, VideoStatus.PROCESSING]
+        stmt = select(
+            func.count(Video.id),
+            func.count(Video.id).filter(Video.status == VideoStatus.COMPLETED),
+            func.count(Video.id).filter(Video.status.in_(processing_statuses)),
+            func.count(Video.id).filter(Video.status == VideoStatus.FAILED),
+            func.coalesce(func.sum(Video.file_size), 0),
+        )
+
+        if not user.is_admin:
+            stmt = stmt.where(Video.uploaded_by_id == user.id)
+
+        result = await self.db.execute(stmt)
+        total, completed, processing, failed, total_size = result.one()
+
+        return {
+            "total_videos": total,
+            "completed_videos": completed,
+            "processing_videos": processing,
+            "failed_videos": failed,
+            "total_size_bytes": total_size,
+            "total_size_mb": round(total_size / (1024 * 1024), 2),
+        }
@@ -108,25 +108,33 @@ function initializeTooltips() {
     });
 }
 
-// Auto-refresh for processing videos
+// Live progress for processing videos, pushed over one event stream
 function initializeAutoRefresh() {
     const processingElements = document.querySelectorAll('[data-video-status="processing"], [data-video-status="uploading"]');
+    const videoIds = [...processingElements].map(element => element.dataset.videoId).filter(Boolean);
 
-    if (processingElements.length > 0) {
-        // Refresh every 5 seconds if there are processing videos
-        setInterval(refreshProcessingVideos, 5000);
+    if (videoIds.length > 0) {
+        watchVideoProgress(videoIds);
     }
 }
 
-async function refreshProcessingVideos() {
-    const processingElements = document.querySelectorAll('[data-video-status="processing"], [data-video-status="uploading"]');
+function watchVideoProgress(videoIds) {
+    const query = videoIds.map(id => `video_id=${id}`).join('&');
+    const source = new EventSource(`/api/v1/video/progress/stream?${query}`);
+    const pending = new Set(videoIds.map(String));
+
+    source.onmessage = function (event) {
+        const data = JSON.parse(event.data);
+        updateVideoProgressUI(data.video_id, data);
 
-    for (const element of processingElements) {
-        const videoId = element.dataset.videoId;
-        if (videoId) {
-            await updateVideoProgress(videoId);
+        if (['completed', 'failed', 'deleted'].includes(data.status)) {
+            pending.delete(String(data.video_id));
+            if (pending.size === 0) {
+                // The server ends the stream; stop the browser reconnecting
+                source.close();
+            }
         }
-    }
+    };
 }
 
 async function updateVideoProgress(videoId) {
@@ -154,6 +162,10 @@ function updateVideoProgressUI(videoId, progressData) {
         } else if (progressData.status === 'failed') {
             statusElement.classList.add('bg-danger');
             statusElement.innerHTML = '<i class="bi bi-x-circle"></i> Failed';
+        } else if (progressData.status === 'deleted') {
+            statusElement.classList.add('bg-secondary');
+            statusElement.innerHTML = '<i class="bi bi-trash"></i> Deleted';
+            showToast('A video being processed was deleted', 'warning');
         } else if (progressData.status === 'processing') {
             statusElement.classList.add('bg-warning');
             statusElement.innerHTML = '<i class="bi bi-hourglass-split"></i> Processing';
@@ -1,28 +1,48 @@
 import json
 import logging
+import math
 import os
 import shutil
 import subprocess
+import time
 from datetime import datetime, timedelta
+from typing import Optional
 
-from celery import current_task
+from celery import chord, current_task
 from sqlalchemy.orm import Session
 
 from app.celery_app import celery_app
 from app.config import settings
 from app.database import SessionLocal
+from app.models.asset import MediaAsset
+from app.models.upload import UploadSession, UploadSessionStatus
 from app.models.video import Video, VideoStatus
-from app.utils.helpers import calculate_file_hash, get_file_size
+from app.services.asset_store import attach_asset, find_asset, register_asset
+from app.services.processing_events import record_event
+from app.services.progress_channel import progress_message, progress_publisher
+from app.services.video_cache import video_metadata_cache
+from app.utils.ffmpeg import (
+    FFmpegProgress,
+    child_cpu_seconds,
+    moov_before_mdat,
+    run_ffmpeg,
+)
+from app.utils.helpers import calculate_content_hash, place_file
+from app.utils.keyframes import extract_keyframe_index, keyframe_count
 from app.utils.security import generate_secure_filename
 
 logger = logging.getLogger(__name__)
 
+# Work directories of chunked transcodes, under the upload temp directory
+CHUNK_DIR_PREFIX = "chunks_"
+
 
 @celery_app.task(bind=True)
 def process_video(self, video_id: int, temp_file_path: str):
     """Process uploaded video file"""
 
     db: Session = SessionLocal()
+    cpu_start = child_cpu_seconds()
 
     try:
         # Get video record
@@ -34,7 +54,7 @@ def process_video(self, video_id: int, temp_file_path: str):
         # Update status to processing
         video.status = VideoStatus.PROCESSING
         video.upload_progress = 10
-        video.processing_log = "Starting video processing..."
+        record_event(db, video, "start", "Starting video processing")
         db.commit()
 
         # Update task progress
@@ -47,20 +67,24 @@ def process_video(self, video_id: int, temp_file_path: str):
         if not os.path.exists(temp_file_path):
             raise Exception(f"Temporary file not found: {temp_file_path}")
 
-        # Get file info
-        file_size = get_file_size(temp_file_path)
-        file_hash = calculate_file_hash(temp_file_path)
+        # Size and content hash are recorded at upload time; only read the
+        # whole file again for videos that arrived without them
+        if video.file_size is None or video.content_hash is None:
+            video.file_size, video.content_hash = calculate_content_hash(temp_file_path)
 
-        video.file_size = file_size
         video.upload_progress = 20
-        video.processing_log += "\nFile validation completed..."
-        db.commit()
+        record_event(db, video, "validate", "File validation completed")
 
         self.update_state(
             state="PROGRESS",
             meta={"current": 20, "total": 100, "status": "Validating file..."},
         )
 
+        # Identical content was processed before: share its files
+        asset = find_asset(db, video.content_hash)
+        if asset is not None:
+            return complete_from_asset(db, video, asset, temp_file_path)
+
         # Extract video metadata using ffprobe
         metadata = extract_video_metadata(temp_file_path)
 
@@ -68,7 +92,7 @@ def process_video(self, video_id: int, temp_file_path: str):
         video.resolution = metadata.get("resolution")
         video.format = metadata.get("format")
         video.upload_progress = 40
-        video.processing_log += f"\nMetadata extracted: {metadata}"
+        record_event(db, video, "metadata", describe_metadata(metadata))
         db.commit()
 
         self.update_state(
@@ -83,67 +107,54 @@ def process_video(self, video_id: int, temp_file_path: str):
         # Ensure directory exists
         os.makedirs(os.path.dirname(final_path), exist_ok=True)
 
-        # Process video (convert if needed)
-        processed_path = process_video_file(temp_file_path, final_path, self)
-
-        video.file_path = processed_path
-        video.upload_progress = 80
-        video.processing_log += f"\nVideo processed successfully: {processed_path}"
-        db.commit()
+        # Long conversions are split at keyframes and encoded in parallel
+        chunk_seconds = settings.transcode_chunk_seconds
+        if (
+            chunk_seconds > 0
+            and (video.duration or 0) > chunk_seconds
+            and plan_processing(metadata) == "transcode"
+        ):
+            return start_chunked_transcode(
+                db, video, temp_file_path, final_path, metadata
+            )
 
-        self.update_state(
-            state="PROGRESS",
-            meta={"current": 80, "total": 100, "status": "Generating thumbnail..."},
+        # Process video (convert if needed); in single-decode mode the
+        # conversion also writes the poster frame
+        poster_path = None
+        if settings.single_decode_processing:
+            poster_path = thumbnail_path_for(video.id)
+
+        progress = ProcessingProgress(self, db, video, 40, 70, "Processing video...")
+        processed_path, method = process_video_file(
+            temp_file_path,
+            final_path,
+            self,
+            progress,
+            poster_path,
+            thumbnail_offset(video.duration),
+            metadata,
         )
 
-        # Generate thumbnail
-        thumbnail_path = generate_thumbnail(processed_path, video.id)
-        video.thumbnail_path = thumbnail_path
-
-        # Generate streaming URL
-        streaming_url = f"/api/v1/video/stream/{video.unique_id}"
-        video.streaming_url = streaming_url
-
-        # Update final status
-        video.status = VideoStatus.COMPLETED
-        video.upload_progress = 100
-        video.completed_at = datetime.utcnow()
-        video.processing_log += "\nVideo processing completed successfully!"
-        db.commit()
-
-        # Clean up temporary file
-        try:
-            os.remove(temp_file_path)
-        except Exception as e:
-            logger.warning(f"Failed to remove temp file: {e}")
-
-        logger.info(f"Video {video_id} processed successfully")
-
-        return {
-            "video_id": video_id,
-            "status": "completed",
-            "file_path": processed_path,
-            "streaming_url": streaming_url,
-            "duration": video.duration,
-            "file_size": video.file_size,
-        }
+        return finish_processing(
+            self,
+            db,
+            video,
+            processed_path,
+            method,
+            metadata,
+            temp_file_path,
+            cpu_start,
+        )
 
     except Exception as e:
         logger.error(f"Error processing video {video_id}: {e}")
 
         # Update video status to failed
         if "video" in locals():
-            video.status = VideoStatus.FAILED
-            video.error_message = str(e)
-            video.processing_log += f"\nError: {str(e)}"
-            db.commit()
+            fail_processing(db, video, e)
 
         # Clean up temporary file
-        try:
-            if os.path.exists(temp_file_path):
-                os.remove(temp_file_path)
-        except Exception as cleanup_error:
-            logger.warning(f"Failed to clean up temp file: {cleanup_error}")
+        remove_temp_file(temp_file_path)
 
         return {"error": str(e), "video_id": video_id}
 
@@ -151,6 +162,256 @@ def process_video(self, video_id: int, temp_file_path: str):
         db.close()
 
 
+class ProcessingProgress:
+    """Map ffmpeg progress of one processing step onto the task and the video.
+
+    The step covers ``start``..``end`` of the overall percentage; reports
+    are throttled so a long encode updates the database every few seconds.
+    """
+
+    interval = 2.0
+
+    def __init__(self, task, db: Session, video: Video, start: int, end: int, status):
+        self.task = task
+        self.db = db
+        self.video = video
+        self.start = start
+        self.end = end
+        self.status = status
+        self.duration = video.duration
+        self._last_report = 0.0
+
+    def __call__(self, report: FFmpegProgress) -> None:
+        now = time.monotonic()
+        if not report.done and now - self._last_report < self.interval:
+            return
+        self._last_report = now
+
+        fraction = report.fraction(self.duration)
+        current = self.start
+        if fraction is not None:
+            current = self.start + int((self.end - self.start) * fraction)
+
+        eta = report.eta(self.duration)
+        if self.task:
+            self.task.update_state(
+                state="PROGRESS",
+                meta={
+                    "current": current,
+                    "total": 100,
+                    "status": self.status,
+                    "out_time": report.out_time,
+                    "speed": report.speed,
+                    "eta": eta,
+                },
+            )
+
+        changed = current != self.video.upload_progress
+        self.video.upload_progress = current
+        message = progress_message(
+            self.video,
+            message=self.status,
+            out_time=report.out_time,
+            speed=report.speed,
+            eta=eta,
+        )
+        if changed:
+            self.db.commit()
+        progress_publisher.publish(message)
+
+        logger.debug(
+            f"Video {self.video.id}: {self.status} {current}% "
+            f"(speed {report.speed}x, eta {eta}s)"
+        )
+
+
+def finish_processing(
+    task,
+    db: Session,
+    video: Video,
+    processed_path: str,
+    method: str,
+    metadata: dict,
+    temp_file_path: str,
+    cpu_start: Optional[float] = None,
+) -> dict:
+    """Package, thumbnail and complete a video whose main file is in place"""
+
+    video.file_path = processed_path
+    record_event(db, video, "process", f"Video processed ({method}): {processed_path}")
+
+    # Keyframe times and byte offsets, for time-based seeks into the file
+    video.keyframe_index = extract_keyframe_index(processed_path)
+    if video.keyframe_index:
+        record_event(
+            db,
+            video,
+            "keyframes",
+            f"Keyframe index: {keyframe_count(video.keyframe_index)} keyframes",
+        )
+
+    video.upload_progress = 70
+    db.commit()
+
+    # Package adaptive-bitrate HLS renditions
+    if settings.video_packaging_mode == "hls":
+        task.update_state(
+            state="PROGRESS",
+            meta={"current": 70, "total": 100, "status": "Packaging HLS..."},
+        )
+
+        hls_dir = os.path.join(settings.video_dir, "hls", video.unique_id)
+        progress = ProcessingProgress(task, db, video, 70, 80, "Packaging HLS...")
+        renditions = package_hls(processed_path, hls_dir, metadata, progress)
+
+        video.hls_path = hls_dir
+        video.renditions = json.dumps(renditions)
+        record_event(
+            db,
+            video,
+            "hls",
+            "HLS packaged: " + ", ".join(r["name"] for r in renditions),
+        )
+
+    video.upload_progress = 80
+    db.commit()
+
+    task.update_state(
+        state="PROGRESS",
+        meta={"current": 80, "total": 100, "status": "Generating thumbnail..."},
+    )
+
+    # Generate thumbnail, unless the conversion already wrote it
+    thumbnail_path = thumbnail_path_for(video.id)
+    if not (
+        settings.single_decode_processing
+        and method == "transcode"
+        and os.path.exists(thumbnail_path)
+    ):
+        thumbnail_path = generate_thumbnail(
+            processed_path, video.id, thumbnail_offset(video.duration)
+        )
+    video.thumbnail_path = thumbnail_path
+    record_event(db, video, "thumbnail", f"Thumbnail generated: {thumbnail_path}")
+
+    if settings.video_stills:
+        stills = generate_stills(
+            processed_path, video.id, video.duration, settings.video_stills
+        )
+        record_event(db, video, "stills", f"Extracted {len(stills)} stills")
+
+    # Trick-play sprite sheets for seek previews
+    if settings.sprite_interval > 0 and video.duration:
+        sprites_dir = os.path.join(settings.video_dir, "sprites", video.unique_id)
+        video.sprites_path = generate_sprites(
+            processed_path, sprites_dir, video.duration, metadata
+        )
+        if video.sprites_path:
+            record_event(
+                db, video, "sprites", f"Sprite sheets generated: {sprites_dir}"
+            )
+
+    cpu_seconds = None
+    if cpu_start is not None:
+        cpu_seconds = round(child_cpu_seconds() - cpu_start, 2)
+
+    # Generate streaming URL
+    streaming_url = f"/api/v1/video/stream/{video.unique_id}"
+    video.streaming_url = streaming_url
+
+    # Update final status
+    video.status = VideoStatus.COMPLETED
+    video.upload_progress = 100
+    video.completed_at = datetime.utcnow()
+    message = "Video processing completed successfully"
+    if cpu_seconds is not None:
+        message += f" (ffmpeg CPU time: {cpu_seconds}s)"
+    record_event(db, video, "complete", message)
+    register_asset(db, video)
+    db.commit()
+
+    # Drop any shared metadata cached for this video by the API processes
+    video_metadata_cache.invalidate(video.unique_id)
+
+    # Clean up temporary file (already gone if it was renamed into place)
+    remove_temp_file(temp_file_path)
+
+    logger.info(f"Video {video.id} processed successfully")
+
+    return {
+        "video_id": video.id,
+        "status": "completed",
+        "file_path": processed_path,
+        "streaming_url": streaming_url,
+        "duration": video.duration,
+        "file_size": video.file_size,
+        "cpu_seconds": cpu_seconds,
+    }
+
+
+def fail_processing(db: Session, video: Video, error: Exception) -> None:
+    """Record a processing error on the video"""
+    video.status = VideoStatus.FAILED
+    video.error_message = str(error)
+    record_event(db, video, "error", str(error))
+    db.commit()
+
+
+def remove_temp_file(temp_file_path: str) -> None:
+    try:
+        if os.path.exists(temp_file_path):
+            os.remove(temp_file_path)
+    except Exception as e:
+        logger.warning(f"Failed to remove temp file: {e}")
+
+
+def complete_from_asset(
+    db: Session, video: Video, asset: MediaAsset, temp_file_path: str
+) -> dict:
+    """Finish a duplicate upload with the files of an existing asset"""
+    attach_asset(db, video, asset)
+
+    video.streaming_url = f"/api/v1/video/stream/{video.unique_id}"
+    video.status = VideoStatus.COMPLETED
+    video.upload_progress = 100
+    video.completed_at = datetime.utcnow()
+    record_event(
+        db,
+        video,
+        "dedup",
+        f"Identical content already processed, sharing asset {asset.id}",
+    )
+    record_event(db, video, "complete", "Video processing completed successfully")
+    db.commit()
+
+    video_metadata_cache.invalidate(video.unique_id)
+    remove_temp_file(temp_file_path)
+
+    logger.info(f"Video {video.id} deduplicated onto asset {asset.id}")
+
+    return {
+        "video_id": video.id,
+        "status": "completed",
+        "file_path": video.file_path,
+        "streaming_url": video.streaming_url,
+        "duration": video.duration,
+        "file_size": video.file_size,
+        "asset_id": asset.id,
+    }
+
+
+def describe_metadata(metadata: dict) -> str:
+    """One-line summary of probed metadata for the processing history"""
+    parts = [
+        metadata.get("duration") and f"{metadata['duration']}s",
+        metadata.get("resolution"),
+        metadata.get("format"),
+        metadata.get("audio_format"),
+        metadata.get("container"),
+    ]
+    return "Metadata extracted: " + ", ".join(str(part) for part in parts if part)
+
+
 def extract_video_metadata(file_path: str) -> dict:
     """Extract video metadata using ffprobe"""
     try:
@@ -175,22 +436,35 @@ def extract_video_metadata(file_path: str) -> dict:
 
         # Extract video stream info
         video_stream = None
+        audio_stream = None
         for stream in data.get("streams", []):
-            if stream.get("codec_type") == "video":
+            if stream.get("codec_type") == "video" and video_stream is None:
                 video_stream = stream
-                break
+            elif stream.get("codec_type") == "audio" and audio_stream is None:
+                audio_stream = stream
 
-        metadata = {}
+        metadata = {"has_audio": audio_stream is not None}
 
         if video_stream:
             metadata["resolution"] = (
                 f"{video_stream.get('width', 0)}x{video_stream.get('height', 0)}"
             )
+            metadata["height"] = video_stream.get("height")
             metadata["format"] = video_stream.get("codec_name", "unknown")
+            metadata["profile"] = video_stream.get("profile")
+            metadata["pix_fmt"] = video_stream.get("pix_fmt")
+
+        if audio_stream:
+            metadata["audio_format"] = audio_stream.get("codec_name")
 
         format_info = data.get("format", {})
         duration = float(format_info.get("duration", 0))
         metadata["duration"] = int(duration) if duration > 0 else None
+        metadata["container"] = format_info.get("format_name")
+
+        # Players can only start an MP4 early if its index comes first
+        if is_mp4_container(metadata):
+            metadata["moov_first"] = moov_before_mdat(file_path)
 
         return metadata
 
@@ -199,26 +473,97 @@ def extract_video_metadata(file_path: str) -> dict:
         return {}
 
 
-def process_video_file(input_path: str, output_path: str, task=None) -> str:
-    """Process video file (convert to standard format if needed)"""
-    try:
-        # Check if we want to enable video conversion
-        enable_conversion = (
-            os.getenv("ENABLE_VIDEO_CONVERSION", "false").lower() == "true"
+def conversion_enabled() -> bool:
+    return os.getenv("ENABLE_VIDEO_CONVERSION", "false").lower() == "true"
+
+
+# Streams every browser plays from an MP4 without re-encoding
+WEB_VIDEO_PROFILES = {"Constrained Baseline", "Baseline", "Main", "High"}
+WEB_PIXEL_FORMATS = {"yuv420p", "yuvj420p"}
+WEB_AUDIO_FORMATS = {"aac"}
+
+
+def is_mp4_container(metadata: dict) -> bool:
+    formats = (metadata.get("container") or "").split(",")
+    return "mp4" in formats or "mov" in formats
+
+
+def is_web_compatible(metadata: dict) -> bool:
+    """Whether the probed source can be served as is (after a remux)"""
+    return (
+        is_mp4_container(metadata)
+        and metadata.get("format") == "h264"
+        and metadata.get("profile") in WEB_VIDEO_PROFILES
+        and metadata.get("pix_fmt") in WEB_PIXEL_FORMATS
+        and (
+            not metadata.get("has_audio")
+            or metadata.get("audio_format") in WEB_AUDIO_FORMATS
         )
+    )
+
+
+def plan_processing(metadata: Optional[dict]) -> str:
+    """Choose "transcode", "remux" (stream copy with faststart) or "place".
+
+    With conversion enabled only sources that are not web compatible are
+    re-encoded. Compatible MP4s, and any MP4 when conversion is off, are
+    remuxed if their moov box sits after the media data, else kept as is.
+    """
+    if metadata is None:
+        return "transcode" if conversion_enabled() else "place"
+
+    if conversion_enabled() and not is_web_compatible(metadata):
+        return "transcode"
+
+    if is_mp4_container(metadata) and metadata.get("moov_first") is False:
+        return "remux"
+
+    return "place"
+
+
+def process_video_file(
+    input_path: str,
+    output_path: str,
+    task=None,
+    progress=None,
+    thumbnail_path: Optional[str] = None,
+    thumbnail_at: float = 1.0,
+    metadata: Optional[dict] = None,
+) -> tuple:
+    """Process video file (convert to standard format if needed)
+
+    ``metadata`` from ``extract_video_metadata`` decides between a full
+    encode, a stream-copy remux and placing the file as is; without it,
+    every file is encoded when conversion is enabled. Returns
+    (output_path, method) where method is "transcode", "remux" or the
+    placement strategy used by ``place_file``. When converting with a
+    ``thumbnail_path``, the poster frame at ``thumbnail_at`` seconds is
+    taken from the same decode as a second output of the ffmpeg graph.
+    """
+    try:
+        # Re-encode only what players cannot handle as is
+        plan = plan_processing(metadata)
 
         if task:
             task.update_state(
                 state="PROGRESS",
-                meta={"current": 60, "total": 100, "status": "Processing video..."},
+                meta={"current": 40, "total": 100, "status": "Processing video..."},
             )
 
-        if enable_conversion:
+        if plan == "transcode":
             # Convert video using FFmpeg
-            cmd = [
-                "ffmpeg",
-                "-i",
-                input_path,
+            cmd = ["ffmpeg", "-i", input_path]
+            if thumbnail_path:
+                cmd += [
+                    "-filter_complex",
+                    f"[0:v]split=2[main][poster];"
+                    f"[poster]select='gte(t,{thumbnail_at})',{THUMBNAIL_SCALE}[thumb]",
+                    "-map",
+                    "[main]",
+                    "-map",
+                    "0:a:0?",
+                ]
+            cmd += [
                 "-c:v",
                 "libx264",  # H.264 video codec
                 "-preset",
@@ -234,23 +579,50 @@ def process_video_file(input_path: str, output_path: str, task=None) -> str:
                 "-y",  # Overwrite output file
                 output_path,
             ]
+            if thumbnail_path:
+                cmd += ["-map", "[thumb]", "-frames:v", "1", "-y", thumbnail_path]
 
             logger.info(f"Converting video with FFmpeg: {' '.join(cmd)}")
-            result = subprocess.run(
-                cmd, capture_output=True, text=True, timeout=1800
-            )  # 30 minutes timeout
+            result = run_ffmpeg(cmd, 1800, progress)  # 30 minutes timeout
 
             if result.returncode != 0:
                 logger.error(f"FFmpeg conversion failed: {result.stderr}")
                 raise Exception(f"Video conversion failed: {result.stderr}")
 
             logger.info("Video conversion completed successfully")
+            method = "transcode"
+        elif plan == "remux":
+            # Web-compatible streams: copy them, moving the index up front
+            cmd = [
+                "ffmpeg",
+                "-i",
+                input_path,
+                "-map",
+                "0:v:0",
+                "-map",
+                "0:a:0?",
+                "-c",
+                "copy",
+                "-movflags",
+                "+faststart",
+                "-y",
+                output_path,
+            ]
+
+            logger.info(f"Remuxing video with FFmpeg: {' '.join(cmd)}")
+            result = run_ffmpeg(cmd, 1800, progress)
+
+            if result.returncode != 0:
+                logger.error(f"FFmpeg remux failed: {result.stderr}")
+                raise Exception(f"Video remux failed: {result.stderr}")
+
+            method = "remux"
         else:
-            # Simple copy without conversion (faster for development)
-            logger.info("Copying video file without conversion")
-            shutil.copy2(input_path, output_path)
+            # No conversion: rename / reflink / hardlink, copy only as a fallback
+            method = place_file(input_path, output_path)
+            logger.info(f"Placed video file without conversion ({method})")
 
-        return output_path
+        return output_path, method
 
     except subprocess.TimeoutExpired:
         logger.error("Video conversion timed out")
@@ -260,38 +632,551 @@ def process_video_file(input_path: str, output_path: str, task=None) -> str:
         raise
 
 
-def generate_thumbnail(video_path: str, video_id: int) -> str:
+def start_chunked_transcode(
+    db: Session, video: Video, temp_file_path: str, final_path: str, metadata: dict
+) -> dict:
+    """Split the source and fan chunk encodes out to the workers as a chord"""
+
+    work_dir = os.path.join(
+        settings.upload_dir, "temp", f"{CHUNK_DIR_PREFIX}{video.unique_id}"
+    )
+    try:
+        chunks = split_source(
+            temp_file_path, work_dir, settings.transcode_chunk_seconds
+        )
+
+        video.upload_progress = 50
+        record_event(
+            db,
+            video,
+            "split",
+            f"Split into {len(chunks)} chunks of "
+            f"~{settings.transcode_chunk_seconds}s for parallel encoding",
+        )
+        db.commit()
+
+        callback = finish_chunked_transcode.s(
+            video.id, temp_file_path, final_path, work_dir, metadata
+        ).on_error(chunked_transcode_failed.s(video.id, temp_file_path, work_dir))
+        result = chord(encode_chunk.s(path) for path in chunks)(callback)
+
+    except Exception:
+        # Nothing was dispatched, so no chord task will remove the chunks
+        shutil.rmtree(work_dir, ignore_errors=True)
+        raise
+
+    logger.info(
+        f"Video {video.id}: encoding {len(chunks)} chunks in parallel "
+        f"(chord {result.id})"
+    )
+    return {
+        "video_id": video.id,
+        "status": "transcoding",
+        "chunks": len(chunks),
+        "chord_id": result.id,
+    }
+
+
+def split_source(input_path: str, work_dir: str, chunk_seconds: int) -> list:
+    """Cut the video stream at keyframes into chunks of about chunk_seconds.
+
+    Stream copy only: every chunk starts on a keyframe of the source, so
+    they can be encoded independently and concatenated back losslessly.
+    """
+    os.makedirs(work_dir, exist_ok=True)
+    cmd = [
+        "ffmpeg",
+        "-i",
+        input_path,
+        "-map",
+        "0:v:0",
+        "-c",
+        "copy",
+        "-f",
+        "segment",
+        "-segment_time",
+        str(chunk_seconds),
+        "-reset_timestamps",
+        "1",
+        "-y",
+        os.path.join(work_dir, "chunk_%05d.mkv"),
+    ]
+
+    logger.info(f"Splitting video with FFmpeg: {' '.join(cmd)}")
+    result = run_ffmpeg(cmd, 600)
+
+    if result.returncode != 0:
+        logger.error(f"FFmpeg split failed: {result.stderr}")
+        raise Exception(f"Video split failed: {result.stderr}")
+
+    chunks = sorted(
+        os.path.join(work_dir, name)
+        for name in os.listdir(work_dir)
+        if name.startswith("chunk_") and name.endswith(".mkv")
+    )
+    if not chunks:
+        raise Exception("Video split produced no chunks")
+    return chunks
+
+
+def encode_chunk_file(chunk_path: str, threads: int = 0) -> str:
+    """Encode one chunk's video with the same settings as a whole-file convert"""
+    output_path = os.path.splitext(chunk_path)[0] + ".enc.mp4"
+    cmd = [
+        "ffmpeg",
+        "-i",
+        chunk_path,
+        "-c:v",
+        "libx264",
+        "-preset",
+        "medium",
+        "-crf",
+        "23",
+        "-threads",
+        str(threads),
+        "-an",
+        "-y",
+        output_path,
+    ]
+
+    result = run_ffmpeg(cmd, 1800)
+
+    if result.returncode != 0:
+        logger.error(f"FFmpeg chunk encode failed: {result.stderr}")
+        raise Exception(f"Chunk encode failed: {result.stderr}")
+
+    return output_path
+
+
+def concat_chunks(
+    encoded_chunks: list, source_path: str, output_path: str, has_audio: bool
+) -> None:
+    """Join encoded chunks without re-encoding; audio is encoded in one pass.
+
+    Encoding audio per chunk would add encoder priming at every boundary,
+    so the source's audio track is encoded here against the joined video.
+    """
+    list_path = os.path.join(os.path.dirname(encoded_chunks[0]), "concat.txt")
+    with open(list_path, "w") as f:
+        for path in encoded_chunks:
+            escaped = os.path.abspath(path).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+
+    cmd = ["ffmpeg", "-f", "concat", "-safe", "0", "-i", list_path]
+    if has_audio:
+        cmd += [
+            "-i",
+            source_path,
+            "-map",
+            "0:v:0",
+            "-map",
+            "1:a:0",
+            "-c:a",
+            "aac",
+            "-b:a",
+            "128k",
+        ]
+    cmd += ["-c:v", "copy", "-movflags", "+faststart", "-y", output_path]
+
+    try:
+        logger.info(f"Concatenating chunks with FFmpeg: {' '.join(cmd)}")
+        result = run_ffmpeg(cmd, 1800)
+    finally:
+        os.remove(list_path)
+
+    if result.returncode != 0:
+        logger.error(f"FFmpeg concat failed: {result.stderr}")
+        raise Exception(f"Chunk concatenation failed: {result.stderr}")
+
+
+@celery_app.task(acks_late=True)
+def encode_chunk(chunk_path: str) -> str:
+    """Encode one chunk of a split video (chord header task)"""
+    return encode_chunk_file(chunk_path)
+
+
+@celery_app.task(bind=True)
+def finish_chunked_transcode(
+    self,
+    encoded_chunks: list,
+    video_id: int,
+    temp_file_path: str,
+    final_path: str,
+    work_dir: str,
+    metadata: dict,
+):
+    """Concatenate the encoded chunks and finish processing (chord body)"""
+
+    db: Session = SessionLocal()
+
+    try:
+        video = db.query(Video).filter(Video.id == video_id).first()
+        if not video:
+            logger.error(f"Video with ID {video_id} not found")
+            return {"error": "Video not found"}
+
+        concat_chunks(
+            encoded_chunks, temp_file_path, final_path, metadata.get("has_audio")
+        )
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+        method = f"chunked transcode, {len(encoded_chunks)} chunks"
+        return finish_processing(
+            self, db, video, final_path, method, metadata, temp_file_path
+        )
+
+    except Exception as e:
+        logger.error(f"Error processing video {video_id}: {e}")
+
+        if "video" in locals() and video:
+            fail_processing(db, video, e)
+
+        shutil.rmtree(work_dir, ignore_errors=True)
+        remove_temp_file(temp_file_path)
+
+        return {"error": str(e), "video_id": video_id}
+
+    finally:
+        db.close()
+
+
+@celery_app.task
+def chunked_transcode_failed(
+    request, exc, traceback, video_id: int, temp_file_path: str, work_dir: str
+):
+    """Mark the video failed when one of its chunk encodes failed"""
+
+    logger.error(f"Chunked transcode of video {video_id} failed: {exc}")
+
+    db: Session = SessionLocal()
+    try:
+        video = db.query(Video).filter(Video.id == video_id).first()
+        if video:
+            fail_processing(db, video, exc)
+    finally:
+        db.close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+        remove_temp_file(temp_file_path)
+
+
+# Rendition ladder for HLS packaging (bitrates follow common VOD ladders)
+HLS_LADDER = {
+    "1080p": {"height": 1080, "video_bitrate": 5000, "audio_bitrate": 192},
+    "720p": {"height": 720, "video_bitrate": 2800, "audio_bitrate": 128},
+    "480p": {"height": 480, "video_bitrate": 1400, "audio_bitrate": 128},
+    "360p": {"height": 360, "video_bitrate": 800, "audio_bitrate": 96},
+    "audio": {"height": None, "video_bitrate": 0, "audio_bitrate": 128},
+}
+
+
+def select_hls_renditions(metadata: dict) -> list:
+    """Pick the configured renditions that make sense for this source"""
+    source_height = metadata.get("height") or 0
+    has_audio = metadata.get("has_audio", False)
+
+    video_renditions = []
+    audio_only = None
+    for name in settings.hls_renditions_list:
+        rendition = HLS_LADDER.get(name)
+        if rendition is None:
+            logger.warning(f"Unknown HLS rendition '{name}' ignored")
+            continue
+
+        if rendition["height"] is None:
+            if has_audio:
+                audio_only = {"name": name, **rendition}
+        elif rendition["height"] <= source_height:
+            video_renditions.append({"name": name, **rendition})
+
+    # Never upscale, but always produce at least the smallest video rung
+    if not video_renditions and source_height:
+        smallest = min(
+            (
+                n
+                for n in settings.hls_renditions_list
+                if HLS_LADDER.get(n, {}).get("height")
+            ),
+            key=lambda n: HLS_LADDER[n]["height"],
+            default=None,
+        )
+        if smallest:
+            video_renditions.append(
+                {"name": smallest, **HLS_LADDER[smallest], "height": source_height}
+            )
+
+    return video_renditions + ([audio_only] if audio_only else [])
+
+
+def package_hls(
+    input_path: str, output_dir: str, metadata: dict, progress=None
+) -> list:
+    """Encode the rendition ladder into segmented HLS with a master playlist.
+
+    The source is decoded once and split into one scaled output per rung.
+    Keyframes are forced on segment boundaries so every rendition can be
+    switched between at any segment.
+    """
+    renditions = select_hls_renditions(metadata)
+    if not renditions:
+        raise Exception("No HLS renditions can be produced for this source")
+
+    has_audio = metadata.get("has_audio", False)
+    segment_seconds = settings.hls_segment_seconds
+    video_renditions = [r for r in renditions if r["height"]]
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    cmd = ["ffmpeg", "-i", input_path]
+
+    if video_renditions:
+        splits = "".join(f"[v{i}]" for i in range(len(video_renditions)))
+        filters = [f"[0:v]split={len(video_renditions)}{splits}"]
+        filters += [
+            f"[v{i}]scale=-2:{r['height']}[v{i}out]"
+            for i, r in enumerate(video_renditions)
+        ]
+        cmd += ["-filter_complex", ";".join(filters)]
+
+    stream_map = []
+    audio_index = 0
+    for i, rendition in enumerate(renditions):
+        entry = []
+        if rendition["height"]:
+            bitrate = rendition["video_bitrate"]
+            cmd += [
+                "-map",
+                f"[v{i}out]",
+                f"-c:v:{i}",
+                "libx264",
+                f"-b:v:{i}",
+                f"{bitrate}k",
+                f"-maxrate:v:{i}",
+                f"{int(bitrate * 1.07)}k",
+                f"-bufsize:v:{i}",
+                f"{int(bitrate * 1.5)}k",
+            ]
+            entry.append(f"v:{i}")
+
+        if has_audio:
+            cmd += [
+                "-map",
+                "0:a:0",
+                f"-c:a:{audio_index}",
+                "aac",
+                f"-b:a:{audio_index}",
+                f"{rendition['audio_bitrate']}k",
+            ]
+            entry.append(f"a:{audio_index}")
+            audio_index += 1
+
+        entry.append(f"name:{rendition['name']}")
+        stream_map.append(",".join(entry))
+
+    cmd += [
+        "-preset",
+        "medium",
+        "-force_key_frames",
+        f"expr:gte(t,n_forced*{segment_seconds})",
+        "-sc_threshold",
+        "0",
+        "-f",
+        "hls",
+        "-hls_time",
+        str(segment_seconds),
+        "-hls_playlist_type",
+        "vod",
+        "-hls_segment_filename",
+        os.path.join(output_dir, "%v", "seg_%05d.ts"),
+        "-master_pl_name",
+        "master.m3u8",
+        "-var_stream_map",
+        " ".join(stream_map),
+        "-y",
+        os.path.join(output_dir, "%v", "index.m3u8"),
+    ]
+
+    logger.info(f"Packaging HLS with FFmpeg: {' '.join(cmd)}")
+    result = run_ffmpeg(cmd, 3600, progress)
+
+    if result.returncode != 0:
+        logger.error(f"HLS packaging failed: {result.stderr}")
+        raise Exception(f"HLS packaging failed: {result.stderr}")
+
+    return [
+        {
+            "name": r["name"],
+            "height": r["height"],
+            "bandwidth": (r["video_bitrate"] + r["audio_bitrate"]) * 1000,
+        }
+        for r in renditions
+    ]
+
+
+# Size of the poster thumbnail and extra stills
+THUMBNAIL_SCALE = "scale=320:240"
+
+
+def thumbnail_path_for(video_id: int) -> str:
+    thumbnail_dir = os.path.join(settings.video_dir, "thumbnails")
+    os.makedirs(thumbnail_dir, exist_ok=True)
+    return os.path.join(thumbnail_dir, f"thumb_{video_id}.jpg")
+
+
+def thumbnail_offset(duration: Optional[int]) -> float:
+    """Poster frame time: one second in, or the first frame of short videos"""
+    return 1.0 if not duration or duration > 1 else 0.0
+
+
+def extract_still(video_path: str, output_path: str, offset: float) -> bool:
+    """Write the frame at offset seconds as a JPEG.
+
+    ``-ss`` before ``-i`` seeks the input to the nearest keyframe, so only
+    the frames from there to the offset are decoded.
+    """
+    cmd = [
+        "ffmpeg",
+        "-ss",
+        f"{offset:.3f}",
+        "-i",
+        video_path,
+        "-frames:v",
+        "1",
+        "-vf",
+        THUMBNAIL_SCALE,
+        "-y",  # Overwrite output file
+        output_path,
+    ]
+
+    result = run_ffmpeg(cmd, 60)
+
+    if result.returncode != 0:
+        logger.warning(f"Still extraction failed: {result.stderr}")
+        return False
+    return True
+
+
+def generate_thumbnail(video_path: str, video_id: int, offset: float = 1.0) -> str:
     """Generate video thumbnail"""
     try:
-        thumbnail_dir = os.path.join(settings.video_dir, "thumbnails")
-        os.makedirs(thumbnail_dir, exist_ok=True)
+        thumbnail_path = thumbnail_path_for(video_id)
+        if extract_still(video_path, thumbnail_path, offset):
+            return thumbnail_path
+        return None
+
+    except Exception as e:
+        logger.error(f"Error generating thumbnail: {e}")
+        return None
+
+
+def generate_stills(
+    video_path: str, video_id: int, duration: Optional[int], count: int
+) -> list:
+    """Extract count evenly spaced stills next to the poster thumbnail"""
+    if not duration:
+        return []
+
+    base = os.path.splitext(thumbnail_path_for(video_id))[0]
+    stills = []
+    for n in range(1, count + 1):
+        path = f"{base}_{n}.jpg"
+        try:
+            if extract_still(video_path, path, duration * n / (count + 1)):
+                stills.append(path)
+        except Exception as e:
+            logger.error(f"Error extracting still {n}: {e}")
+    return stills
+
+
+# Name of the WebVTT index written next to the sprite sheets
+SPRITE_VTT_NAME = "thumbnails.vtt"
+
 
-        thumbnail_path = os.path.join(thumbnail_dir, f"thumb_{video_id}.jpg")
+def format_vtt_timestamp(seconds: float) -> str:
+    milliseconds = int(round(seconds * 1000))
+    hours, milliseconds = divmod(milliseconds, 3_600_000)
+    minutes, milliseconds = divmod(milliseconds, 60_000)
+    return f"{hours:02d}:{minutes:02d}:{milliseconds / 1000:06.3f}"
+
+
+def sprite_tile_size(metadata: dict) -> tuple:
+    """Tile width and height keeping the source aspect ratio (even sizes)"""
+    width = settings.sprite_tile_width
+    try:
+        source_width, source_height = map(int, metadata["resolution"].split("x"))
+        height = round(width * source_height / source_width / 2) * 2
+    except (KeyError, ValueError, ZeroDivisionError):
+        height = round(width * 9 / 16 / 2) * 2
+    return width, max(height, 2)
+
+
+def generate_sprites(
+    video_path: str, output_dir: str, duration: int, metadata: dict
+) -> Optional[str]:
+    """Tile a preview frame every SPRITE_INTERVAL seconds into sprite sheets.
+
+    Writes sprite_NNN.jpg sheets of SPRITE_COLUMNS x SPRITE_ROWS tiles and
+    a WebVTT index mapping each interval to its tile (``#xywh=`` media
+    fragments), so a player's seek preview is one small image fetch. Only
+    keyframes are decoded; each tile shows the keyframe nearest its time.
+    Returns the directory, or None if generation failed.
+    """
+    interval = settings.sprite_interval
+    columns, rows = settings.sprite_columns, settings.sprite_rows
+    width, height = sprite_tile_size(metadata)
+
+    try:
+        if os.path.isdir(output_dir):
+            shutil.rmtree(output_dir)
+        os.makedirs(output_dir)
 
         cmd = [
             "ffmpeg",
+            "-skip_frame",
+            "nokey",
             "-i",
             video_path,
-            "-ss",
-            "00:00:01",  # Take screenshot at 1 second
-            "-vframes",
-            "1",
+            "-an",
             "-vf",
-            "scale=320:240",
-            "-y",  # Overwrite output file
-            thumbnail_path,
+            f"fps=1/{interval},scale={width}:{height},tile={columns}x{rows}",
+            "-q:v",
+            "5",
+            "-y",
+            os.path.join(output_dir, "sprite_%03d.jpg"),
         ]
 
-        result = subprocess.run(cmd, capture_output=True, timeout=60)
+        result = run_ffmpeg(cmd, 1800)
 
-        if result.returncode == 0:
-            return thumbnail_path
-        else:
-            logger.warning(f"Thumbnail generation failed: {result.stderr}")
+        if result.returncode != 0:
+            logger.warning(f"Sprite generation failed: {result.stderr}")
+            shutil.rmtree(output_dir, ignore_errors=True)
             return None
 
+        sheets = len(
+            [name for name in os.listdir(output_dir) if name.startswith("sprite_")]
+        )
+        tiles = min(math.ceil(duration / interval), sheets * columns * rows)
+
+        cues = ["WEBVTT", ""]
+        for index in range(tiles):
+            sheet, position = divmod(index, columns * rows)
+            row, column = divmod(position, columns)
+            start = index * interval
+            end = min(start + interval, duration)
+            cues += [
+                f"{format_vtt_timestamp(start)} --> {format_vtt_timestamp(end)}",
+                f"sprite_{sheet + 1:03d}.jpg#xywh="
+                f"{column * width},{row * height},{width},{height}",
+                "",
+            ]
+
+        with open(os.path.join(output_dir, SPRITE_VTT_NAME), "w") as f:
+            f.write("\n".join(cues))
+
+        return output_dir
+
     except Exception as e:
-        logger.error(f"Error generating thumbnail: {e}")
+        logger.error(f"Error generating sprites: {e}")
+        shutil.rmtree(output_dir, ignore_errors=True)
         return None
 
 
@@ -303,13 +1188,18 @@ def cleanup_temp_files():
         if not os.path.exists(temp_dir):
             return
 
-        cutoff_time = datetime.now() - timedelta(hours=24)  # Files older than 24 hours
+        # Files of live resumable uploads are left to expire_upload_sessions(),
+        # and the cutoff never undercuts how long an upload may sit idle
+        cutoff_time = datetime.now() - timedelta(
+            hours=max(24, settings.upload_session_ttl_hours)
+        )
+        live_paths = live_upload_paths()
         cleaned_count = 0
 
         for filename in os.listdir(temp_dir):
             file_path = os.path.join(temp_dir, filename)
 
-            if os.path.isfile(file_path):
+            if os.path.isfile(file_path) and file_path not in live_paths:
                 file_mtime = datetime.fromtimestamp(os.path.getmtime(file_path))
 
                 if file_mtime < cutoff_time:
@@ -320,9 +1210,62 @@ def cleanup_temp_files():
                     except Exception as e:
                         logger.warning(f"Failed to remove temp file {filename}: {e}")
 
+            # Chunk work directories normally go with their chord; these are
+            # left by jobs whose worker died before finishing or failing
+            elif filename.startswith(CHUNK_DIR_PREFIX) and os.path.isdir(file_path):
+                dir_mtime = datetime.fromtimestamp(os.path.getmtime(file_path))
+
+                if dir_mtime < cutoff_time:
+                    shutil.rmtree(file_path, ignore_errors=True)
+                    cleaned_count += 1
+                    logger.info(f"Removed old chunk directory: {filename}")
+
+        expired_uploads = expire_upload_sessions()
+
         logger.info(f"Cleanup completed. Removed {cleaned_count} old temp files.")
-        return {"cleaned_files": cleaned_count}
+        return {"cleaned_files": cleaned_count, "expired_uploads": expired_uploads}
 
     except Exception as e:
         logger.error(f"Error during temp file cleanup: {e}")
         return {"error": str(e)}
+
+
+def live_upload_paths() -> set:
+    """Temporary files of uploads still being received or completed"""
+    db: Session = SessionLocal()
+    try:
+        rows = db.query(UploadSession.temp_path).filter(
+            UploadSession.status.in_(
+                [UploadSessionStatus.ACTIVE, UploadSessionStatus.COMPLETING]
+            )
+        )
+        return {path for (path,) in rows}
+
+    finally:
+        db.close()
+
+
+def expire_upload_sessions() -> int:
+    """Abort resumable uploads past their expiry and remove their files"""
+    db: Session = SessionLocal()
+    try:
+        expired = (
+            db.query(UploadSession)
+            .filter(
+                UploadSession.status == UploadSessionStatus.ACTIVE,
+                UploadSession.expires_at < datetime.utcnow(),
+            )
+            .all()
+        )
+
+        for upload in expired:
+            upload.status = UploadSessionStatus.ABORTED
+            if os.path.exists(upload.temp_path):
+                os.remove(upload.temp_path)
+            logger.info(f"Expired upload session {upload.id}")
+
+        db.commit()
+        return len(expired)
+
+    finally:
+        db.close()
@@ -0,0 +1,166 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ByteLRUCache:
+    """Thread-safe LRU cache of bytes values bounded by their total size.
+
+    Keys are tuples whose first element is a namespace (a video unique_id),
+    so everything cached for one video can be dropped at once.
+
+    A value is only admitted the second time it is offered within the last
+    ``history_entries`` misses, so a one-off sequential read (a cold full
+    download) passes through without evicting the hot set.
+    """
+
+    def __init__(self, max_bytes: int, history_entries: int = 8192):
+        self.max_bytes = max_bytes
+        self.history_entries = history_entries
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejections = 0
+        self._entries: "OrderedDict[Tuple, bytes]" = OrderedDict()
+        self._namespaces: dict = {}
+        # Keys offered once and not admitted yet, oldest first
+        self._history: "OrderedDict[Tuple, None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def get(self, key: Tuple) -> Optional[bytes]:
+        """Return a cached value and mark it as recently used"""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Tuple, value: bytes) -> None:
+        """Cache a value seen before, evicting least recently used entries"""
+        size = len(value)
+        if not self.enabled or size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            elif self._history.pop(key, False) is False:
+                # First sighting: remember the key, keep the hot set intact
+                self._history[key] = None
+                if len(self._history) > self.history_entries:
+                    self._history.popitem(last=False)
+                self.rejections += 1
+                return
+
+            while self._entries and self.current_bytes + size > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+            self._entries[key] = value
+            self._namespaces.setdefault(key[0], set()).add(key)
+            self.current_bytes += size
+
+    def invalidate(self, namespace: Hashable) -> int:
+        """Drop every entry cached under a namespace"""
+        with self._lock:
+            keys = self._namespaces.pop(namespace, set())
+            for key in keys:
+                value = self._entries.pop(key, None)
+                if value is not None:
+                    self.current_bytes -= len(value)
+
+        if keys:
+            logger.info(f"Invalidated {len(keys)} cached segments for {namespace}")
+        return len(keys)
+
+    def _remove(self, key: Tuple) -> None:
+        value = self._entries.pop(key)
+        self.current_bytes -= len(value)
+        namespace_keys = self._namespaces.get(key[0])
+        if namespace_keys is not None:
+            namespace_keys.discard(key)
+            if not namespace_keys:
+                del self._namespaces[key[0]]
+
+    def stats(self) -> dict:
+        """Return size and hit/miss/eviction counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "size_bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "rejections": self.rejections,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class TTLCache:
+    """Thread-safe, size-bounded mapping whose entries expire individually"""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return a live value, dropping it if it has expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value for ttl seconds (never longer than the cache TTL)"""
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Process-wide cache of hot video blocks and HLS segments
+segment_cache = ByteLRUCache(settings.segment_cache_max_bytes)
@@ -0,0 +1,161 @@
+import logging
+import os
+import resource
+import struct
+import subprocess
+import threading
+from collections import deque
+from typing import Callable, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+# Lines of stderr kept for error messages
+STDERR_TAIL_LINES = 50
+
+
+class FFmpegProgress(NamedTuple):
+    """One ``-progress`` report of a running ffmpeg"""
+
+    out_time: float  # Seconds of output written so far
+    speed: Optional[float]  # Media seconds encoded per wall-clock second
+    frame: Optional[int]
+    done: bool
+
+    def fraction(self, duration: Optional[float]) -> Optional[float]:
+        if not duration:
+            return None
+        return min(self.out_time / duration, 1.0)
+
+    def eta(self, duration: Optional[float]) -> Optional[float]:
+        """Wall-clock seconds left at the current speed"""
+        if not duration or not self.speed:
+            return None
+        return max(duration - self.out_time, 0.0) / self.speed
+
+
+def child_cpu_seconds() -> float:
+    """User + system CPU time of all finished child processes (ffmpeg runs)"""
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def moov_before_mdat(path: str) -> Optional[bool]:
+    """Whether an MP4/MOV file's moov box (the index) precedes its media data.
+
+    Walks the top-level boxes from the start of the file; returns None when
+    neither box is found, e.g. for fragmented or damaged files.
+    """
+    with open(path, "rb") as f:
+        file_size = os.fstat(f.fileno()).st_size
+        offset = 0
+        while offset + 8 <= file_size:
+            f.seek(offset)
+            size, box_type = struct.unpack(">I4s", f.read(8))
+            if size == 1:  # 64-bit size follows the type
+                (size,) = struct.unpack(">Q", f.read(8))
+            elif size == 0:  # Box extends to the end of the file
+                size = file_size - offset
+
+            if box_type == b"moov":
+                return True
+            if box_type == b"mdat":
+                return False
+            if size < 8:
+                return None
+            offset += size
+
+    return None
+
+
+def parse_progress(fields: dict, done: bool) -> FFmpegProgress:
+    """Build a report from the key=value lines of one progress block"""
+
+    # out_time_us is the documented key; out_time_ms is also microseconds
+    out_time_us = fields.get("out_time_us") or fields.get("out_time_ms")
+    try:
+        out_time = max(int(out_time_us), 0) / 1_000_000
+    except (TypeError, ValueError):
+        out_time = 0.0
+
+    speed = fields.get("speed", "").rstrip("x").strip()
+    try:
+        speed = float(speed) or None
+    except ValueError:
+        speed = None
+
+    try:
+        frame = int(fields["frame"])
+    except (KeyError, ValueError):
+        frame = None
+
+    return FFmpegProgress(out_time, speed, frame, done)
+
+
+def run_ffmpeg(
+    cmd: List[str],
+    timeout: float,
+    on_progress: Optional[Callable[[FFmpegProgress], None]] = None,
+    tail_lines: int = STDERR_TAIL_LINES,
+) -> subprocess.CompletedProcess:
+    """Run ffmpeg, streaming its progress and keeping only a stderr tail.
+
+    ``-progress pipe:1`` makes ffmpeg print a key=value block to stdout
+    about twice a second; each block is passed to ``on_progress`` as it
+    arrives. stderr is drained by a thread into a ring buffer of
+    ``tail_lines`` lines, so a chatty encode cannot grow worker memory.
+    The result's ``stderr`` holds that tail. Raises
+    ``subprocess.TimeoutExpired`` once ``timeout`` seconds have passed.
+    """
+    cmd = [cmd[0], "-hide_banner", "-nostats", "-progress", "pipe:1", *cmd[1:]]
+    process = subprocess.Popen(
+        cmd,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        errors="replace",
+    )
+
+    stderr_tail = deque(maxlen=tail_lines)
+    drain = threading.Thread(
+        target=lambda: stderr_tail.extend(line.rstrip() for line in process.stderr),
+        daemon=True,
+    )
+    drain.start()
+
+    timed_out = threading.Event()
+
+    def kill():
+        timed_out.set()
+        process.kill()
+
+    timer = threading.Timer(timeout, kill)
+    timer.start()
+
+    try:
+        fields = {}
+        for line in process.stdout:
+            key, _, value = line.strip().partition("=")
+            if key != "progress":
+                fields[key] = value
+                continue
+
+            if on_progress:
+                try:
+                    on_progress(parse_progress(fields, value == "end"))
+                except Exception as e:
+                    logger.warning(f"Progress callback failed: {e}")
+            fields = {}
+
+        returncode = process.wait()
+    finally:
+        timer.cancel()
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        drain.join()
+
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(cmd, timeout, stderr="\n".join(stderr_tail))
+
+    return subprocess.CompletedProcess(cmd, returncode, None, "\n".join(stderr_tail))
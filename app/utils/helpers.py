@@ -1,9 +1,14 @@
+import errno
+import fcntl
 import hashlib
 import logging
 import mimetypes
 import os
+import shutil
+from typing import Optional
 
 from fastapi import HTTPException, UploadFile, status
+from sqlalchemy import func, select
 
 from app.config import settings
 
@@ -13,20 +18,28 @@ logger = logging.getLogger(__name__)
 def validate_video_file(file: UploadFile) -> bool:
     """Validate uploaded video file"""
 
+    return validate_video_filename(file.filename, getattr(file, "size", None))
+
+
+def validate_video_filename(
+    filename: Optional[str], size: Optional[int] = None
+) -> bool:
+    """Validate the name and (if known) size of an incoming video"""
+
     # Check file size
-    if hasattr(file, "size") and file.size > settings.max_file_size:
+    if size is not None and size > settings.max_file_size:
         raise HTTPException(
             status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
             detail=f"File too large. Maximum size: {settings.max_file_size / (1024*1024):.0f}MB",
         )
 
     # Check file extension
-    if not file.filename:
+    if not filename:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="File name is required"
         )
 
-    file_extension = file.filename.split(".")[-1].lower()
+    file_extension = filename.split(".")[-1].lower()
     if file_extension not in settings.allowed_video_types_list:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -34,7 +47,7 @@ def validate_video_file(file: UploadFile) -> bool:
         )
 
     # Check MIME type
-    mime_type, _ = mimetypes.guess_type(file.filename)
+    mime_type, _ = mimetypes.guess_type(filename)
     if mime_type and not mime_type.startswith("video/"):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="File must be a video"
@@ -56,6 +69,126 @@ def calculate_file_hash(file_path: str) -> str:
         return ""
 
 
+# Block size of the content hash tree; resumable upload chunks are multiples
+CONTENT_HASH_BLOCK_SIZE = 4 * 1024 * 1024
+
+
+class ContentHasher:
+    """Incremental content digest of an uploaded file.
+
+    The stream is cut into CONTENT_HASH_BLOCK_SIZE blocks that are hashed
+    with BLAKE2b independently; the content hash is the BLAKE2b of the
+    concatenated block digests. Blocks can therefore be hashed out of order
+    (one hasher per resumable-upload chunk) and combined afterwards with
+    ``combine_block_digests``, giving the same hash as a single pass.
+    """
+
+    digest_size = 32
+
+    def __init__(self):
+        self.size = 0
+        self._digests = bytearray()
+        self._block = hashlib.blake2b(digest_size=self.digest_size)
+        self._block_filled = 0
+
+    def update(self, data: bytes) -> None:
+        view = memoryview(data)
+        while view:
+            take = min(len(view), CONTENT_HASH_BLOCK_SIZE - self._block_filled)
+            self._block.update(view[:take])
+            self._block_filled += take
+            self.size += take
+            view = view[take:]
+
+            if self._block_filled == CONTENT_HASH_BLOCK_SIZE:
+                self._finish_block()
+
+    def block_digests(self) -> bytes:
+        """Digests of every block so far, the trailing partial block included"""
+        if self._block_filled:
+            self._finish_block()
+        return bytes(self._digests)
+
+    def hexdigest(self) -> str:
+        return combine_block_digests(self.block_digests())
+
+    def _finish_block(self) -> None:
+        self._digests += self._block.digest()
+        self._block = hashlib.blake2b(digest_size=self.digest_size)
+        self._block_filled = 0
+
+
+def combine_block_digests(block_digests: bytes) -> str:
+    """Content hash from concatenated block digests (see ContentHasher)"""
+    return hashlib.blake2b(
+        block_digests, digest_size=ContentHasher.digest_size
+    ).hexdigest()
+
+
+def calculate_content_hash(file_path: str) -> tuple:
+    """Return (size, content hash) of a file in a single read pass"""
+    hasher = ContentHasher()
+    with open(file_path, "rb") as f:
+        while chunk := f.read(CONTENT_HASH_BLOCK_SIZE):
+            hasher.update(chunk)
+    return hasher.size, hasher.hexdigest()
+
+
+def pwrite_all(fd: int, data: bytes, offset: int) -> None:
+    """os.pwrite until every byte is written"""
+    view = memoryview(data)
+    while view:
+        written = os.pwrite(fd, view, offset)
+        view = view[written:]
+        offset += written
+
+
+def hash_and_pwrite(hasher: ContentHasher, fd: int, data: bytes, offset: int) -> None:
+    """Feed data to the content hasher and write it at offset"""
+    hasher.update(data)
+    pwrite_all(fd, data, offset)
+
+
+# Linux FICLONE ioctl: share the source's extents copy-on-write (btrfs, XFS)
+FICLONE = 0x40049409
+
+
+def place_file(source: str, destination: str) -> str:
+    """Put source at destination as cheaply as possible; return the strategy
+
+    Tried in order: ``rename`` (atomic ``os.replace``, same filesystem only),
+    ``reflink`` (copy-on-write clone), ``hardlink`` and finally ``copy``.
+    Only ``rename`` consumes the source; with the other strategies the
+    caller still owns it and removes it as before. Across filesystems
+    neither a clone nor a link can work, so it goes straight to ``copy``.
+    """
+    try:
+        os.replace(source, destination)
+        return "rename"
+    except OSError as e:
+        logger.debug(f"Rename {source} -> {destination} failed ({e})")
+        cross_device = e.errno == errno.EXDEV
+
+    if not cross_device:
+        try:
+            with open(source, "rb") as src, open(destination, "wb") as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            shutil.copystat(source, destination)
+            return "reflink"
+        except OSError:
+            if os.path.exists(destination):
+                os.remove(destination)
+
+        try:
+            os.link(source, destination)
+            return "hardlink"
+        except OSError:
+            pass
+
+    shutil.copy2(source, destination)
+    return "copy"
+
+
 def ensure_directory_exists(directory: str) -> bool:
     """Ensure directory exists, create if not"""
     try:
@@ -123,6 +256,26 @@ def paginate_query(query, page: int = 1, per_page: int = 10):
     }
 
 
+async def paginate_select(db, stmt, page: int = 1, per_page: int = 10):
+    """Add pagination to a select() statement run on an AsyncSession"""
+    if page < 1:
+        page = 1
+
+    total = await db.scalar(
+        select(func.count()).select_from(stmt.order_by(None).subquery())
+    )
+    result = await db.scalars(stmt.offset((page - 1) * per_page).limit(per_page))
+    items = result.all()
+
+    return {
+        "items": items,
+        "total": total,
+        "page": page,
+        "per_page": per_page,
+        "pages": (total + per_page - 1) // per_page,
+    }
+
+
 def create_directory_structure():
     """Create necessary directory structure"""
     directories = [
@@ -0,0 +1,110 @@
+import logging
+import struct
+import subprocess
+import threading
+from array import array
+from bisect import bisect_right
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# One entry per keyframe: presentation time in ms, byte offset of its packet
+ENTRY_FORMAT = "<IQ"
+
+
+class KeyframeIndex:
+    """Sorted keyframe times and byte offsets of one file, searchable by time"""
+
+    def __init__(self, times_ms: array, offsets: array):
+        self.times_ms = times_ms
+        self.offsets = offsets
+
+    @classmethod
+    def from_bytes(cls, packed: bytes) -> "KeyframeIndex":
+        times_ms, offsets = array("I"), array("Q")
+        for time_ms, offset in struct.iter_unpack(ENTRY_FORMAT, packed):
+            times_ms.append(time_ms)
+            offsets.append(offset)
+        return cls(times_ms, offsets)
+
+    def __len__(self) -> int:
+        return len(self.times_ms)
+
+    def seek(self, seconds: float) -> Tuple[float, int]:
+        """(time, offset) of the last keyframe at or before seconds"""
+        # Rounded like pack_keyframes, so a keyframe's own time finds it
+        position = bisect_right(self.times_ms, round(seconds * 1000)) - 1
+        position = max(position, 0)
+        return self.times_ms[position] / 1000, self.offsets[position]
+
+
+def keyframe_count(packed: bytes) -> int:
+    return len(packed) // struct.calcsize(ENTRY_FORMAT)
+
+
+def pack_keyframes(keyframes) -> bytes:
+    """Pack (seconds, offset) pairs, sorted by time, into the stored format"""
+    return b"".join(
+        struct.pack(ENTRY_FORMAT, max(int(round(seconds * 1000)), 0), offset)
+        for seconds, offset in sorted(keyframes)
+    )
+
+
+def extract_keyframe_index(file_path: str, timeout: float = 600) -> Optional[bytes]:
+    """Read the keyframe packets of the first video stream with ffprobe.
+
+    Only packet headers are demuxed, nothing is decoded. Output is parsed
+    line by line, so long files do not buffer ffprobe's listing in memory.
+    Returns the packed index, or None if the file could not be probed.
+    """
+    cmd = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-select_streams",
+        "v:0",
+        "-show_entries",
+        "packet=pts_time,pos,flags",
+        "-of",
+        "compact=p=0",
+        file_path,
+    ]
+
+    keyframes = []
+    try:
+        process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        timer = threading.Timer(timeout, process.kill)
+        timer.start()
+        try:
+            for line in process.stdout:
+                fields = dict(
+                    field.partition("=")[::2] for field in line.strip().split("|")
+                )
+                if "K" not in fields.get("flags", ""):
+                    continue
+                try:
+                    keyframes.append((float(fields["pts_time"]), int(fields["pos"])))
+                except (KeyError, ValueError):
+                    continue  # N/A timestamp or position
+            returncode = process.wait()
+        finally:
+            timer.cancel()
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+
+    except Exception as e:
+        logger.error(f"Error extracting keyframe index: {e}")
+        return None
+
+    if returncode != 0 or not keyframes:
+        logger.warning(f"No keyframe index for {file_path} (ffprobe {returncode})")
+        return None
+
+    return pack_keyframes(keyframes)
@@ -0,0 +1,231 @@
+import logging
+import os
+from typing import AsyncIterator, Dict, List, Optional
+
+from fastapi import HTTPException, status
+from multipart.multipart import MultipartParser, parse_options_header
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+
+from app.utils.helpers import ContentHasher, hash_and_pwrite, validate_video_filename
+
+logger = logging.getLogger(__name__)
+
+# File data is coalesced into writes of about this size
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+# Largest accepted value of a non-file form field
+MAX_FIELD_SIZE = 64 * 1024
+
+
+class StreamingUploadParser:
+    """Parse a multipart/form-data body incrementally, file part straight to disk.
+
+    Unlike Starlette's form parser there is no spooled temporary file: bytes
+    of the ``file_field`` part are written to ``destination`` (and sized and
+    content-hashed) as they arrive. The filename is validated as soon as the
+    part headers are parsed and the size on every write, so an invalid
+    upload is rejected before it is stored. Other parts are collected as
+    text fields.
+    """
+
+    def __init__(
+        self,
+        headers: Headers,
+        stream: AsyncIterator[bytes],
+        destination: str,
+        max_size: int,
+        file_field: str = "file",
+    ):
+        self.headers = headers
+        self.stream = stream
+        self.destination = destination
+        self.max_size = max_size
+        self.file_field = file_field
+
+        self.fields: Dict[str, str] = {}
+        self.filename: Optional[str] = None
+        self.hasher = ContentHasher()
+
+        self._charset = "utf-8"
+        self._header_name = b""
+        self._header_value = b""
+        self._disposition = b""
+        self._field_name: Optional[str] = None
+        self._field_data = bytearray()
+        self._in_file = False
+        self._file_seen = False
+        self._pending: List[bytes] = []
+        self._pending_size = 0
+        self._written = 0
+        self._fd: Optional[int] = None
+
+    @property
+    def size(self) -> int:
+        return self.hasher.size
+
+    @property
+    def content_hash(self) -> str:
+        return self.hasher.hexdigest()
+
+    async def parse(self) -> Dict[str, str]:
+        """Consume the body; return the text fields once the file is on disk"""
+        boundary = self._boundary()
+        parser = MultipartParser(
+            boundary,
+            {
+                "on_part_begin": self._on_part_begin,
+                "on_header_field": self._on_header_field,
+                "on_header_value": self._on_header_value,
+                "on_header_end": self._on_header_end,
+                "on_headers_finished": self._on_headers_finished,
+                "on_part_data": self._on_part_data,
+                "on_part_end": self._on_part_end,
+            },
+        )
+
+        try:
+            async for chunk in self.stream:
+                parser.write(chunk)
+                if self._pending_size >= WRITE_BUFFER_SIZE or not self._in_file:
+                    await self._flush()
+
+            parser.finalize()
+            await self._flush()
+
+            if not self._file_seen:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Missing '{self.file_field}' file part",
+                )
+            if self.size == 0:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Uploaded file is empty",
+                )
+
+        except BaseException:
+            await self._close()
+            if os.path.exists(self.destination):
+                os.remove(self.destination)
+            raise
+
+        await self._close()
+        logger.info(
+            f"Streamed upload '{self.filename}' ({self.size} bytes) "
+            f"to {self.destination}"
+        )
+        return self.fields
+
+    def _boundary(self) -> bytes:
+        content_type, params = parse_options_header(
+            self.headers.get("content-type", "")
+        )
+        if content_type != b"multipart/form-data" or b"boundary" not in params:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Expected a multipart/form-data body with a boundary",
+            )
+
+        charset = params.get(b"charset")
+        if charset:
+            self._charset = charset.decode("latin-1")
+        return params[b"boundary"]
+
+    # Parser callbacks run synchronously inside parser.write(); file data is
+    # only queued here and written off the event loop by _flush()
+
+    def _on_part_begin(self) -> None:
+        self._disposition = b""
+        self._field_name = None
+        self._field_data.clear()
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._disposition)
+        if b"name" not in options:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='Content-Disposition "name" is required',
+            )
+
+        self._field_name = options[b"name"].decode(self._charset, errors="replace")
+        if self._field_name != self.file_field:
+            return
+
+        if self._file_seen:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Only one file may be uploaded",
+            )
+
+        filename = options.get(b"filename", b"").decode(self._charset, "replace")
+        validate_video_filename(filename)
+
+        self.filename = filename
+        self._file_seen = True
+        self._in_file = True
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_file:
+            if self._written + self._pending_size + (end - start) > self.max_size:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"File too large. Maximum size: "
+                    f"{self.max_size / (1024 * 1024):.0f}MB",
+                )
+            self._pending.append(data[start:end])
+            self._pending_size += end - start
+            return
+
+        if len(self._field_data) + (end - start) > MAX_FIELD_SIZE:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Form field '{self._field_name}' is too large",
+            )
+        self._field_data += data[start:end]
+
+    def _on_part_end(self) -> None:
+        if self._in_file:
+            self._in_file = False
+        elif self._field_name is not None:
+            self.fields[self._field_name] = self._field_data.decode(
+                self._charset, errors="replace"
+            )
+
+    async def _flush(self) -> None:
+        """Write queued file data at the current offset in the threadpool"""
+        if not self._pending:
+            return
+
+        data = b"".join(self._pending)
+        self._pending.clear()
+        self._pending_size = 0
+
+        if self._fd is None:
+            self._fd = await run_in_threadpool(self._open_destination)
+
+        await run_in_threadpool(
+            hash_and_pwrite, self.hasher, self._fd, data, self._written
+        )
+        self._written += len(data)
+
+    def _open_destination(self) -> int:
+        os.makedirs(os.path.dirname(self.destination), exist_ok=True)
+        return os.open(self.destination, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+
+    async def _close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
@@ -1,5 +1,11 @@
+import asyncio
+import hashlib
+import hmac
 import secrets
 import string
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Any, Optional
 
@@ -8,6 +14,7 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from app.config import settings
+from app.utils.cache import TTLCache
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -23,6 +30,105 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+class PasswordHashExecutor:
+    """Run bcrypt work on a small dedicated thread pool.
+
+    Each hash costs a few hundred milliseconds of CPU, so it must not run on
+    the event loop. At most ``max_workers`` hashes run at once and at most
+    ``max_queue`` more wait behind them; further calls are rejected with 503
+    instead of queueing unbounded work during a login burst.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.pending = 0
+        self.started = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password-hash"
+        )
+        self._lock = threading.Lock()
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """verify_password() without blocking the event loop"""
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def _run(self, func, *args):
+        with self._lock:
+            if self.pending >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many concurrent login attempts, please retry",
+                    headers={"Retry-After": "1"},
+                )
+            self.pending += 1
+
+        submitted_at = time.monotonic()
+
+        def timed_call():
+            self._record_wait(time.monotonic() - submitted_at)
+            return func(*args)
+
+        # A cancelled request may leave its hash running, so the slot is only
+        # released once the pool is done with the call
+        future = self._executor.submit(timed_call)
+        future.add_done_callback(self._release)
+
+        cancelled = False
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            with self._lock:
+                if cancelled:
+                    self.cancelled += 1
+                else:
+                    self.completed += 1
+
+    def _release(self, future) -> None:
+        with self._lock:
+            self.pending -= 1
+
+    def _record_wait(self, wait: float) -> None:
+        with self._lock:
+            self.started += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def stats(self) -> dict:
+        """Return queue depth, rejection and wait time counters"""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "pending": self.pending,
+                "completed": self.completed,
+                "cancelled": self.cancelled,
+                "rejected": self.rejected,
+                "avg_wait_ms": (
+                    round(self.total_wait / self.started * 1000, 2)
+                    if self.started
+                    else 0.0
+                ),
+                "max_wait_ms": round(self.max_wait * 1000, 2),
+            }
+
+
+# Process-wide executor for password hashing in async handlers
+password_hasher = PasswordHashExecutor(
+    max_workers=settings.password_hash_workers,
+    max_queue=settings.password_hash_queue_limit,
+)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token"""
     to_encode = data.copy()
@@ -98,13 +204,70 @@ def generate_video_token(video_id: int, user_id: int) -> str:
 
 
 def verify_video_token(token: str) -> dict:
-    """Verify video streaming token"""
+    """Verify video streaming token
+
+    A player sends the same token with every range request, so decoded
+    payloads are cached until the token expires (at most the cache TTL).
+    """
+    payload = verified_video_tokens.get(token)
+    if payload is not None:
+        return payload
+
     try:
         payload = jwt.decode(
             token, settings.secret_key, algorithms=[settings.algorithm]
         )
-        return payload
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid video token"
         )
+
+    expires_at = payload.get("exp")
+    if expires_at:
+        verified_video_tokens.set(token, payload, ttl=expires_at - time.time())
+
+    return payload
+
+
+def _stream_signing_key() -> bytes:
+    """Key for signed stream URLs, derived so it differs from the JWT key"""
+    return hmac.new(
+        settings.secret_key.encode(), b"signed-stream-url", hashlib.sha256
+    ).digest()
+
+
+def sign_stream_url(unique_id: str, user_id: int, expires: int) -> str:
+    """HMAC-SHA256 signature binding a video, a user and an expiry time"""
+    message = f"{unique_id}:{expires}:{user_id}".encode()
+    return hmac.new(_stream_signing_key(), message, hashlib.sha256).hexdigest()
+
+
+def generate_signed_stream_params(
+    unique_id: str, user_id: int, expires_in: int = 3600
+) -> dict:
+    """Generate query parameters for a signed streaming URL"""
+    expires = int(time.time()) + expires_in
+    return {
+        "expires": expires,
+        "uid": user_id,
+        "sig": sign_stream_url(unique_id, user_id, expires),
+    }
+
+
+def verify_stream_signature(
+    unique_id: str, user_id: int, expires: int, signature: str
+) -> bool:
+    """Check a signed streaming URL in constant time without decoding JSON"""
+    if expires < time.time():
+        return False
+
+    # Compared as bytes: compare_digest rejects non-ASCII str with TypeError
+    expected = sign_stream_url(unique_id, user_id, expires)
+    return hmac.compare_digest(expected.encode(), signature.encode())
+
+
+# Decoded payloads of recently verified video tokens
+verified_video_tokens = TTLCache(
+    max_entries=settings.stream_token_cache_size,
+    ttl=settings.stream_token_cache_ttl,
+)
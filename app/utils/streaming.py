@@ -0,0 +1,368 @@
+import logging
+import os
+import secrets
+from email.utils import formatdate, parsedate_to_datetime
+from typing import List, Optional, Tuple, Union
+
+from fastapi import HTTPException, Request, status
+from fastapi.responses import Response
+from starlette.concurrency import run_in_threadpool
+from starlette.types import Receive, Scope, Send
+
+from app.config import settings
+from app.utils.cache import segment_cache
+
+logger = logging.getLogger(__name__)
+
+# Requests asking for more ranges than this are answered with the whole file
+MAX_RANGES = 16
+
+
+def file_validators(stat_result: os.stat_result) -> Tuple[str, str]:
+    """Return (ETag, Last-Modified) validators for a file"""
+    etag = f'"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+    last_modified = formatdate(stat_result.st_mtime, usegmt=True)
+    return etag, last_modified
+
+
+def parse_range_header(
+    range_header: Optional[str], file_size: int
+) -> Optional[List[Tuple[int, int]]]:
+    """Parse a Range header into inclusive (start, end) byte pairs.
+
+    Returns None when the whole file should be sent (no header, a unit other
+    than bytes or a malformed value). Raises 416 when none of the requested
+    ranges overlap the file.
+    """
+    if not range_header or file_size <= 0:
+        return None
+
+    unit, _, range_set = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or not range_set:
+        return None
+
+    specs = [spec.strip() for spec in range_set.split(",") if spec.strip()]
+    if not specs or len(specs) > MAX_RANGES:
+        return None
+
+    ranges = []
+    for spec in specs:
+        start_str, sep, end_str = spec.partition("-")
+        if not sep:
+            return None
+
+        try:
+            if start_str:
+                start = int(start_str)
+                end = int(end_str) if end_str else None
+                if start < 0 or (end is not None and end < start):
+                    return None
+                if end is None:
+                    end = file_size - 1
+            else:
+                # Suffix range: last N bytes
+                suffix_length = int(end_str)
+                if suffix_length <= 0:
+                    continue
+                start = max(file_size - suffix_length, 0)
+                end = file_size - 1
+        except ValueError:
+            return None
+
+        if start >= file_size:
+            continue
+
+        ranges.append((start, min(end, file_size - 1)))
+
+    if not ranges:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{file_size}"},
+        )
+
+    return ranges
+
+
+def if_range_matches(
+    if_range: Optional[str], etag: str, stat_result: os.stat_result
+) -> bool:
+    """Check an If-Range precondition against the current file validators"""
+    if not if_range:
+        return True
+
+    if_range = if_range.strip()
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        # Only strong entity tags may be used with If-Range
+        return if_range == etag
+
+    try:
+        since = parsedate_to_datetime(if_range)
+    except (TypeError, ValueError):
+        return False
+
+    return int(stat_result.st_mtime) == int(since.timestamp())
+
+
+def is_not_modified(request: Request, etag: str, stat_result: os.stat_result) -> bool:
+    """Evaluate If-None-Match / If-Modified-Since for a conditional GET"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        # Weak comparison: W/"x" matches "x" for If-None-Match
+        candidates = {
+            tag.strip().removeprefix("W/") for tag in if_none_match.split(",")
+        }
+        return "*" in candidates or etag in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return int(stat_result.st_mtime) <= int(since.timestamp())
+
+    return False
+
+
+def _multipart_headers(
+    ranges: List[Tuple[int, int]], boundary: str, media_type: str, file_size: int
+) -> List[bytes]:
+    """Build the part header block preceding each byte range"""
+    return [
+        (
+            f"--{boundary}\r\n"
+            f"Content-Type: {media_type}\r\n"
+            f"Content-Range: bytes {start}-{end}/{file_size}\r\n\r\n"
+        ).encode("latin-1")
+        for start, end in ranges
+    ]
+
+
+class FileRangeResponse(Response):
+    """Send byte ranges of a file with the cheapest transport available.
+
+    When ``STREAM_TRANSPORT=auto`` and the ASGI server advertises the
+    ``http.response.zerocopysend`` extension, ranges are handed to the server
+    as (file, offset, count) so it can use ``os.sendfile``. A whole-file
+    response may instead use ``http.response.pathsend``. Otherwise the file is
+    read with ``os.pread`` in the threadpool in ``STREAM_CHUNK_SIZE`` chunks.
+
+    With a ``cache_key`` the chunked path reads whole ``STREAM_CHUNK_SIZE``
+    aligned blocks through the in-process segment cache, so any range
+    pattern over a hot video is served from memory.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        segments: List[Union[bytes, Tuple[int, int]]],
+        status_code: int = 200,
+        media_type: Optional[str] = None,
+        headers: Optional[dict] = None,
+        whole_file: bool = False,
+        cache_key: Optional[Tuple[str, str]] = None,
+    ):
+        self.file_path = file_path
+        self.segments = segments
+        self.whole_file = whole_file
+        self.cache_key = cache_key
+        self.status_code = status_code
+        self.media_type = media_type
+        self.background = None
+        self.init_headers(headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            }
+        )
+
+        if scope.get("method") == "HEAD":
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        extensions = scope.get("extensions") or {}
+        if settings.stream_transport == "auto":
+            if self.whole_file and "http.response.pathsend" in extensions:
+                await send({"type": "http.response.pathsend", "path": self.file_path})
+                return
+
+            if "http.response.zerocopysend" in extensions:
+                await self._send_zero_copy(send)
+                return
+
+        await self._send_chunked(send)
+
+    async def _send_zero_copy(self, send: Send) -> None:
+        """Let the server sendfile() each range straight from the page cache"""
+        with open(self.file_path, mode="rb") as file_like:
+            for segment in self.segments:
+                if isinstance(segment, bytes):
+                    await send(
+                        {
+                            "type": "http.response.body",
+                            "body": segment,
+                            "more_body": True,
+                        }
+                    )
+                    continue
+
+                start, end = segment
+                await send(
+                    {
+                        "type": "http.response.zerocopysend",
+                        "file": file_like,
+                        "offset": start,
+                        "count": end - start + 1,
+                        "more_body": True,
+                    }
+                )
+
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    async def _send_chunked(self, send: Send) -> None:
+        """Read fixed-size chunks off the event loop and send them in order"""
+        fd = await run_in_threadpool(os.open, self.file_path, os.O_RDONLY)
+        try:
+            for segment in self.segments:
+                if isinstance(segment, bytes):
+                    await send(
+                        {
+                            "type": "http.response.body",
+                            "body": segment,
+                            "more_body": True,
+                        }
+                    )
+                    continue
+
+                offset, end = segment
+                while offset <= end:
+                    chunk = await self._read_chunk(fd, offset, end)
+                    if not chunk:
+                        break
+                    offset += len(chunk)
+                    await send(
+                        {"type": "http.response.body", "body": chunk, "more_body": True}
+                    )
+        finally:
+            os.close(fd)
+
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    async def _read_chunk(
+        self, fd: int, offset: int, end: int
+    ) -> Union[bytes, memoryview]:
+        """Read up to one chunk starting at offset, via the cache if enabled
+
+        Parts of a cached block are returned as memoryview slices, so
+        serving them does not copy the block.
+        """
+        chunk_size = settings.stream_chunk_size
+        if self.cache_key is None or not segment_cache.enabled:
+            return await run_in_threadpool(
+                os.pread, fd, min(chunk_size, end - offset + 1), offset
+            )
+
+        block_index, block_offset = divmod(offset, chunk_size)
+        key = (*self.cache_key, block_index)
+        block = segment_cache.get(key)
+        if block is None:
+            block = await run_in_threadpool(
+                os.pread, fd, chunk_size, block_index * chunk_size
+            )
+            segment_cache.put(key, block)
+
+        length = end - offset + 1
+        if block_offset == 0 and length >= len(block):
+            return block
+        return memoryview(block)[block_offset : block_offset + length]
+
+
+def build_file_response(
+    request: Request,
+    file_path: str,
+    media_type: str,
+    headers: Optional[dict] = None,
+    cache_key: Optional[Tuple[str, str]] = None,
+) -> Response:
+    """Stream a file honouring conditional and Range / If-Range request headers
+
+    ``cache_key`` is a (video unique_id, resource name) pair identifying the
+    file in the hot segment cache; omit it to always read from disk.
+    """
+    stat_result = os.stat(file_path)
+    file_size = stat_result.st_size
+    etag, last_modified = file_validators(stat_result)
+
+    response_headers = dict(headers or {})
+    response_headers.update(
+        {"Accept-Ranges": "bytes", "ETag": etag, "Last-Modified": last_modified}
+    )
+
+    if is_not_modified(request, etag, stat_result):
+        # Only validator and caching headers belong on a 304
+        not_modified_headers = {
+            key: value
+            for key, value in response_headers.items()
+            if key in ("ETag", "Last-Modified", "Cache-Control", "Expires")
+        }
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers=not_modified_headers
+        )
+
+    ranges = None
+    if if_range_matches(request.headers.get("if-range"), etag, stat_result):
+        ranges = parse_range_header(request.headers.get("range"), file_size)
+
+    if ranges is None:
+        response_headers["Content-Length"] = str(file_size)
+        return FileRangeResponse(
+            file_path,
+            [(0, file_size - 1)] if file_size else [],
+            media_type=media_type,
+            headers=response_headers,
+            whole_file=True,
+            cache_key=cache_key,
+        )
+
+    if len(ranges) == 1:
+        start, end = ranges[0]
+        response_headers["Content-Range"] = f"bytes {start}-{end}/{file_size}"
+        response_headers["Content-Length"] = str(end - start + 1)
+        return FileRangeResponse(
+            file_path,
+            ranges,
+            status_code=status.HTTP_206_PARTIAL_CONTENT,
+            media_type=media_type,
+            headers=response_headers,
+            cache_key=cache_key,
+        )
+
+    boundary = secrets.token_hex(13)
+    part_headers = _multipart_headers(ranges, boundary, media_type, file_size)
+
+    segments = []
+    for byte_range, part_header in zip(ranges, part_headers):
+        segments.extend([part_header, byte_range, b"\r\n"])
+    segments.append(f"--{boundary}--\r\n".encode("latin-1"))
+
+    content_length = sum(
+        len(segment) if isinstance(segment, bytes) else segment[1] - segment[0] + 1
+        for segment in segments
+    )
+    response_headers["Content-Length"] = str(content_length)
+
+    logger.debug(f"Serving {len(ranges)} byte ranges of {file_path}")
+
+    return FileRangeResponse(
+        file_path,
+        segments,
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type=f"multipart/byteranges; boundary={boundary}",
+        headers=response_headers,
+        cache_key=cache_key,
+    )
@@ -0,0 +1,118 @@
+"""ffmpeg CPU-seconds per video: separate passes vs single-decode processing.
+
+Generates a synthetic source (test pattern + tone) and measures the CPU
+time of the ffmpeg processes needed to convert it and produce a poster
+thumbnail plus extra stills, three ways:
+
+- before: conversion, then a thumbnail with ``-ss`` after ``-i`` (decodes
+  from the start) and likewise for every still
+- seek: conversion, then thumbnail and stills with input-side seeking
+- single-decode: conversion and poster from one ffmpeg graph, stills with
+  input-side seeking
+
+Run it with the app's environment so settings load:
+
+    PYTHONPATH=. python benchmarks/processing_cpu.py --duration 600 --stills 4
+"""
+
+import argparse
+import os
+import subprocess
+import tempfile
+
+from app.tasks.video_tasks import (
+    THUMBNAIL_SCALE,
+    extract_still,
+    process_video_file,
+)
+from app.utils.ffmpeg import child_cpu_seconds, run_ffmpeg
+
+
+def make_source(path: str, duration: int, size: str) -> None:
+    if os.path.exists(path):
+        return
+    cmd = [
+        "ffmpeg",
+        "-f",
+        "lavfi",
+        "-i",
+        f"testsrc2=size={size}:rate=30:duration={duration}",
+        "-f",
+        "lavfi",
+        "-i",
+        f"sine=frequency=440:duration={duration}",
+        "-c:v",
+        "libx264",
+        "-preset",
+        "ultrafast",
+        "-g",
+        "60",
+        "-c:a",
+        "aac",
+        "-y",
+        path,
+    ]
+    subprocess.run(cmd, check=True, capture_output=True)
+
+
+def output_side_still(video_path: str, output_path: str, offset: float) -> None:
+    """The thumbnail command as it was: -ss after -i decodes up to offset"""
+    cmd = [
+        "ffmpeg",
+        "-i",
+        video_path,
+        "-ss",
+        f"{offset:.3f}",
+        "-frames:v",
+        "1",
+        "-vf",
+        THUMBNAIL_SCALE,
+        "-y",
+        output_path,
+    ]
+    run_ffmpeg(cmd, 600)
+
+
+def still_offsets(duration: int, count: int) -> list:
+    return [duration * n / (count + 1) for n in range(1, count + 1)]
+
+
+def run(mode: str, source: str, workdir: str, duration: int, stills: int) -> float:
+    output = os.path.join(workdir, "converted.mp4")
+    poster = os.path.join(workdir, "poster.jpg")
+    started = child_cpu_seconds()
+
+    if mode == "single-decode":
+        process_video_file(source, output, thumbnail_path=poster)
+    else:
+        process_video_file(source, output)
+
+    grab = output_side_still if mode == "before" else extract_still
+    if mode != "single-decode":
+        grab(output, poster, 1.0)
+    for n, offset in enumerate(still_offsets(duration, stills)):
+        grab(output, os.path.join(workdir, f"still_{n}.jpg"), offset)
+
+    return child_cpu_seconds() - started
+
+
+def main(args):
+    os.environ["ENABLE_VIDEO_CONVERSION"] = "true"
+    source = os.path.join(args.workdir, f"synthetic_{args.duration}s_{args.size}.mp4")
+
+    print(f"Generating {args.duration}s {args.size} source...")
+    make_source(source, args.duration, args.size)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for mode in ("before", "seek", "single-decode"):
+            cpu = run(mode, source, workdir, args.duration, args.stills)
+            print(f"{mode}: {cpu:.1f} CPU-seconds")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=int, default=600)
+    parser.add_argument("--size", default="1280x720")
+    parser.add_argument("--stills", type=int, default=4)
+    parser.add_argument("--workdir", default="/tmp")
+    main(parser.parse_args())
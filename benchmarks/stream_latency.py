@@ -0,0 +1,107 @@
+"""Stream latency under concurrent admin-list traffic.
+
+Measures time-to-first-byte and total time of 1MB range requests against
+the stream endpoint while a number of clients hammer /video/list. Run it
+against a server started from each revision you want to compare, e.g.
+
+    uvicorn app.main:app --workers 1
+    python benchmarks/stream_latency.py --video-id 1 --admin-clients 32
+
+A single uvicorn worker makes event-loop blocking visible: with sync
+database calls in async handlers every list query stalls the streams.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+async def login(client: httpx.AsyncClient, username: str, password: str) -> str:
+    response = await client.post(
+        "/api/v1/auth/login-json", json={"username": username, "password": password}
+    )
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def admin_list_load(
+    client: httpx.AsyncClient, headers: dict, stop: asyncio.Event, counter: list
+):
+    while not stop.is_set():
+        response = await client.get("/api/v1/video/list", headers=headers)
+        response.raise_for_status()
+        counter[0] += 1
+
+
+async def measure_stream(
+    client: httpx.AsyncClient, stream_url: str, samples: int
+) -> tuple:
+    first_byte, total = [], []
+    for _ in range(samples):
+        started = time.perf_counter()
+        async with client.stream(
+            "GET", stream_url, headers={"Range": "bytes=0-1048575"}
+        ) as response:
+            response.raise_for_status()
+            first = None
+            async for _ in response.aiter_raw():
+                if first is None:
+                    first = time.perf_counter()
+        first_byte.append(first - started)
+        total.append(time.perf_counter() - started)
+    return first_byte, total
+
+
+def summarize(label: str, values: list) -> str:
+    values = sorted(values)
+    p95 = values[int(len(values) * 0.95) - 1]
+    p99 = values[int(len(values) * 0.99) - 1]
+    return (
+        f"{label}: p50={statistics.median(values) * 1000:.1f}ms "
+        f"p95={p95 * 1000:.1f}ms p99={p99 * 1000:.1f}ms"
+    )
+
+
+async def main(args):
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60) as client:
+        access_token = await login(client, args.username, args.password)
+        headers = {"Authorization": f"Bearer {access_token}"}
+
+        response = await client.post(
+            f"/api/v1/video/{args.video_id}/generate-token", headers=headers
+        )
+        response.raise_for_status()
+        stream_url = response.json()["streaming_url"]
+
+        stop = asyncio.Event()
+        counter = [0]
+        load = [
+            asyncio.create_task(admin_list_load(client, headers, stop, counter))
+            for _ in range(args.admin_clients)
+        ]
+
+        started = time.perf_counter()
+        first_byte, total = await measure_stream(client, stream_url, args.samples)
+        elapsed = time.perf_counter() - started
+
+        stop.set()
+        await asyncio.gather(*load)
+
+    print(f"admin clients: {args.admin_clients}, stream samples: {args.samples}")
+    print(summarize("stream TTFB", first_byte))
+    print(summarize("stream 1MB", total))
+    print(f"admin list throughput: {counter[0] / elapsed:.1f} req/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--video-id", type=int, required=True)
+    parser.add_argument("--admin-clients", type=int, default=32)
+    parser.add_argument("--samples", type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,112 @@
+"""Wall-clock time of a whole-file transcode vs split/encode/concat.
+
+Generates a synthetic source (test pattern + tone) with ffmpeg, encodes it
+once the way ``process_video_file`` does, then runs the chunked pipeline
+with an increasing number of workers. Workers are simulated with a thread
+pool, each running one ffmpeg at a time like a Celery worker with
+concurrency 1; run it with the app's environment so settings load:
+
+    PYTHONPATH=. python benchmarks/transcode_chunks.py --duration 1800 \\
+        --chunk-seconds 60 --workers 1,2,4,8 --encode-threads 2
+
+On a single host the speedup is bounded by its cores, so give each encode
+a fixed --encode-threads to model workers on separate machines.
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.tasks.video_tasks import (
+    concat_chunks,
+    encode_chunk_file,
+    process_video_file,
+    split_source,
+)
+
+
+def make_source(path: str, duration: int, size: str) -> None:
+    if os.path.exists(path):
+        return
+    cmd = [
+        "ffmpeg",
+        "-f",
+        "lavfi",
+        "-i",
+        f"testsrc2=size={size}:rate=30:duration={duration}",
+        "-f",
+        "lavfi",
+        "-i",
+        f"sine=frequency=440:duration={duration}",
+        "-c:v",
+        "libx264",
+        "-preset",
+        "ultrafast",
+        "-g",
+        "60",
+        "-c:a",
+        "aac",
+        "-y",
+        path,
+    ]
+    subprocess.run(cmd, check=True, capture_output=True)
+
+
+def chunked(source: str, output: str, chunk_seconds: int, workers: int, threads: int):
+    work_dir = tempfile.mkdtemp(prefix="chunks_")
+    try:
+        chunks = split_source(source, work_dir, chunk_seconds)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            encoded = list(
+                pool.map(lambda path: encode_chunk_file(path, threads), chunks)
+            )
+        concat_chunks(encoded, source, output, has_audio=True)
+        return len(chunks)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main(args):
+    os.environ["ENABLE_VIDEO_CONVERSION"] = "true"
+    source = os.path.join(args.workdir, f"synthetic_{args.duration}s_{args.size}.mp4")
+    output = os.path.join(args.workdir, "transcoded.mp4")
+
+    print(f"Generating {args.duration}s {args.size} source...")
+    make_source(source, args.duration, args.size)
+
+    started = time.perf_counter()
+    process_video_file(source, output)
+    baseline = time.perf_counter() - started
+    print(f"single ffmpeg: {baseline:.1f}s")
+
+    for workers in args.workers:
+        started = time.perf_counter()
+        chunks = chunked(
+            source, output, args.chunk_seconds, workers, args.encode_threads
+        )
+        elapsed = time.perf_counter() - started
+        print(
+            f"{workers} workers, {chunks} chunks: {elapsed:.1f}s "
+            f"(speedup {baseline / elapsed:.2f}x)"
+        )
+
+    os.remove(output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=int, default=600)
+    parser.add_argument("--size", default="1280x720")
+    parser.add_argument("--chunk-seconds", type=int, default=60)
+    parser.add_argument(
+        "--workers",
+        type=lambda value: [int(count) for count in value.split(",")],
+        default=[1, 2, 4, 8],
+    )
+    parser.add_argument("--encode-threads", type=int, default=0)
+    parser.add_argument("--workdir", default="/tmp")
+    main(parser.parse_args())
@@ -0,0 +1,144 @@
+"""Wall time, peak RSS and disk writes of /video/upload vs /video/upload-stream.
+
+Start the API with a MAX_FILE_SIZE large enough for the biggest size and
+pass its PID so the server's peak RSS (VmHWM) and bytes written to storage
+can be read around each upload (Linux only, needs permission to write
+/proc/PID/clear_refs):
+
+    MAX_FILE_SIZE=6000000000 uvicorn app.main:app --workers 1 &
+    python benchmarks/upload_paths.py --server-pid $! --sizes-mb 1024,5120
+
+The source file is streamed from disk by the client, so client memory
+stays flat. The processing task is only queued, so each upload leaves its
+temp file under UPLOAD_DIR/temp; remove those between runs.
+"""
+
+import argparse
+import asyncio
+import os
+import secrets
+import time
+
+import httpx
+
+READ_SIZE = 1024 * 1024
+
+
+def make_source(path: str, size: int) -> None:
+    if os.path.exists(path) and os.path.getsize(path) == size:
+        return
+    with open(path, "wb") as f:
+        remaining = size
+        while remaining:
+            block = os.urandom(min(READ_SIZE, remaining))
+            f.write(block)
+            remaining -= len(block)
+
+
+def multipart_body(path: str, title: str):
+    """Return (content type, length, async body) streaming the file from disk"""
+    boundary = secrets.token_hex(16)
+    head = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="title"\r\n\r\n{title}\r\n'
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="bench.mp4"\r\n'
+        f"Content-Type: video/mp4\r\n\r\n"
+    ).encode()
+    tail = f"\r\n--{boundary}--\r\n".encode()
+    length = len(head) + os.path.getsize(path) + len(tail)
+
+    async def body():
+        yield head
+        with open(path, "rb") as f:
+            while chunk := f.read(READ_SIZE):
+                yield chunk
+        yield tail
+
+    return f"multipart/form-data; boundary={boundary}", length, body()
+
+
+def reset_peak_rss(pid: int) -> None:
+    with open(f"/proc/{pid}/clear_refs", "w") as f:
+        f.write("5")
+
+
+def written_mb(pid: int) -> float:
+    """Bytes the process has caused to be written to storage so far"""
+    with open(f"/proc/{pid}/io") as f:
+        for line in f:
+            if line.startswith("write_bytes:"):
+                return int(line.split()[1]) / (1024 * 1024)
+    return 0.0
+
+
+def peak_rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+async def upload(client: httpx.AsyncClient, path: str, endpoint: str, headers: dict):
+    content_type, length, body = multipart_body(path, f"bench {endpoint}")
+    response = await client.post(
+        endpoint,
+        content=body,
+        headers={
+            **headers,
+            "Content-Type": content_type,
+            "Content-Length": str(length),
+        },
+    )
+    response.raise_for_status()
+
+
+async def main(args):
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=None) as client:
+        response = await client.post(
+            "/api/v1/auth/login-json",
+            json={"username": args.username, "password": args.password},
+        )
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        for size_mb in args.sizes_mb:
+            path = os.path.join(args.workdir, f"upload_{size_mb}mb.bin")
+            make_source(path, size_mb * 1024 * 1024)
+
+            for endpoint in ("/api/v1/video/upload", "/api/v1/video/upload-stream"):
+                if args.server_pid:
+                    reset_peak_rss(args.server_pid)
+                    written_before = written_mb(args.server_pid)
+
+                started = time.perf_counter()
+                await upload(client, path, endpoint, headers)
+                elapsed = time.perf_counter() - started
+
+                server = ""
+                if args.server_pid:
+                    written = written_mb(args.server_pid) - written_before
+                    server = (
+                        f", server peak RSS {peak_rss_mb(args.server_pid):.0f}MB"
+                        f", written {written:.0f}MB"
+                    )
+                print(
+                    f"{size_mb}MB {endpoint}: {elapsed:.1f}s "
+                    f"({size_mb / elapsed:.0f} MB/s){server}"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--server-pid", type=int)
+    parser.add_argument(
+        "--sizes-mb",
+        type=lambda value: [int(size) for size in value.split(",")],
+        default=[1024, 5120],
+    )
+    parser.add_argument("--workdir", default="/tmp")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,1020 @@
+import asyncio
+import os
+import tempfile
+import threading
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+TEST_ROOT = tempfile.mkdtemp(prefix="video_streaming_tests_")
+
+# Settings are read at import time, so configure the environment first
+for key, value in {
+    "DATABASE_URL": f"sqlite:///{TEST_ROOT}/test.db",
+    "POSTGRES_USER": "postgres",
+    "POSTGRES_PASSWORD": "password",
+    "POSTGRES_DB": "video_streaming_test",
+    "REDIS_URL": "redis://localhost:6379/0",
+    "SECRET_KEY": "test-secret-key",
+    "ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "30",
+    "ADMIN_USERNAME": "admin",
+    "ADMIN_PASSWORD": "admin123",
+    "ADMIN_EMAIL": "admin@example.com",
+    "UPLOAD_DIR": f"{TEST_ROOT}/uploads",
+    "VIDEO_DIR": f"{TEST_ROOT}/videos",
+    "MAX_FILE_SIZE": "209715200",
+    "ALLOWED_VIDEO_TYPES": "mp4,avi,mov,mkv,webm",
+    "APP_NAME": "Video Streaming Service",
+    "APP_VERSION": "1.0.0",
+    "DEBUG": "False",
+    "API_PREFIX": "/api/v1",
+    "ALLOWED_ORIGINS": "http://localhost:8000",
+    "CELERY_BROKER_URL": "memory://",
+    "CELERY_RESULT_BACKEND": "cache+memory://",
+    "LOG_LEVEL": "INFO",
+    "LOG_FILE": f"{TEST_ROOT}/logs/app.log",
+    "PROGRESS_PUBSUB": "False",
+}.items():
+    os.environ.setdefault(key, value)
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+from fastapi import HTTPException, Request  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.exc import IntegrityError  # noqa: E402
+from sqlalchemy.ext.asyncio import create_async_engine  # noqa: E402
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool  # noqa: E402
+from starlette.datastructures import Headers  # noqa: E402
+
+from app.database import AsyncSessionLocal, Base, SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+from app.middleware.auth import AdminAuthMiddleware  # noqa: E402
+from app.models.asset import MediaAsset  # noqa: E402
+from app.models.processing import ProcessingEvent  # noqa: E402
+from app.models.upload import (  # noqa: E402
+    UploadChunk,
+    UploadSession,
+    UploadSessionStatus,
+)
+from app.models.user import User  # noqa: E402
+from app.models.video import Video, VideoStatus  # noqa: E402
+from app.services.asset_store import (  # noqa: E402
+    attach_asset,
+    find_asset,
+    register_asset,
+)
+from app.services.principal_cache import principal_cache  # noqa: E402
+from app.services.processing_events import record_event  # noqa: E402
+from app.services.video_service import VideoService  # noqa: E402
+from app.tasks.video_tasks import (  # noqa: E402
+    CHUNK_DIR_PREFIX,
+    chunked_transcode_failed,
+    cleanup_temp_files,
+    expire_upload_sessions,
+    start_chunked_transcode,
+)
+from app.utils.cache import ByteLRUCache  # noqa: E402
+from app.utils.helpers import (  # noqa: E402
+    CONTENT_HASH_BLOCK_SIZE,
+    ContentHasher,
+    calculate_content_hash,
+    combine_block_digests,
+)
+from app.utils.keyframes import KeyframeIndex, pack_keyframes  # noqa: E402
+from app.utils.multipart import StreamingUploadParser  # noqa: E402
+from app.utils.security import (  # noqa: E402
+    PasswordHashExecutor,
+    create_access_token,
+    generate_signed_stream_params,
+    generate_video_token,
+    verify_stream_signature,
+)
+from app.utils.streaming import (  # noqa: E402
+    file_validators,
+    if_range_matches,
+    is_not_modified,
+    parse_range_header,
+)
+
+
+@pytest.fixture
+def pooled_engine():
+    """Bind sessions to real connection pools so checkouts can be counted"""
+    engine = create_engine(
+        f"sqlite:///{TEST_ROOT}/pool.db",
+        connect_args={"check_same_thread": False},
+        poolclass=QueuePool,
+    )
+    async_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{TEST_ROOT}/pool.db",
+        poolclass=AsyncAdaptedQueuePool,
+    )
+    Base.metadata.create_all(bind=engine)
+    # Ids restart with every database, so no principal may outlive one
+    principal_cache.clear()
+    original_bind = SessionLocal.kw["bind"]
+    original_async_bind = AsyncSessionLocal.kw["bind"]
+    SessionLocal.configure(bind=engine)
+    AsyncSessionLocal.configure(bind=async_engine)
+    try:
+        yield engine, async_engine
+    finally:
+        SessionLocal.configure(bind=original_bind)
+        AsyncSessionLocal.configure(bind=original_async_bind)
+        asyncio.run(async_engine.dispose())
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+
+@pytest.fixture
+def completed_video(pooled_engine):
+    """A processed video whose file spans several stream chunks"""
+    file_path = os.path.join(TEST_ROOT, "stream.mp4")
+    with open(file_path, "wb") as f:
+        f.write(os.urandom(4 * 1024 * 1024))
+
+    db = SessionLocal()
+    try:
+        user = User(username="viewer", email="viewer@example.com", hashed_password="x")
+        db.add(user)
+        db.commit()
+
+        video = Video(
+            title="Stream test",
+            original_filename="stream.mp4",
+            file_path=file_path,
+            status=VideoStatus.COMPLETED,
+            uploaded_by_id=user.id,
+        )
+        db.add(video)
+        db.commit()
+        video_ids = (video.unique_id, generate_video_token(video.id, user.id))
+    finally:
+        db.close()
+
+    return video_ids
+
+
+@pytest.fixture
+def admin_headers(pooled_engine):
+    """Authorization header of an admin user"""
+    db = SessionLocal()
+    try:
+        admin = User(
+            username="uploader",
+            email="uploader@example.com",
+            hashed_password="x",
+            is_admin=True,
+        )
+        db.add(admin)
+        db.commit()
+        token = create_access_token(
+            {"sub": admin.username, "user_id": admin.id, "is_admin": True}
+        )
+    finally:
+        db.close()
+
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _api(requests):
+    """Run a coroutine function against the app with an HTTP client"""
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://testserver/api/v1/video"
+        ) as client:
+            return await requests(client)
+
+    return asyncio.run(run())
+
+
+def test_stream_releases_db_connection_before_sending_body(
+    pooled_engine, completed_video
+):
+    engine, async_engine = pooled_engine
+    unique_id, token = completed_video
+    checkouts_during_body = []
+    statuses = []
+
+    async def receive():
+        await asyncio.sleep(3600)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+        elif message["type"] == "http.response.body" and message.get("more_body"):
+            checkouts_during_body.append(
+                engine.pool.checkedout() + async_engine.pool.checkedout()
+            )
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": f"/api/v1/video/stream/{unique_id}",
+        "raw_path": f"/api/v1/video/stream/{unique_id}".encode(),
+        "root_path": "",
+        "query_string": f"token={token}".encode(),
+        "headers": [(b"host", b"testserver")],
+        "client": ("127.0.0.1", 12345),
+        "server": ("testserver", 80),
+    }
+
+    asyncio.run(app(scope, receive, send))
+
+    assert statuses == [200]
+    assert len(checkouts_during_body) > 1
+    assert set(checkouts_during_body) == {0}
+
+
+def test_processing_events_survive_savepoint_rollback(pooled_engine):
+    db = SessionLocal()
+    try:
+        user = User(username="events", email="events@example.com", hashed_password="x")
+        db.add(user)
+        db.add(MediaAsset(content_hash="a" * 64, file_path="/tmp/a.mp4"))
+        db.commit()
+
+        video = Video(title="Events", original_filename="a.mp4", uploaded_by_id=user.id)
+        db.add(video)
+        db.commit()
+
+        record_event(db, video, "process", "Video processed")
+        record_event(db, video, "complete", "Video processing completed")
+
+        # Like register_asset losing a race on the content hash
+        with pytest.raises(IntegrityError):
+            with db.begin_nested():
+                db.add(MediaAsset(content_hash="a" * 64, file_path="/tmp/b.mp4"))
+
+        db.commit()
+
+        stages = [
+            event.stage
+            for event in db.query(ProcessingEvent)
+            .filter(ProcessingEvent.video_id == video.id)
+            .order_by(ProcessingEvent.id)
+        ]
+        assert stages == ["process", "complete"]
+    finally:
+        db.close()
+
+
+def test_signed_stream_url_accepts_valid_signature():
+    params = generate_signed_stream_params("abc", 7, expires_in=60)
+    assert verify_stream_signature("abc", 7, params["expires"], params["sig"])
+
+
+def test_signed_stream_url_rejects_expired_signature():
+    params = generate_signed_stream_params("abc", 7, expires_in=-1)
+    assert not verify_stream_signature("abc", 7, params["expires"], params["sig"])
+
+
+def test_signed_stream_url_rejects_tampered_signature():
+    params = generate_signed_stream_params("abc", 7, expires_in=60)
+    expires, sig = params["expires"], params["sig"]
+    tampered = ("0" if sig[0] != "0" else "1") + sig[1:]
+
+    assert not verify_stream_signature("abc", 7, expires, tampered)
+    assert not verify_stream_signature("abc", 8, expires, sig)
+    assert not verify_stream_signature("abd", 7, expires, sig)
+    assert not verify_stream_signature("abc", 7, expires + 1, sig)
+
+
+def test_signed_stream_url_rejects_non_ascii_signature():
+    params = generate_signed_stream_params("abc", 7, expires_in=60)
+    assert not verify_stream_signature("abc", 7, params["expires"], "é" * 64)
+
+
+def test_segment_cache_admits_blocks_on_second_read():
+    cache = ByteLRUCache(max_bytes=4)
+    for block in range(4):
+        cache.put(("hot", block), b"h")
+        cache.put(("hot", block), b"h")
+
+    # A cold sequential read offers each block once and must not evict
+    for block in range(100):
+        cache.put(("cold", block), b"c")
+
+    assert all(cache.get(("hot", block)) == b"h" for block in range(4))
+    assert cache.get(("cold", 0)) is None
+    assert cache.stats()["evictions"] == 0
+
+
+def test_parse_range_header_single_ranges():
+    assert parse_range_header(None, 1000) is None
+    assert parse_range_header("bytes=0-99", 1000) == [(0, 99)]
+    assert parse_range_header("bytes=900-", 1000) == [(900, 999)]
+    assert parse_range_header("bytes=-100", 1000) == [(900, 999)]
+    assert parse_range_header("bytes=-5000", 1000) == [(0, 999)]
+    assert parse_range_header("bytes=990-5000", 1000) == [(990, 999)]
+
+
+def test_parse_range_header_multiple_ranges():
+    assert parse_range_header("bytes=0-9, 20-29,-10", 1000) == [
+        (0, 9),
+        (20, 29),
+        (990, 999),
+    ]
+    # Unsatisfiable members are dropped while any range overlaps the file
+    assert parse_range_header("bytes=0-9,2000-2010", 1000) == [(0, 9)]
+
+
+def test_parse_range_header_unsatisfiable():
+    for header in ("bytes=1000-", "bytes=1000-1010,2000-", "bytes=-0"):
+        with pytest.raises(HTTPException) as exc_info:
+            parse_range_header(header, 1000)
+        assert exc_info.value.status_code == 416
+        assert exc_info.value.headers["Content-Range"] == "bytes */1000"
+
+
+def test_parse_range_header_malformed_sends_whole_file():
+    for header in (
+        "items=0-9",
+        "bytes=",
+        "bytes=abc-def",
+        "bytes=9-0",
+        "bytes=5",
+        "bytes=" + ",".join(["0-1"] * 17),
+    ):
+        assert parse_range_header(header, 1000) is None
+
+
+def _file_stat():
+    path = os.path.join(TEST_ROOT, "validators.bin")
+    with open(path, "wb") as f:
+        f.write(b"x" * 10)
+    return os.stat(path)
+
+
+def _request(**headers):
+    return Request(
+        {
+            "type": "http",
+            "headers": [
+                (name.replace("_", "-").encode(), value.encode())
+                for name, value in headers.items()
+            ],
+        }
+    )
+
+
+def test_if_range_matches():
+    stat_result = _file_stat()
+    etag, last_modified = file_validators(stat_result)
+
+    assert if_range_matches(None, etag, stat_result)
+    assert if_range_matches(etag, etag, stat_result)
+    assert not if_range_matches('"stale"', etag, stat_result)
+    # Weak tags never satisfy If-Range
+    assert not if_range_matches(f"W/{etag}", etag, stat_result)
+    assert if_range_matches(last_modified, etag, stat_result)
+    assert not if_range_matches("Thu, 01 Jan 1970 00:00:00 GMT", etag, stat_result)
+    assert not if_range_matches("not a date", etag, stat_result)
+
+
+def test_is_not_modified():
+    stat_result = _file_stat()
+    etag, last_modified = file_validators(stat_result)
+
+    assert not is_not_modified(_request(), etag, stat_result)
+    assert is_not_modified(_request(if_none_match=etag), etag, stat_result)
+    assert is_not_modified(
+        _request(if_none_match=f'"other", W/{etag}'), etag, stat_result
+    )
+    assert is_not_modified(_request(if_none_match="*"), etag, stat_result)
+    assert not is_not_modified(_request(if_none_match='"other"'), etag, stat_result)
+    assert is_not_modified(_request(if_modified_since=last_modified), etag, stat_result)
+    assert not is_not_modified(
+        _request(if_modified_since="Thu, 01 Jan 1970 00:00:00 GMT"),
+        etag,
+        stat_result,
+    )
+    # If-None-Match takes precedence over If-Modified-Since
+    assert not is_not_modified(
+        _request(if_none_match='"other"', if_modified_since=last_modified),
+        etag,
+        stat_result,
+    )
+
+
+def test_content_hasher_combines_blocks_hashed_out_of_order():
+    data = os.urandom(2 * CONTENT_HASH_BLOCK_SIZE + 12345)
+    single_pass = ContentHasher()
+    for offset in range(0, len(data), 1000003):
+        single_pass.update(data[offset : offset + 1000003])
+
+    # One hasher per resumable-upload chunk, completed in reverse order
+    block = CONTENT_HASH_BLOCK_SIZE
+    chunk_digests = {}
+    for index in reversed(range(3)):
+        hasher = ContentHasher()
+        hasher.update(data[index * block : (index + 1) * block])
+        chunk_digests[index] = hasher.block_digests()
+
+    combined = combine_block_digests(b"".join(chunk_digests[i] for i in range(3)))
+    assert single_pass.size == len(data)
+    assert combined == single_pass.hexdigest()
+    assert (
+        combine_block_digests(b"".join(chunk_digests[i] for i in (1, 0, 2)))
+        != single_pass.hexdigest()
+    )
+
+
+def test_streaming_upload_parser_handles_split_boundaries():
+    boundary = "----boundaryXYZ"
+    content = os.urandom(64 * 1024) + b"\r\n--" + boundary.encode()[:-1]
+    body = (
+        (
+            f"--{boundary}\r\n"
+            'Content-Disposition: form-data; name="title"\r\n\r\n'
+            "My video\r\n"
+            f"--{boundary}\r\n"
+            'Content-Disposition: form-data; name="file"; filename="clip.mp4"\r\n'
+            "Content-Type: video/mp4\r\n\r\n"
+        ).encode()
+        + content
+        + (
+            f"\r\n--{boundary}\r\n"
+            'Content-Disposition: form-data; name="description"\r\n\r\n'
+            "Split\r\n"
+            f"--{boundary}--\r\n"
+        ).encode()
+    )
+    headers = Headers({"content-type": f"multipart/form-data; boundary={boundary}"})
+    expected = ContentHasher()
+    expected.update(content)
+
+    # Pieces of 1 and 7 bytes cut every boundary and header; the others
+    # split the delimiter that follows the file part at various points
+    delimiter = body.index(b"\r\n--" + boundary.encode() + b"\r\n", len(content))
+    for cuts in (1, 7, 4096, [delimiter + 1], [delimiter + 3, delimiter + 9]):
+        if isinstance(cuts, int):
+            pieces = [body[i : i + cuts] for i in range(0, len(body), cuts)]
+        else:
+            bounds = [0, *cuts, len(body)]
+            pieces = [body[a:b] for a, b in zip(bounds, bounds[1:])]
+
+        async def stream(pieces=pieces):
+            for piece in pieces:
+                yield piece
+
+        destination = os.path.join(TEST_ROOT, "streamed.mp4")
+        parser = StreamingUploadParser(headers, stream(), destination, 1024 * 1024)
+        fields = asyncio.run(parser.parse())
+
+        assert fields == {"title": "My video", "description": "Split"}
+        assert parser.filename == "clip.mp4"
+        with open(destination, "rb") as f:
+            assert f.read() == content
+        assert parser.size == len(content)
+        assert parser.content_hash == expected.hexdigest()
+
+
+def test_keyframe_index_seek():
+    index = KeyframeIndex.from_bytes(
+        pack_keyframes([(4.0, 4000), (0.0, 48), (2.002, 2100), (6.5, 7000)])
+    )
+
+    assert len(index) == 4
+    assert index.seek(0) == (0.0, 48)
+    assert index.seek(2.001) == (0.0, 48)
+    assert index.seek(2.002) == (2.002, 2100)
+    assert index.seek(3.9) == (2.002, 2100)
+    assert index.seek(4.0) == (4.0, 4000)
+    assert index.seek(100) == (6.5, 7000)
+    # Before the first keyframe, or a negative time, starts from the top
+    assert index.seek(-1) == (0.0, 48)
+
+
+def _create_upload(client, headers, size):
+    return client.post(
+        "/uploads",
+        headers=headers,
+        json={"title": "Resumable", "filename": "clip.mp4", "total_size": size},
+    )
+
+
+def test_resumable_upload_accepts_chunks_out_of_order(admin_headers):
+    data = os.urandom(2 * CONTENT_HASH_BLOCK_SIZE * 2 + 1000)
+
+    async def requests(client):
+        upload = (await _create_upload(client, admin_headers, len(data))).json()
+        upload_id, chunk_size = upload["upload_id"], upload["chunk_size"]
+        assert upload["total_chunks"] == 3
+
+        for index in (2, 0, 1, 0):
+            response = await client.put(
+                f"/uploads/{upload_id}/chunks/{index}",
+                headers=admin_headers,
+                content=data[index * chunk_size : (index + 1) * chunk_size],
+            )
+            assert response.status_code == 200
+
+        session = await client.get(f"/uploads/{upload_id}", headers=admin_headers)
+        completed = await client.post(
+            f"/uploads/{upload_id}/complete", headers=admin_headers
+        )
+        again = await client.post(
+            f"/uploads/{upload_id}/complete", headers=admin_headers
+        )
+        return session.json(), completed, again
+
+    session, completed, again = _api(requests)
+
+    assert session["received_chunks"] == [0, 1, 2]
+    assert completed.status_code == 200
+    assert again.status_code == 409
+
+    db = SessionLocal()
+    try:
+        video = db.get(Video, completed.json()["id"])
+        upload = db.query(UploadSession).one()
+        assert upload.status == UploadSessionStatus.COMPLETED
+        assert upload.video_id == video.id
+        assert video.file_size == len(data)
+        assert (video.file_size, video.content_hash) == calculate_content_hash(
+            upload.temp_path
+        )
+    finally:
+        db.close()
+
+
+def test_resumable_upload_rejects_chunk_finishing_after_complete(admin_headers):
+    data = os.urandom(1000)
+
+    async def requests(client):
+        upload = (await _create_upload(client, admin_headers, len(data))).json()
+
+        async def body():
+            yield data[:500]
+            # complete() claims the session while the chunk is in flight
+            db = SessionLocal()
+            db.query(UploadSession).update({"status": UploadSessionStatus.COMPLETING})
+            db.commit()
+            db.close()
+            yield data[500:]
+
+        return await client.put(
+            f"/uploads/{upload['upload_id']}/chunks/0",
+            headers=admin_headers,
+            content=body(),
+        )
+
+    response = _api(requests)
+
+    assert response.status_code == 409
+    db = SessionLocal()
+    try:
+        assert db.query(UploadChunk).count() == 0
+    finally:
+        db.close()
+
+
+def test_resumable_upload_reopens_when_processing_cannot_be_queued(admin_headers):
+    data = os.urandom(1000)
+
+    async def requests(client):
+        upload = (await _create_upload(client, admin_headers, len(data))).json()
+        upload_id = upload["upload_id"]
+        await client.put(
+            f"/uploads/{upload_id}/chunks/0", headers=admin_headers, content=data
+        )
+
+        with mock.patch(
+            "app.services.upload_service.process_video.delay",
+            side_effect=ConnectionError("broker down"),
+        ):
+            failed = await client.post(
+                f"/uploads/{upload_id}/complete", headers=admin_headers
+            )
+        retried = await client.post(
+            f"/uploads/{upload_id}/complete", headers=admin_headers
+        )
+        return failed, retried
+
+    failed, retried = _api(requests)
+
+    assert failed.status_code == 503
+    assert retried.status_code == 200
+    db = SessionLocal()
+    try:
+        assert [video.id for video in db.query(Video)] == [retried.json()["id"]]
+    finally:
+        db.close()
+
+
+def test_expired_upload_sessions_are_aborted(admin_headers):
+    async def create(client):
+        return (await _create_upload(client, admin_headers, 1000)).json()
+
+    upload_id = _api(create)["upload_id"]
+
+    db = SessionLocal()
+    try:
+        upload = db.get(UploadSession, upload_id)
+        upload.expires_at = datetime.now(timezone.utc) - timedelta(minutes=1)
+        db.commit()
+        temp_path = upload.temp_path
+        assert os.path.exists(temp_path)
+    finally:
+        db.close()
+
+    assert expire_upload_sessions() == 1
+    assert not os.path.exists(temp_path)
+
+    async def late_chunk(client):
+        return await client.put(
+            f"/uploads/{upload_id}/chunks/0",
+            headers=admin_headers,
+            content=b"x" * 1000,
+        )
+
+    assert _api(late_chunk).status_code == 409
+
+
+def test_streamed_upload_cleans_up_when_processing_cannot_be_queued(admin_headers):
+    temp_dir = os.path.join(TEST_ROOT, "uploads", "temp")
+    os.makedirs(temp_dir, exist_ok=True)
+    temp_files = set(os.listdir(temp_dir))
+
+    async def requests(client):
+        with mock.patch(
+            "app.services.video_service.process_video.delay",
+            side_effect=ConnectionError("broker down"),
+        ):
+            return await client.post(
+                "/upload-stream",
+                headers=admin_headers,
+                data={"title": "Streamed"},
+                files={"file": ("clip.mp4", os.urandom(1000), "video/mp4")},
+            )
+
+    assert _api(requests).status_code == 500
+    assert set(os.listdir(temp_dir)) == temp_files
+    db = SessionLocal()
+    try:
+        assert db.query(Video).count() == 0
+    finally:
+        db.close()
+
+
+def test_password_hasher_counts_cancelled_requests_separately():
+    hasher = PasswordHashExecutor(max_workers=1, max_queue=0)
+    release = threading.Event()
+
+    async def scenario():
+        with mock.patch(
+            "app.utils.security.verify_password",
+            side_effect=lambda *args: release.wait(5),
+        ):
+            request = asyncio.create_task(hasher.verify("secret", "hash"))
+            await asyncio.sleep(0.05)
+            request.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await request
+
+            # The abandoned hash still occupies the only worker
+            with pytest.raises(HTTPException) as exc_info:
+                await hasher.verify("secret", "hash")
+            assert exc_info.value.status_code == 503
+
+            release.set()
+            while hasher.pending:
+                await asyncio.sleep(0.01)
+            assert await hasher.verify("secret", "hash")
+
+    asyncio.run(scenario())
+
+    stats = hasher.stats()
+    assert (stats["completed"], stats["cancelled"], stats["rejected"]) == (1, 1, 1)
+    assert stats["pending"] == 0
+
+
+def _chunk_dir(name):
+    work_dir = os.path.join(TEST_ROOT, "uploads", "temp", CHUNK_DIR_PREFIX + name)
+    os.makedirs(work_dir, exist_ok=True)
+    with open(os.path.join(work_dir, "chunk_00000.mkv"), "wb") as f:
+        f.write(b"chunk")
+    return work_dir
+
+
+def _processing_video(db):
+    user = User(username="encoder", email="encoder@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    video = Video(
+        title="Chunked",
+        original_filename="long.mp4",
+        status=VideoStatus.PROCESSING,
+        uploaded_by_id=user.id,
+    )
+    db.add(video)
+    db.commit()
+    return video
+
+
+def test_failed_chunk_encode_removes_chunk_directory(pooled_engine):
+    db = SessionLocal()
+    try:
+        video = _processing_video(db)
+        work_dir = _chunk_dir(video.unique_id)
+
+        with mock.patch(
+            "app.tasks.video_tasks.fail_processing",
+            side_effect=RuntimeError("database gone"),
+        ):
+            with pytest.raises(RuntimeError):
+                chunked_transcode_failed(
+                    None, RuntimeError("encode failed"), None, video.id, "", work_dir
+                )
+        assert not os.path.exists(work_dir)
+    finally:
+        db.close()
+
+
+def test_failed_split_removes_chunk_directory(pooled_engine):
+    db = SessionLocal()
+    try:
+        video = _processing_video(db)
+
+        def split_fails(input_path, work_dir, chunk_seconds):
+            _chunk_dir(video.unique_id)
+            raise RuntimeError("split failed")
+
+        with mock.patch("app.tasks.video_tasks.split_source", split_fails):
+            with pytest.raises(RuntimeError):
+                start_chunked_transcode(db, video, "", "", {})
+        work_dir = os.path.join(
+            TEST_ROOT, "uploads", "temp", CHUNK_DIR_PREFIX + video.unique_id
+        )
+        assert not os.path.exists(work_dir)
+    finally:
+        db.close()
+
+
+def test_cleanup_sweeps_old_chunk_directories(pooled_engine):
+    stale, fresh = _chunk_dir("stale"), _chunk_dir("fresh")
+    os.utime(stale, (0, 0))
+
+    assert cleanup_temp_files()["cleaned_files"] >= 1
+    assert not os.path.exists(stale)
+    assert os.path.exists(fresh)
+
+
+def _processed_video(db, user, name, content_hash):
+    """A video whose processed file and thumbnail exist on disk"""
+    file_path = os.path.join(TEST_ROOT, "videos", f"{name}.mp4")
+    thumbnail_path = os.path.join(TEST_ROOT, "videos", f"{name}.jpg")
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    for path in (file_path, thumbnail_path):
+        with open(path, "wb") as f:
+            f.write(name.encode())
+
+    video = Video(
+        title=name,
+        original_filename=f"{name}.mp4",
+        status=VideoStatus.COMPLETED,
+        uploaded_by_id=user.id,
+        content_hash=content_hash,
+        file_path=file_path,
+        file_size=len(name),
+        thumbnail_path=thumbnail_path,
+        duration=10,
+    )
+    db.add(video)
+    db.commit()
+    return video
+
+
+def _asset_owner(db):
+    user = User(
+        username="assets",
+        email="assets@example.com",
+        hashed_password="x",
+        is_admin=True,
+    )
+    db.add(user)
+    db.commit()
+    return user
+
+
+def test_duplicate_content_attaches_to_registered_asset(pooled_engine):
+    db = SessionLocal()
+    try:
+        user = _asset_owner(db)
+        original = _processed_video(db, user, "original", "c" * 64)
+        asset = register_asset(db, original)
+        db.commit()
+
+        duplicate = Video(
+            title="Duplicate",
+            original_filename="copy.mp4",
+            uploaded_by_id=user.id,
+            content_hash="c" * 64,
+        )
+        db.add(duplicate)
+        db.commit()
+
+        attach_asset(db, duplicate, find_asset(db, duplicate.content_hash))
+        db.commit()
+        db.refresh(asset)
+
+        assert asset.ref_count == 2
+        assert duplicate.asset_id == original.asset_id == asset.id
+        assert duplicate.file_path == original.file_path
+        assert duplicate.thumbnail_path == original.thumbnail_path
+        assert duplicate.duration == original.duration
+    finally:
+        db.close()
+
+
+def test_concurrently_registered_content_shares_the_existing_asset(pooled_engine):
+    db = SessionLocal()
+    try:
+        user = _asset_owner(db)
+        # Another worker finished the same content first
+        first = _processed_video(db, user, "first", "d" * 64)
+        existing = register_asset(db, first)
+        db.commit()
+
+        second = _processed_video(db, user, "second", "d" * 64)
+        own_files = (second.file_path, second.thumbnail_path)
+        shared = register_asset(db, second)
+        db.commit()
+        db.refresh(existing)
+
+        assert shared.id == existing.id
+        assert existing.ref_count == 2
+        assert second.asset_id == existing.id
+        assert second.file_path == first.file_path
+        assert not any(os.path.exists(path) for path in own_files)
+        assert os.path.exists(first.file_path)
+        assert db.query(MediaAsset).count() == 1
+    finally:
+        db.close()
+
+
+def test_asset_files_are_removed_with_the_last_reference(pooled_engine):
+    db = SessionLocal()
+    try:
+        user = _asset_owner(db)
+        original = _processed_video(db, user, "shared", "e" * 64)
+        asset = register_asset(db, original)
+        db.commit()
+
+        duplicate = Video(
+            title="Duplicate",
+            original_filename="copy.mp4",
+            uploaded_by_id=user.id,
+            content_hash="e" * 64,
+        )
+        db.add(duplicate)
+        attach_asset(db, duplicate, asset)
+        db.commit()
+        files = (original.file_path, original.thumbnail_path)
+
+        video_service = VideoService(db)
+        assert video_service.delete_video(original.id, user)
+        db.refresh(asset)
+        assert asset.ref_count == 1
+        assert all(os.path.exists(path) for path in files)
+
+        assert video_service.delete_video(duplicate.id, user)
+        assert db.query(MediaAsset).count() == 0
+        assert not any(os.path.exists(path) for path in files)
+        assert duplicate.asset_id is None
+        assert duplicate.status == VideoStatus.DELETED
+    finally:
+        db.close()
+
+
+def _through_admin_middleware(path, headers=None, cookies=None):
+    """Send a request through AdminAuthMiddleware around a stub app"""
+    seen = []
+
+    async def stub(scope, receive, send):
+        seen.append(dict(scope.get("state", {})))
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    async def run():
+        transport = httpx.ASGITransport(
+            app=AdminAuthMiddleware(stub, protected_paths=["/admin"])
+        )
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://testserver", cookies=cookies
+        ) as client:
+            return await client.get(path, headers=headers)
+
+    response = asyncio.run(run())
+    return response, seen[0] if seen else None
+
+
+def _token(is_admin):
+    return create_access_token({"sub": "alice", "user_id": 7, "is_admin": is_admin})
+
+
+def test_admin_middleware_passes_public_paths_without_a_token():
+    for path in (
+        "/",
+        "/static/css/admin.css",
+        "/admin/login",
+        "/admin/logout",
+        "/health",
+        "/docs",
+        "/api/v1/video/stream/abc",
+        "/api/v1/video/uploads",
+    ):
+        response, state = _through_admin_middleware(path)
+        assert response.status_code == 200, path
+        assert state == {}, path
+
+
+def test_admin_middleware_redirects_protected_paths_without_an_admin_token():
+    for path in ("/admin", "/admin/dashboard", "/admin/videos/1"):
+        for headers in (
+            None,
+            {"Authorization": f"Bearer {_token(is_admin=False)}"},
+            {"Authorization": "Bearer not-a-jwt"},
+        ):
+            response, state = _through_admin_middleware(path, headers=headers)
+            assert response.status_code == 302, (path, headers)
+            assert response.headers["location"] == "/admin/login"
+            assert state is None
+
+
+def test_admin_middleware_admits_admin_token_from_header_or_cookie():
+    token = _token(is_admin=True)
+    for kwargs in (
+        {"headers": {"Authorization": f"Bearer {token}"}},
+        {"cookies": {"access_token": token}},
+    ):
+        response, state = _through_admin_middleware("/admin/dashboard", **kwargs)
+        assert response.status_code == 200
+        assert state == {"user_id": 7, "username": "alice", "is_admin": True}
+
+
+def _cached_principal(db):
+    user = User(username="cached", email="cached@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    asyncio.run(principal_cache.get(user.id))
+    assert principal_cache.local.get(user.id) is not None
+    return user
+
+
+def test_user_update_invalidates_principal_after_outer_commit(pooled_engine):
+    db = SessionLocal()
+    try:
+        user = _cached_principal(db)
+
+        with db.begin_nested():
+            user.is_admin = True
+        # The released savepoint is not durable yet
+        assert principal_cache.local.get(user.id) is not None
+
+        db.commit()
+        assert principal_cache.local.get(user.id) is None
+        assert asyncio.run(principal_cache.get(user.id)).is_admin
+    finally:
+        db.close()
+
+
+def test_user_delete_invalidates_principal_after_commit(pooled_engine):
+    db = SessionLocal()
+    try:
+        user = _cached_principal(db)
+
+        db.delete(user)
+        db.flush()
+        assert principal_cache.local.get(user.id) is not None
+
+        db.commit()
+        assert principal_cache.local.get(user.id) is None
+        assert asyncio.run(principal_cache.get(user.id)) is None
+    finally:
+        db.close()
+
+
+def test_rolled_back_user_change_keeps_cached_principal(pooled_engine):
+    db = SessionLocal()
+    try:
+        user = _cached_principal(db)
+
+        user.is_active = False
+        db.flush()
+        db.rollback()
+        assert principal_cache.local.get(user.id) is not None
+
+        # Nothing stays queued to be invalidated by a later commit
+        db.commit()
+        assert principal_cache.local.get(user.id) is not None
+        assert asyncio.run(principal_cache.get(user.id)).is_active
+    finally:
+        db.close()